@@ -2,11 +2,13 @@
 Its internal foo that is not for public use.
 """
 
-__all__ = ["_LINEBREAK", '_LOGGER', '_log', '_logging_init', '_message', '_message_exception', '_type_module_name_str']
+__all__ = ["_LINEBREAK", '_LOGGER', '_log', '_logging_init', '_message', '_message_exception', '_type_module_name_str',
+           '_json_dumps']
 
 import logging
 import sys
-from typing import Any, List, Optional, TextIO, Type, Union
+from json import dumps as json_dumps
+from typing import Any, Callable, List, Optional, TextIO, Type, Union
 
 if sys.version_info >= (3, 8):
     from typing import Literal
@@ -18,6 +20,16 @@ try:
 except ImportError:  # pragma: no cover
     colored = None  # type: ignore
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None  # type: ignore
+
 _LINEBREAK = '\r\n'
 
 _LOGGER = logging.getLogger('nichtparasoup')
@@ -66,3 +78,18 @@ def _message_exception(exception: Exception, file: Optional[TextIO] = None) -> N
 
 def _type_module_name_str(type_: Type[Any]) -> str:  # pragma: no cover
     return f'{type_.__module__}:{type_.__name__}'
+
+
+def _json_dumps(o: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Encode as compact UTF-8 JSON - via `orjson` or `ujson` (>= 5.4) if installed, which are faster than `json`.
+
+    Non-string keys of dicts are converted to strings.
+    """
+    encoded: bytes
+    if orjson:
+        encoded = orjson.dumps(o, default=default, option=orjson.OPT_NON_STR_KEYS)
+        return encoded
+    if ujson:
+        encoded = ujson.dumps(o, default=default, ensure_ascii=False, escape_forward_slashes=False).encode()
+        return encoded
+    return json_dumps(o, default=default, ensure_ascii=False, separators=(',', ':')).encode()
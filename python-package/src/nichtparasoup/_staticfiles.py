@@ -0,0 +1,171 @@
+"""Serving of the web-UI's static files."""
+
+__all__ = ["_StaticFiles"]
+
+import re
+from gzip import GzipFile
+from hashlib import blake2b
+from io import BytesIO
+from mimetypes import guess_type
+from os import walk
+from os.path import join as path_join, relpath, sep
+from posixpath import (
+    dirname as url_dirname, join as url_join, normpath as url_normpath, relpath as url_relpath,
+    splitext as url_splitext,
+)
+from typing import Any, Callable, Dict, Iterable, Match, Optional
+
+from werkzeug.http import parse_accept_header, parse_etags
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None  # type: ignore
+
+_WsgiApp = Callable[[Dict[str, Any], Any], Any]
+
+_COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+_REFERENCE = re.compile(r'\b(href|src)="([^"#?:]+)"')
+"""a relative reference in HTML"""
+
+_MAX_AGE_IMMUTABLE = 365 * 24 * 60 * 60
+
+
+def _gzip(data: bytes) -> bytes:
+    compressed = BytesIO()
+    with GzipFile(fileobj=compressed, mode='wb', compresslevel=9, mtime=0) as gz:
+        gz.write(data)
+    return compressed.getvalue()
+
+
+def _compress(data: bytes) -> Dict[str, bytes]:
+    """:return: Compressed data by content-coding - the codings that save at least 10 percent."""
+    compressed = {'gzip': _gzip(data)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(data, quality=11)
+    return {coding: encoded for coding, encoded in compressed.items() if len(encoded) < len(data) * 0.9}
+
+
+class _StaticAsset:
+
+    def __init__(self, url: str, data: bytes, file: Optional[str]) -> None:
+        mimetype = guess_type(url)[0] or 'application/octet-stream'
+        self.mimetype = mimetype
+        self.size = len(data)
+        self.etag = blake2b(data, digest_size=16).hexdigest()
+        self._data = data
+        self._file = file
+        """the file to send as is - via the WSGI server's file wrapper, that might send it zero-copy"""
+        self.encoded = _compress(data) if mimetype.startswith(_COMPRESSIBLE) else {}
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """:return: The best content-coding that is accepted. `None` means identity."""
+        accepted = parse_accept_header(accept_encoding)
+        return next((coding for coding in ('br', 'gzip') if coding in self.encoded and accepted.quality(coding) > 0),
+                    None)
+
+    def body(self, coding: Optional[str], environ: Dict[str, Any]) -> Iterable[bytes]:
+        if coding:
+            return [self.encoded[coding]]
+        if self._file:
+            # the WSGI server closes the file
+            file: Iterable[bytes] = wrap_file(environ, open(self._file, 'rb'))
+            return file
+        return [self._data]
+
+
+class _StaticFiles:
+    """Serve the static files of a directory - all other requests are passed to the application.
+
+    Files are read once, on construction.
+    Each file is served under its path, and under a content-hashed path like ``css/look.0123456789ab.css``.
+    References to files in HTML files are rewritten to the content-hashed paths.
+    The content-hashed paths never change their content, so they are cached as immutable.
+    All other paths are cached, but revalidated via their strong ETag.
+
+    Compressible files are compressed via gzip - and via brotli, if the optional package `brotli` is installed.
+
+    :param app: The application to pass all other requests to.
+    :param directory: The directory of the static files.
+    """
+
+    def __init__(self, app: _WsgiApp, directory: str) -> None:
+        self._app = app
+        self._assets: Dict[str, _StaticAsset] = {}
+        """assets by URL path"""
+        self._immutable: Dict[str, _StaticAsset] = {}
+        """assets by content-hashed URL path"""
+        files = self._scan(directory)
+        contents = {url: self._read(file) for url, file in files.items()}
+        hashed = {url: self._hashed_url(url, data) for url, data in contents.items() if not url.endswith('.html')}
+        for url, data in contents.items():
+            if url.endswith('.html'):
+                self._assets[url] = _StaticAsset(url, self._rewrite(url, data, hashed), None)
+            else:
+                asset = self._assets[url] = _StaticAsset(url, data, files[url])
+                self._immutable[hashed[url]] = asset
+
+    @staticmethod
+    def _scan(directory: str) -> Dict[str, str]:
+        """:return: Files by their URL path."""
+        return {'/' + relpath(path_join(root, name), directory).replace(sep, '/'): path_join(root, name)
+                for root, _, names in walk(directory)
+                for name in names}
+
+    @staticmethod
+    def _read(file: str) -> bytes:
+        with open(file, 'rb') as fp:
+            return fp.read()
+
+    @staticmethod
+    def _hashed_url(url: str, data: bytes) -> str:
+        base, ext = url_splitext(url)
+        return f'{base}.{blake2b(data, digest_size=6).hexdigest()}{ext}'
+
+    @staticmethod
+    def _rewrite(url: str, data: bytes, hashed: Dict[str, str]) -> bytes:
+        """Rewrite references to files in HTML to their content-hashed URL paths."""
+        base = url_dirname(url)
+
+        def replace(match: Match[str]) -> str:
+            target = hashed.get(url_normpath(url_join(base, match.group(2))))
+            return f'{match.group(1)}="{url_relpath(target, base)}"' if target else match.group(0)
+
+        return _REFERENCE.sub(replace, data.decode()).encode()
+
+    def __call__(self, environ: Dict[str, Any], start_response: Any) -> Any:
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self._app(environ, start_response)
+        path = environ.get('PATH_INFO', '')
+        asset = self._immutable.get(path)
+        if asset:
+            return self._serve(asset, True, environ, start_response)
+        asset = self._assets.get(path)
+        if asset:
+            return self._serve(asset, False, environ, start_response)
+        return self._app(environ, start_response)
+
+    @staticmethod
+    def _serve(asset: _StaticAsset, immutable: bool, environ: Dict[str, Any], start_response: Any) -> Any:
+        coding = asset.negotiate(environ.get('HTTP_ACCEPT_ENCODING'))
+        etag = f'{asset.etag}-{coding}' if coding else asset.etag
+        response = Response(mimetype=asset.mimetype, direct_passthrough=True)
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        if immutable:
+            response.cache_control.max_age = _MAX_AGE_IMMUTABLE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        if parse_etags(environ.get('HTTP_IF_NONE_MATCH')).contains(etag):
+            response.status_code = 304
+        else:
+            response.content_encoding = coding
+            response.content_length = len(asset.encoded[coding]) if coding else asset.size
+            if environ['REQUEST_METHOD'] == 'GET':
+                response.response = asset.body(coding, environ)
+        return response(environ, start_response)
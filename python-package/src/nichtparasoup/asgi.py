@@ -0,0 +1,235 @@
+__all__ = ["AsgiWebServer", "create_app"]
+
+import asyncio
+import logging
+import sys
+from io import BytesIO
+from os import environ
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from werkzeug.exceptions import HTTPException, InternalServerError
+from werkzeug.wrappers import Request
+
+from ._internals import _log, _logging_init
+from ._staticfiles import _StaticFiles
+from .config import ConfigFilePath, get_config, get_imageserver
+from .core.server import Server
+from .webserver import _CONFIG_FILE_ENV, WebServer, _stream_event
+
+try:
+    import uvicorn
+except ImportError:  # pragma: no cover
+    uvicorn = None  # type: ignore
+
+_Scope = Dict[str, Any]
+_Message = Dict[str, Any]
+_Receive = Callable[[], Awaitable[_Message]]
+_Send = Callable[[_Message], Awaitable[None]]
+_WsgiApp = Callable[[Dict[str, Any], Any], Any]
+_WsgiResult = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+"""status, headers, body"""
+
+
+def _environ(scope: _Scope, body: bytes) -> Dict[str, Any]:
+    """Translate an ASGI HTTP scope to a WSGI environ."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = f'HTTP_{key}'
+        environ[key] = f'{environ[key]},{value.decode("latin-1")}' if key in environ else value.decode('latin-1')
+    return environ
+
+
+def _run_wsgi(app: _WsgiApp, environ: Dict[str, Any]) -> _WsgiResult:
+    started: List[Any] = []
+
+    def start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None) -> None:
+        started[:] = [status, headers]
+
+    chunks = app(environ, start_response)
+    try:
+        body = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    status, headers = started
+    return int(status.split(' ', 1)[0]), [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers], body
+
+
+def _call_wsgi(app: _WsgiApp, environ: Dict[str, Any]) -> _WsgiResult:
+    """Run a WSGI application - and render the exceptions it raises, like the WSGI server would."""
+    try:
+        return _run_wsgi(app, environ)
+    except HTTPException as ex:
+        return _run_wsgi(ex, environ)
+    except Exception as ex:
+        _log('debug', 'Handled unexpected exception: %s', ex, exc_info=ex)
+        return _run_wsgi(InternalServerError(original_exception=ex), environ)
+
+
+async def _read_body(receive: _Receive) -> bytes:
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def _wait_disconnect(receive: _Receive) -> None:
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class AsgiWebServer:
+    """An ASGI application variant of :class:`nichtparasoup.webserver.WebServer` - with the same routes.
+
+    Requests are answered by the WSGI application in the event loop's default executor,
+    so the event loop is never blocked.
+    Streams - see ``/stream`` - are pushed natively in the event loop, so idle connections take no thread.
+    The imageserver is started and stopped via the ASGI lifespan protocol.
+
+    Running it via :meth:`run` requires the optional package `uvicorn`.
+    It can be served by any other ASGI server, too.
+
+    :param imageserver: The imageserver to represent.
+    :param hostname: The hostname to bind to.
+    :param port: The port to bind to.
+    :param developer_mode: Run in insecure web-developer mode; sets CORS to "*".
+    """
+
+    def __init__(self, imageserver: Server, hostname: str, port: int, *, developer_mode: bool = False) -> None:
+        self.webserver = WebServer(imageserver, hostname, port, developer_mode=developer_mode)
+        self._wsgi_app = _StaticFiles(self.webserver, WebServer._STATIC_FILES)
+
+    async def __call__(self, scope: _Scope, receive: _Receive, send: _Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if scope['path'] == '/stream' and scope['method'] == 'GET':
+                await self._stream(scope, receive, send)
+            else:
+                await self._respond_wsgi(self._wsgi_app, _environ(scope, await _read_body(receive)), send)
+
+    async def _lifespan(self, receive: _Receive, send: _Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self._lifespan_event('startup', self.webserver.start, send)
+            elif message['type'] == 'lifespan.shutdown':
+                await self._lifespan_event('shutdown', self.webserver.stop, send)
+                return
+
+    @staticmethod
+    async def _lifespan_event(event: str, handle: Callable[[], None], send: _Send) -> None:
+        """Handle a lifespan event in the executor - and tell the ASGI server whether it completed or failed."""
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, handle)
+        except Exception as ex:
+            _log('debug', 'Handled exception: %s', ex, exc_info=ex)
+            _log('error', ' * Error occurred on %s', event)
+            await send({'type': f'lifespan.{event}.failed', 'message': f'{type(ex).__name__}: {ex}'})
+            return
+        await send({'type': f'lifespan.{event}.complete'})
+
+    @staticmethod
+    async def _respond_wsgi(app: _WsgiApp, environ: Dict[str, Any], send: _Send) -> None:
+        status, headers, body = await asyncio.get_event_loop().run_in_executor(None, _call_wsgi, app, environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _stream_headers(self) -> List[Tuple[bytes, bytes]]:
+        headers = [(b'content-type', b'text/event-stream; charset=utf-8'),
+                   (b'cache-control', b'no-cache, no-store'),
+                   (b'x-accel-buffering', b'no')]
+        if self.webserver.developer_mode:
+            headers.append((b'access-control-allow-origin', b'*'))
+        return headers
+
+    async def _stream(self, scope: _Scope, receive: _Receive, send: _Send) -> None:
+        environ = _environ(scope, b'')
+        try:
+            interval = WebServer._get_int_arg(Request(environ), 'interval', 1, WebServer._STREAM_INTERVAL_MAX)
+        except HTTPException as ex:
+            await self._respond_wsgi(ex, environ, send)
+            return
+        await self._push_stream(interval or WebServer._STREAM_INTERVAL_DEFAULT, receive, send)
+
+    async def _push_stream(self, interval: int, receive: _Receive, send: _Send) -> None:
+        loop = asyncio.get_event_loop()
+        images: 'asyncio.Queue[bytes]' = asyncio.Queue()
+
+        def deliver(image: bytes) -> None:
+            loop.call_soon_threadsafe(images.put_nowait, image)
+
+        streamer = self.webserver._get_streamer()
+        subscription = streamer.subscribe(interval, deliver)
+        disconnected = loop.create_task(_wait_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': self._stream_headers()})
+            while True:
+                event = await self._next_event(images, disconnected)
+                if event is None:
+                    break
+                await send({'type': 'http.response.body', 'body': event, 'more_body': True})
+        finally:
+            streamer.unsubscribe(subscription)
+            disconnected.cancel()
+
+    @staticmethod
+    async def _next_event(images: 'asyncio.Queue[bytes]', disconnected: 'asyncio.Future[Any]') -> Optional[bytes]:
+        """:return: The next event - `None` if the client disconnected."""
+        image: 'asyncio.Future[Any]' = asyncio.ensure_future(images.get())
+        done, _ = await asyncio.wait({image, disconnected},
+                                     timeout=WebServer._STREAM_KEEPALIVE, return_when=asyncio.FIRST_COMPLETED)
+        if disconnected in done:
+            image.cancel()
+            return None
+        if image in done:
+            return _stream_event(image.result())
+        image.cancel()
+        return _stream_event(None)
+
+    def run(self) -> None:  # pragma: no cover
+        if uvicorn is None:
+            raise ImportError('ASGI engine requires the package "uvicorn". Install "nichtparasoup[asgi]".')
+        webserver = self.webserver
+        _log('info', ' * starting %s bound to %s:%d', type(self).__name__, webserver.hostname, webserver.port)
+        uvicorn.run(self, host=webserver.hostname, port=webserver.port, lifespan='on', log_level='warning')
+        _log('info', ' * stopped %s bound to %s:%d', type(self).__name__, webserver.hostname, webserver.port)
+
+
+def create_app(config_file: Optional[ConfigFilePath] = None, *, developer_mode: bool = False) -> AsgiWebServer:
+    """Create the ASGI application - for ASGI servers like uvicorn or hypercorn.
+
+    Sets up the imageserver as configured. It is started and stopped via the ASGI lifespan protocol.
+    The config settings of the webserver are not used - the ASGI server binds.
+
+    Example: ``uvicorn --factory nichtparasoup.asgi:create_app``
+
+    :param config_file: The config file. Defaults to the file in environment variable ``NICHTPARASOUP_CONFIG``,
+        or the default config.
+    :param developer_mode: Run in insecure web-developer mode; sets CORS to "*".
+    """
+    config = get_config(config_file or environ.get(_CONFIG_FILE_ENV))
+    _logging_init(getattr(logging, config['logging']['level']))
+    return AsgiWebServer(get_imageserver(config), '', 0, developer_mode=developer_mode)
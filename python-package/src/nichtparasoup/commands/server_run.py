@@ -1,34 +1,38 @@
 __all__ = ['main', 'cli']
 
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from click import BadParameter, Command, Context, Option, Parameter, Path
+from click import BadParameter, Choice, Command, Context, Option, Parameter, Path
 
 from .._internals import _log, _logging_init
-from ..config import Config, get_config, get_imagecrawler
-from ..core import NPCore
+from ..asgi import AsgiWebServer
+from ..config import Config, get_config, get_imageserver
 from ..core.server import Server as ImageServer
 from ..webserver import WebServer
 from ._internals import _cli_option_debug
 
 
-def main(config: Config, *, develop: bool = False) -> None:  # pragma: no cover
+def _run_webserver(imageserver: ImageServer, webserver_config: Dict[str, Any], *,
+                   develop: bool, engine: str
+                   ) -> None:  # pragma: no cover
+    hostname, port = webserver_config['hostname'], webserver_config['port']
+    if engine == 'asgi':
+        if webserver_config.get('processes', 1) != 1:
+            _log('warning', 'webserver.processes is ignored by the ASGI engine')
+        AsgiWebServer(imageserver, hostname, port, developer_mode=develop).run()
+        return
+    WebServer(imageserver, hostname, port,
+              developer_mode=develop,
+              processes=webserver_config.get('processes', 1)
+              ).run()
+
+
+def main(config: Config, *, develop: bool = False, engine: str = 'wsgi') -> None:  # pragma: no cover
     _logging_init(getattr(logging, config['logging']['level']))
     _log('debug', 'Config: %r', config)
-    imageserver = ImageServer(NPCore(), **config.get('imageserver', {}))
-    for crawler_config in config['crawlers']:
-        imagecrawler = get_imagecrawler(crawler_config)
-        if not imageserver.core.has_imagecrawler(imagecrawler):
-            imageserver.core.add_imagecrawler(
-                imagecrawler,
-                weight=crawler_config['weight'],
-                restart_at_front_when_exhausted=crawler_config['restart_at_front_when_exhausted'])
-    WebServer(
-        imageserver,
-        config['webserver']['hostname'], config['webserver']['port'],
-        developer_mode=develop
-    ).run()
+    imageserver = get_imageserver(config)
+    _run_webserver(imageserver, config['webserver'], develop=develop, engine=engine)
 
 
 def _param_get_config(_: Context, param: Parameter,
@@ -60,6 +64,12 @@ cli = Command(
             help='Run in insecure web-developer mode; sets CORS to "*".',
             is_flag=True,
         ),
+        Option(
+            param_decls=['--engine'],
+            help='Serve via WSGI, or via ASGI - which requires "nichtparasoup[asgi]".',
+            type=Choice(['wsgi', 'asgi']),
+            default='wsgi', show_default=True,
+        ),
         _cli_option_debug,
     ],
 )
@@ -1,4 +1,4 @@
-__all__ = ["get_config", "get_defaults", "dump_defaults", "get_imagecrawler", "parse_yaml_file",
+__all__ = ["get_config", "get_defaults", "dump_defaults", "get_imagecrawler", "get_imageserver", "parse_yaml_file",
            "ImageCrawlerSetupError",
            "DEFAULTS_FILE", "SCHEMA_FILE",
            "Config", "ConfigFilePath"]
@@ -10,7 +10,11 @@ from typing import Any, Dict, Optional, Union
 
 from yamale import make_data, make_schema, validate as yamale_validate  # type: ignore
 
+from ..core import BaseBlacklist, Blacklist, NPCore
 from ..core.imagecrawler import BaseImageCrawler
+from ..core.lease import BaseLeases, FileLeases
+from ..core.redisstore import RedisStore
+from ..core.server import Server
 from ..imagecrawlers import get_imagecrawlers
 
 Config = Dict[str, Any]
@@ -55,11 +59,54 @@ def get_imagecrawler(config_crawler: Dict[str, Any]) -> BaseImageCrawler:
     return imagecrawler
 
 
+def _get_blacklist(imageserver_config: Dict[str, Any], store: Optional[RedisStore]) -> BaseBlacklist:
+    max_memory = imageserver_config.pop('blacklist_max_memory', None)
+    window = imageserver_config.pop('blacklist_window', None)
+    if store:
+        return store.blacklist(window=window)
+    return Blacklist(max_memory=max_memory, window=window)
+
+
+def _get_leases(imageserver_config: Dict[str, Any], store: Optional[RedisStore]) -> Optional[BaseLeases]:
+    directory = imageserver_config.pop('lease_directory', None)
+    if store:
+        return store.leases()
+    return FileLeases(directory) if directory else None
+
+
+def get_imageserver(config: Config) -> Server:
+    """Set up an imageserver and its crawlers, as configured. The imageserver is not started."""
+    imageserver_config = config.get('imageserver', {}).copy()
+    redis_url = imageserver_config.pop('redis_url', None)
+    redis_prefix = imageserver_config.pop('redis_prefix', 'nichtparasoup')
+    store = RedisStore.from_url(redis_url, redis_prefix) if redis_url else None
+    core = NPCore(workers=imageserver_config.pop('crawler_workers', None),
+                  blacklist=_get_blacklist(imageserver_config, store))
+    imageserver = Server(core, leases=_get_leases(imageserver_config, store), **imageserver_config)
+    for crawler_config in config['crawlers']:
+        imagecrawler = get_imagecrawler(crawler_config)
+        if not core.has_imagecrawler(imagecrawler):
+            core.add_imagecrawler(
+                imagecrawler,
+                weight=crawler_config['weight'],
+                restart_at_front_when_exhausted=crawler_config['restart_at_front_when_exhausted'],
+                images=store.image_pool(imagecrawler) if store else None)
+    return imageserver
+
+
+def _check_imageserver(imageserver_config: Dict[str, Any]) -> None:
+    """Check what the schema cannot."""
+    if 'snapshot_file' in imageserver_config and 'redis_url' in imageserver_config:
+        # a restored snapshot would replace the images and the blacklist all nodes share, on every start
+        raise ValueError('imageserver.snapshot_file cannot be combined with imageserver.redis_url')
+
+
 def parse_yaml_file(file_path: ConfigFilePath) -> Config:
     _data = make_data(Path(file_path).resolve(strict=True), parser=_YAML_PARSER)
     _schema = make_schema(SCHEMA_FILE, parser=_YAML_PARSER)
     yamale_validate(_schema, _data, strict=True)
     config: Config = _data[0][0]
+    _check_imageserver(config.get('imageserver', {}))
     config.setdefault('logging', {})
     config['logging'].setdefault('level', 'INFO')
     for config_crawler in config['crawlers']:
@@ -1,25 +1,297 @@
-__all__ = ["Crawler", "CrawlerCollection", "NPCore", "Blacklist"]
-
-from random import choice, choices
-from threading import Thread
-from time import sleep
+__all__ = ["Crawler", "CrawlerCollection", "NPCore", "AsyncNPCore", "BaseBlacklist", "Blacklist"]
+
+import sys
+from abc import abstractmethod
+from array import array
+from asyncio import (
+    AbstractEventLoop, Event as AsyncEvent, Semaphore as AsyncSemaphore, TimeoutError as AsyncTimeoutError, gather,
+    new_event_loop, run_coroutine_threadsafe, sleep as async_sleep, wait_for,
+)
+from base64 import b64decode, b64encode
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait as wait_futures
+from functools import partial, wraps
+from hashlib import blake2b
+from random import random
+from threading import Lock, Thread
+from time import monotonic, sleep
 from types import MethodType
-from typing import Callable, Generator, List, Optional, Set, Union
+from typing import (
+    Any, Callable, Container, Dict, Generator, Iterable, List, Optional, Sequence, Sized, Tuple, TypeVar, Union, cast,
+)
 from weakref import ReferenceType, WeakMethod
 
-from .image import Image, ImageCollection, ImageUri
+from .._internals import _log
+from .image import BaseImagePool, Image, ImageCollection, ImagePool, ImageUri
 from .imagecrawler import BaseImageCrawler
 
 _CrawlerWeight = Union[int, float]  # constraint: > 0
 
+_F = TypeVar('_F', bound=Callable[..., Any])
+
+
+class _FingerprintTable:
+    """Set of non-zero fingerprints - in an array, via open addressing with linear probing."""
+
+    _MAX_LOAD = 0.5
+
+    def __init__(self, typecode: str, capacity: int = 64) -> None:
+        self._typecode = typecode
+        self._table = self._empty(capacity)
+        self._len = 0
+        self.started = monotonic()
+
+    def _empty(self, capacity: int) -> 'array[int]':
+        return array(self._typecode, bytes(capacity * array(self._typecode).itemsize))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, fingerprint: int) -> bool:
+        table = self._table
+        mask = len(table) - 1
+        position = fingerprint & mask
+        while table[position]:
+            if table[position] == fingerprint:
+                return True
+            position = (position + 1) & mask
+        return False
+
+    def add(self, fingerprint: int) -> bool:
+        """:return: Whether the fingerprint was added - and was not already in the table."""
+        if fingerprint in self:
+            return False
+        if self._len + 1 > len(self._table) * self._MAX_LOAD:
+            self._resize(len(self._table) * 2)
+        self._insert(self._table, fingerprint)
+        self._len += 1
+        return True
+
+    def would_grow_to(self) -> int:
+        """Number of bytes the table would take, after adding one more fingerprint."""
+        capacity = len(self._table)
+        if self._len + 1 > capacity * self._MAX_LOAD:
+            capacity *= 2
+        return capacity * self._table.itemsize
+
+    @staticmethod
+    def _insert(table: 'array[int]', fingerprint: int) -> None:
+        mask = len(table) - 1
+        position = fingerprint & mask
+        while table[position]:
+            position = (position + 1) & mask
+        table[position] = fingerprint
+
+    def _resize(self, capacity: int) -> None:
+        table = self._empty(capacity)
+        for fingerprint in self._table:
+            if fingerprint:
+                self._insert(table, fingerprint)
+        self._table = table
+
+    def nbytes(self) -> int:
+        return len(self._table) * self._table.itemsize
+
+    def to_bytes(self) -> bytes:
+        return self._table.tobytes()
+
+    @classmethod
+    def from_bytes(cls, typecode: str, data: bytes, byteorder: str, started: float) -> '_FingerprintTable':
+        table = array(typecode, data)
+        capacity = len(table)
+        if capacity == 0 or capacity & (capacity - 1):
+            raise ValueError('capacity is not a power of two')
+        if byteorder != sys.byteorder:
+            table.byteswap()
+        loaded = cls(typecode, 1)
+        loaded._table = table
+        loaded._len = capacity - table.count(0)
+        loaded.started = started
+        return loaded
+
+
+class BaseBlacklist(Sized, Container[ImageUri]):
+    """Image URIs that were seen already - so they are not added to the crawlers again.
+
+    Implementations are intended to be thread safe.
+    """
+
+    forgotten: int = 0
+    """Number of URIs that were forgotten on their own - not via :meth:`clear` or :meth:`forget_oldest`."""
+
+    @abstractmethod
+    def add(self, uri: ImageUri) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError()
+
+    def is_rolling(self) -> bool:
+        """Whether URIs are forgotten after a while."""
+        return False
+
+    def forget_oldest(self) -> int:
+        """Forget the oldest URIs. Unless implemented otherwise, all are forgotten.
+        :return: Number of URIs that were forgotten.
+        """
+        forgotten = len(self)
+        self.clear()
+        return forgotten
+
+    def dump(self) -> Optional[Dict[str, Any]]:
+        """Dump to JSON-serializable data - see :meth:`load`.
+        :return: `None` if there is nothing to dump - like when the URIs are stored externally.
+        """
+        return None
+
+    def load(self, dumped: Dict[str, Any]) -> None:
+        """Replace the URIs with dumped ones - see :meth:`dump`. Unless implemented otherwise, the dump is ignored.
+        :raise ValueError: If the dump does not fit.
+        """
+        return None
+
+
+class Blacklist(BaseBlacklist):
+    """Image URIs that were seen already.
+
+    URIs are not stored, but hashed fingerprints of them - in arrays.
+    The chance that a URI is falsely considered blacklisted is about ``len(blacklist) / 2 ** (8 * fingerprint_size)``.
 
-class Blacklist(Set[ImageUri]):
-    ...
+    The fingerprints are kept in `generations`. New ones go into the newest generation.
+    When a new generation is started, the oldest one is forgotten.
+    A new generation is started, when the newest one would exceed its share of `max_memory`,
+    or when it is older than ``window / generations``.
+
+    :param fingerprint_size: Bytes per fingerprint. Either 4 or 8.
+    :param max_memory: Maximum number of bytes the fingerprints may take. `None` means unbounded.
+    :param window: Number of seconds a URI is remembered at most - a rolling blacklist.
+        `None` means URIs are remembered until :meth:`clear`.
+    :param generations: Number of generations.
+    """
+
+    _TYPECODES = {array(typecode).itemsize: typecode for typecode in 'IQ'}
+
+    def __init__(self, *,
+                 fingerprint_size: int = 8,
+                 max_memory: Optional[int] = None,
+                 window: Optional[float] = None,
+                 generations: int = 2
+                 ) -> None:
+        if fingerprint_size not in self._TYPECODES:
+            raise ValueError(f'fingerprint_size not in {sorted(self._TYPECODES)!r}')
+        if generations < 1:
+            raise ValueError('generations < 1')
+        if window is not None and window <= 0:
+            raise ValueError('window <= 0')
+        self._fingerprint_size = fingerprint_size
+        self._typecode = self._TYPECODES[fingerprint_size]
+        if max_memory is not None and max_memory < generations * _FingerprintTable(self._typecode).nbytes():
+            raise ValueError('max_memory too small')
+        self._max_memory = max_memory
+        self._generation_ttl = window / generations if window is not None else None
+        self._max_generations = generations
+        self._generations = [_FingerprintTable(self._typecode)]
+        """Newest first."""
+        self._lock = Lock()
+        self.forgotten = 0
+
+    def is_rolling(self) -> bool:
+        return self._generation_ttl is not None
+
+    def _fingerprint(self, uri: ImageUri) -> int:
+        digest = blake2b(uri.encode(), digest_size=self._fingerprint_size).digest()
+        return int.from_bytes(digest, 'little') or 1  # zero marks an empty slot
+
+    def __contains__(self, uri: object) -> bool:
+        if not isinstance(uri, str):
+            return False
+        fingerprint = self._fingerprint(uri)
+        with self._lock:
+            self._age()
+            return any(fingerprint in generation for generation in self._generations)
+
+    def add(self, uri: ImageUri) -> None:
+        fingerprint = self._fingerprint(uri)
+        with self._lock:
+            self._age()
+            if any(fingerprint in generation for generation in self._generations[1:]):
+                return
+            if self._max_memory is not None \
+                    and self._generations[0].would_grow_to() * self._max_generations > self._max_memory:
+                self._new_generation()
+            self._generations[0].add(fingerprint)
+
+    def _age(self) -> None:
+        # caller must hold the lock
+        if self._generation_ttl is None:
+            return
+        expired = int((monotonic() - self._generations[0].started) // self._generation_ttl)
+        for _ in range(min(expired, self._max_generations)):
+            self._new_generation()
+
+    def _new_generation(self) -> None:
+        # caller must hold the lock
+        self._generations.insert(0, _FingerprintTable(self._typecode))
+        for generation in self._generations[self._max_generations:]:
+            self.forgotten += len(generation)
+        del self._generations[self._max_generations:]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._age()
+            return sum(map(len, self._generations))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations = [_FingerprintTable(self._typecode)]
+
+    def forget_oldest(self) -> int:
+        """Forget the oldest generation.
+        :return: Number of fingerprints that were forgotten.
+        """
+        with self._lock:
+            if len(self._generations) > 1:
+                return len(self._generations.pop())
+            forgotten = len(self._generations[0])
+            self._generations = [_FingerprintTable(self._typecode)]
+            return forgotten
+
+    def __sizeof__(self) -> int:
+        return super().__sizeof__() + sum(generation.nbytes() for generation in self._generations)
+
+    def dump(self) -> Dict[str, Any]:
+        """Dump to JSON-serializable data - see :meth:`load`."""
+        with self._lock:
+            now = monotonic()
+            return dict(
+                fingerprint_size=self._fingerprint_size,
+                byteorder=sys.byteorder,
+                generations=[dict(
+                    age=now - generation.started,
+                    table=b64encode(generation.to_bytes()).decode('ascii'),
+                ) for generation in self._generations],
+            )
+
+    def load(self, dumped: Dict[str, Any]) -> None:
+        """Replace the fingerprints with dumped ones - see :meth:`dump`.
+        :raise ValueError: If the dump does not fit.
+        """
+        if dumped['fingerprint_size'] != self._fingerprint_size:
+            raise ValueError('fingerprint_size does not fit')
+        now = monotonic()
+        generations = [_FingerprintTable.from_bytes(
+            self._typecode, b64decode(generation['table']), dumped['byteorder'], now - generation['age']
+        ) for generation in dumped['generations'][:self._max_generations]]
+        with self._lock:
+            self._generations = generations or [_FingerprintTable(self._typecode)]
+            self._age()
 
 
 _IsImageAddable = Callable[[Image], bool]
 _OnImageAdded = Callable[[Image], None]
 
+_OnStockChanged = Callable[['Crawler'], None]
+
 _OnFill = Callable[['Crawler', int], None]
 
 _FILLUP_DELAY_DEFAULT: float = 1.0
@@ -30,19 +302,70 @@ class Crawler:
     def __init__(self, imagecrawler: BaseImageCrawler, *,
                  weight: _CrawlerWeight = 1.0,
                  restart_at_front_when_exhausted: bool = False,
+                 low_watermark: int = 0,
+                 high_watermark: int = 0,
                  is_image_addable: Optional[_IsImageAddable] = None,
-                 on_image_added: Optional[_OnImageAdded] = None
+                 on_image_added: Optional[_OnImageAdded] = None,
+                 on_stock_changed: Optional[_OnStockChanged] = None,
+                 images: Optional[BaseImagePool] = None
                  ) -> None:
         if weight <= 0:
             raise ValueError('weight <= 0')
         self.imagecrawler = imagecrawler
         self.weight = weight
         self.restart_at_front_when_exhausted = restart_at_front_when_exhausted
-        self.images = ImageCollection()
+        self._images: BaseImagePool = images if images is not None else ImagePool()
+        self.low_watermark = 0
+        self.high_watermark = 0
+        self.set_watermarks(low_watermark, high_watermark)
         self._is_image_addable_wr: Optional[ReferenceType[_IsImageAddable]] = None
         self._image_added_wr: Optional[ReferenceType[_OnImageAdded]] = None
+        self._stock_changed_wr: Optional[ReferenceType[_OnStockChanged]] = None
+        self.last_crawl_duration: Optional[float] = None
+        """Seconds the last crawl took."""
+        self.count_crawls: int = 0
         self.set_is_image_addable(is_image_addable)
         self.set_image_added(on_image_added)
+        self.set_stock_changed(on_stock_changed)
+
+    def get_images(self) -> BaseImagePool:
+        return self._images
+
+    def set_images(self, images: Iterable[Image]) -> None:
+        """Set the images.
+
+        A :class:`BaseImagePool` is used as is.
+        Other images replace the images of the current pool - so a shared pool stays shared.
+        """
+        if isinstance(images, BaseImagePool):
+            self._images = images
+        else:
+            images = list(images)  # might be a view on the current pool
+            self._images.clear()
+            for image in images:
+                self._images.add(image)
+        self._stock_changed()
+
+    images = property(fget=get_images, fset=set_images)
+
+    def set_watermarks(self, low: int, high: int) -> None:
+        """Set the number of images, below which the crawler wants to be refilled.
+
+        :param low: Below this, the crawler urgently wants to be refilled.
+        :param high: Below this, the crawler wants to be refilled eventually.
+        """
+        if low < 0:
+            raise ValueError('low < 0')
+        if low > high:
+            raise ValueError('low > high')
+        self.low_watermark = low
+        self.high_watermark = high
+
+    def is_below_low_watermark(self) -> bool:
+        return len(self._images) < self.low_watermark
+
+    def is_below_high_watermark(self) -> bool:
+        return len(self._images) < self.high_watermark
 
     def set_is_image_addable(self, is_image_addable: Optional[_IsImageAddable]) -> None:
         t_is_image_addable = type(is_image_addable)
@@ -70,19 +393,67 @@ class Crawler:
     def get_image_added(self) -> Optional[_OnImageAdded]:
         return self._image_added_wr() if self._image_added_wr else None
 
+    def set_stock_changed(self, stock_changed: Optional[_OnStockChanged]) -> None:
+        """Set a callback that is called, when the images might have run out, or might have been restocked.
+        """
+        t_stock_changed = type(stock_changed)
+        if None is stock_changed:
+            self._stock_changed_wr = None
+        elif MethodType is t_stock_changed:
+            self._stock_changed_wr = WeakMethod(stock_changed)  # type: ignore[assignment,arg-type]
+        else:
+            raise NotImplementedError(f'type {t_stock_changed!r} not supported, yet')
+        # TODO: add function/lambda support - and write proper tests for it
+
+    def get_stock_changed(self) -> Optional[_OnStockChanged]:
+        return self._stock_changed_wr() if self._stock_changed_wr else None
+
+    def _stock_changed(self) -> None:
+        stock_changed = self.get_stock_changed()
+        if stock_changed:
+            stock_changed(self)
+
     def reset(self) -> None:  # pragma: no cover
         self.images.clear()
+        self._stock_changed()
         self.imagecrawler.reset()
 
-    def crawl(self) -> int:
-        """Crawl for new images.
-        :return: Number of newly added images.
+    def is_exhausted(self) -> bool:
+        """Whether crawling is pointless, since the end of the source was reached."""
+        return not self.restart_at_front_when_exhausted and self.imagecrawler.is_exhausted()
+
+    def _prepare_crawl(self) -> bool:
+        """Restart at front, if needed.
+        :return: Whether crawling is possible.
         """
         if self.imagecrawler.is_exhausted():
             if not self.restart_at_front_when_exhausted:
-                return 0
+                return False
             self.imagecrawler.reset()
+        return True
+
+    def crawl(self) -> int:
+        """Crawl for new images.
+        :return: Number of newly added images.
+        """
+        if not self._prepare_crawl():
+            return 0
+        crawl_started = monotonic()
         images = self.imagecrawler.crawl()
+        self.last_crawl_duration = monotonic() - crawl_started
+        self.count_crawls += 1
+        return self._add_images(images) if images else 0
+
+    async def crawl_async(self, executor: Optional[Executor] = None) -> int:
+        """Asynchronous variant of :meth:`crawl()`.
+        :return: Number of newly added images.
+        """
+        if not self._prepare_crawl():
+            return 0
+        crawl_started = monotonic()
+        images = await self.imagecrawler.crawl_async(executor)
+        self.last_crawl_duration = monotonic() - crawl_started
+        self.count_crawls += 1
         return self._add_images(images) if images else 0
 
     def _add_images(self, images: ImageCollection) -> int:
@@ -93,11 +464,18 @@ class Crawler:
         image_added = self.get_image_added()
         if is_image_addable:
             images = ImageCollection(filter(is_image_addable, images))
-        for image in images:
-            self.images.add(image)
-            if image_added:
-                image_added(image)
-        return len(images)
+        added = sum(self._add_image(image, image_added) for image in images)
+        if added:
+            self._stock_changed()
+        return added
+
+    def _add_image(self, image: Image, image_added: Optional[_OnImageAdded]) -> bool:
+        image.to_json()  # pre-encode off the serving path
+        if not self.images.add(image):
+            return False  # the pool had it already, or dropped it
+        if image_added:
+            image_added(image)
+        return True
 
     def fill_up_to(self, to: int, *,
                    filled_by: Optional[_OnFill] = None,
@@ -113,45 +491,240 @@ class Crawler:
                 sleep(delay)
 
     def get_random_image(self) -> Optional[Image]:
-        images = list(self.images)
-        return choice(images) if images else None
+        return self._images.get_random()
 
     def pop_random_image(self) -> Optional[Image]:
-        image = self.get_random_image()
-        if image:
-            self.images.discard(image)
+        image = self._images.pop_random()
+        if not self._images:
+            self._stock_changed()
         return image
 
 
+class _WeightedSampler:
+    """Sample indexes at random, with a probability proportional to their weight.
+
+    The weights are kept in a binary sum tree.
+    So sampling an index, as well as changing a single weight, takes O(log n).
+    """
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        size = 1
+        while size < len(weights):
+            size <<= 1
+        tree = [0.0] * (2 * size)
+        tree[size:size + len(weights)] = weights
+        for node in range(size - 1, 0, -1):
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+        self._size = size
+        self._len = len(weights)
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return self._len
+
+    def copy(self) -> '_WeightedSampler':
+        copy = _WeightedSampler(())
+        copy._size = self._size
+        copy._len = self._len
+        copy._tree = self._tree.copy()
+        return copy
+
+    @property
+    def total(self) -> float:
+        return self._tree[1]
+
+    def get_weight(self, index: int) -> float:
+        return self._tree[self._size + index]
+
+    def set_weight(self, index: int, weight: float) -> None:
+        if not 0 <= index < self._len:
+            raise IndexError(f'index {index} out of range')
+        tree = self._tree
+        node = self._size + index
+        tree[node] = weight
+        node >>= 1
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node >>= 1
+
+    def sample(self) -> Optional[int]:
+        """Get a random index. Indexes that weigh zero are never returned.
+        :return: `None` if all weights are zero.
+        """
+        tree = self._tree
+        if tree[1] <= 0:
+            return None
+        target = random() * tree[1]
+        node = 1
+        while node < self._size:
+            node <<= 1
+            left, right = tree[node], tree[node + 1]
+            # rounding errors must never lead into a zero-weighted subtree
+            if left <= 0 or (target >= left and right > 0):
+                target -= left
+                node += 1
+        return node - self._size
+
+
+def _invalidates_sampler(method: _F) -> _F:
+    @wraps(method)
+    def wrapper(self: 'CrawlerCollection', *args: Any, **kwargs: Any) -> Any:
+        # hold the lock across both, so no sampling is built from the list before the change and cached after it
+        with self._sampling_lock:
+            result = method(self, *args, **kwargs)
+            self._sampling = None
+        return result
+
+    return cast(_F, wrapper)
+
+
+def _stocked_weight(crawler: Crawler) -> float:
+    # the stock of a shared pool is changed by others, too - so it is assumed to be stocked
+    return crawler.weight if crawler.images.shared or crawler.images else 0.0
+
+
+class _CrawlerSampling:
+    def __init__(self, crawlers: Sequence[Crawler]) -> None:
+        self.crawlers = tuple(crawlers)
+        self.indexes = {crawler: index for index, crawler in enumerate(self.crawlers)}
+        self.all = _WeightedSampler([crawler.weight for crawler in self.crawlers])
+        self.stocked = _WeightedSampler([_stocked_weight(crawler) for crawler in self.crawlers])
+
+
 class CrawlerCollection(List[Crawler]):
+    """A list of crawlers, that can be sampled by the crawlers' weights.
+
+    The weights are cached when sampling.
+    Changing the list invalidates this cache - changing a crawler's `weight` does not.
+
+    Sampling can be limited to crawlers that have images - "stocked" crawlers.
+    Which crawlers are stocked is tracked via :meth:`update_stocked()`,
+    so it is not needed to look into all the crawlers' images when sampling.
+    Crawlers with a shared pool - see :attr:`BaseImagePool.shared` - are always sampled as stocked.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._sampling: Optional[_CrawlerSampling] = None
+        self._sampling_lock = Lock()
+
+    append = _invalidates_sampler(list.append)
+    extend = _invalidates_sampler(list.extend)
+    insert = _invalidates_sampler(list.insert)
+    remove = _invalidates_sampler(list.remove)
+    pop = _invalidates_sampler(list.pop)
+    clear = _invalidates_sampler(list.clear)
+    sort = _invalidates_sampler(list.sort)
+    reverse = _invalidates_sampler(list.reverse)
+    __setitem__ = _invalidates_sampler(list.__setitem__)
+    __delitem__ = _invalidates_sampler(list.__delitem__)
+    __iadd__ = _invalidates_sampler(list.__iadd__)
+    __imul__ = _invalidates_sampler(list.__imul__)
+
     def copy(self) -> 'CrawlerCollection':
         return CrawlerCollection(super().copy())
 
-    def get_random(self) -> Optional[Crawler]:
-        crawlers = self.copy()
-        if not crawlers:
-            return None
-        return choices(
-            crawlers,
-            weights=[crawler.weight for crawler in crawlers],
-            k=1
-        )[0]
-
-    def shuffle(self) -> Generator[Crawler, None, None]:
-        crawlers = self.copy()
-        while crawlers:
-            crawler = crawlers.get_random()
-            if crawler is None:
-                continue
-            yield crawler
-            crawlers.remove(crawler)
+    def _get_sampling(self) -> _CrawlerSampling:
+        # caller must hold the sampling lock
+        sampling = self._sampling
+        if sampling is None:
+            sampling = self._sampling = _CrawlerSampling(self)
+        return sampling
+
+    def update_stocked(self, crawler: Crawler) -> None:
+        """Track whether a crawler has images.
+        Must be called, whenever the crawler's images might have run out, or might have been restocked.
+        """
+        with self._sampling_lock:
+            sampling = self._sampling
+            if sampling is None:
+                return  # the next sampling will look up the current state
+            index = sampling.indexes.get(crawler)
+            if index is not None:
+                sampling.stocked.set_weight(index, _stocked_weight(crawler))
+
+    def has_stocked(self) -> bool:
+        with self._sampling_lock:
+            return self._get_sampling().stocked.total > 0
+
+    def get_random(self, *, stocked_only: bool = False) -> Optional[Crawler]:
+        with self._sampling_lock:
+            sampling = self._get_sampling()
+            index = (sampling.stocked if stocked_only else sampling.all).sample()
+        return None if index is None else sampling.crawlers[index]
+
+    def sample(self, count: int, *, stocked_only: bool = False) -> List[Crawler]:
+        """Weighted random sample of the crawlers - with replacement, so a crawler might be picked several times.
+        Takes O(log n) per crawler.
+        """
+        with self._sampling_lock:
+            sampling = self._get_sampling()
+            sampler = sampling.stocked if stocked_only else sampling.all
+            indexes = [sampler.sample() for _ in range(count)]
+        return [sampling.crawlers[index] for index in indexes if index is not None]
+
+    def shuffle(self, *, stocked_only: bool = False) -> Generator[Crawler, None, None]:
+        """Weighted random permutation of the crawlers.
+        Each crawler is yielded once. The permutation is evaluated lazily.
+
+        The first crawler is picked in O(log n).
+        Continuing the permutation takes a snapshot in O(n) once - and O(log n) per crawler.
+        """
+        with self._sampling_lock:
+            sampling = self._get_sampling()
+            sampler = sampling.stocked if stocked_only else sampling.all
+            index = sampler.sample()
+            if index is None:
+                return
+        yield sampling.crawlers[index]
+        with self._sampling_lock:
+            sampler = sampler.copy()
+        while index is not None:
+            sampler.set_weight(index, 0.0)
+            index = sampler.sample()
+            if index is not None:
+                yield sampling.crawlers[index]
 
 
 class NPCore:
+    """The core.
+
+    Crawlers are filled up by a pool of long-living worker threads.
+    A crawler is never filled up by more than one worker at a time.
+    The workers are started on demand, and shut down via :meth:`close`.
+
+    :param workers: Number of worker threads. Defaults to the default of :class:`ThreadPoolExecutor`.
+    :param blacklist: The blacklist to use. Defaults to an unbounded :class:`Blacklist`.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, *, workers: Optional[int] = None, blacklist: Optional[BaseBlacklist] = None) -> None:
+        if workers is not None and workers < 1:
+            raise ValueError('workers < 1')
         self.crawlers = CrawlerCollection()
-        self.blacklist = Blacklist()
+        self.blacklist = blacklist if blacklist is not None else Blacklist()
+        self._max_workers = workers
+        self._workers: Optional[ThreadPoolExecutor] = None
+        self._workers_lock = Lock()
+        self._fill_ups: Dict[Crawler, 'Future[Any]'] = {}
+        """pending or running jobs by crawler - a crawler has one at most"""
+        self._fill_ups_lock = Lock()
+
+    def _get_workers(self) -> ThreadPoolExecutor:
+        with self._workers_lock:
+            if self._workers is None:
+                self._workers = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                   thread_name_prefix=type(self).__name__)
+            return self._workers
+
+    def close(self) -> None:
+        """Shut down the workers - after they finished their jobs.
+
+        The core is still usable afterwards: the workers are started again on demand.
+        """
+        with self._workers_lock:
+            workers, self._workers = self._workers, None
+        if workers:
+            workers.shutdown(wait=True)
 
     def _is_image_not_in_blacklist(self, image: Image) -> bool:
         # must be compatible to: _IsImageAddable
@@ -162,6 +735,10 @@ class NPCore:
         if not image.is_generic:
             self.blacklist.add(image.uri)
 
+    def _update_stocked_crawler(self, crawler: Crawler) -> None:
+        # must be compatible to: _OnStockChanged
+        self.crawlers.update_stocked(crawler)
+
     def has_imagecrawler(self, imagecrawler: BaseImageCrawler) -> bool:
         return imagecrawler in (
             crawler.imagecrawler for crawler in self.crawlers
@@ -169,43 +746,218 @@ class NPCore:
 
     def add_imagecrawler(self, imagecrawler: BaseImageCrawler, *,
                          weight: _CrawlerWeight = 1.0,
-                         restart_at_front_when_exhausted: bool = False
+                         restart_at_front_when_exhausted: bool = False,
+                         images: Optional[BaseImagePool] = None
                          ) -> None:
+        """
+        :param images: The pool the crawler adds its images to. Defaults to a new :class:`ImagePool`.
+        """
         self.crawlers.append(
             Crawler(
                 imagecrawler,
                 weight=weight,
                 restart_at_front_when_exhausted=restart_at_front_when_exhausted,
                 is_image_addable=self._is_image_not_in_blacklist,
-                on_image_added=self._add_image_to_blacklist
+                on_image_added=self._add_image_to_blacklist,
+                on_stock_changed=self._update_stocked_crawler,
+                images=images
             )
         )
 
+    def _fill_up_done(self, crawler: Crawler, fill_up: 'Future[Any]') -> None:
+        with self._fill_ups_lock:
+            if self._fill_ups.get(crawler) is fill_up:
+                del self._fill_ups[crawler]
+        ex = fill_up.exception()
+        if ex:
+            _log('debug', 'Error during filling up %r: %s', crawler.imagecrawler, ex, exc_info=ex)
+            _log('error', 'Handled an error during filling up %s', crawler.imagecrawler)
+
+    def _submit_exclusive(self, crawler: Crawler, fn: Callable[..., Any], *args: Any, **kwargs: Any
+                          ) -> Tuple['Future[Any]', bool]:
+        """Submit a job for a crawler to the workers - unless the crawler has a pending or running job.
+        :return: The crawler's pending or running job, and whether it was submitted just now.
+        """
+        with self._fill_ups_lock:
+            fill_up = self._fill_ups.get(crawler)
+            if fill_up is not None and not fill_up.done():
+                # a done job might not have been cleaned up by its callback, yet
+                return fill_up, False
+            fill_up = self._fill_ups[crawler] = self._get_workers().submit(fn, *args, **kwargs)
+        # outside the lock: callback is called immediately, if already done
+        fill_up.add_done_callback(partial(self._fill_up_done, crawler))
+        return fill_up, True
+
+    def fill_up_crawler(self, crawler: Crawler, to: int, *,
+                        on_refill: Optional[_OnFill],
+                        delay: float = _FILLUP_DELAY_DEFAULT) -> 'Future[Any]':
+        """Submit the filling up of a crawler to the workers.
+
+        If the crawler is still filling up, it is not submitted again.
+        :return: The pending or running fill-up.
+        """
+        fill_up, _ = self._submit_exclusive(crawler, crawler.fill_up_to, to, filled_by=on_refill, delay=delay)
+        return fill_up
+
+    @staticmethod
+    def _crawl_crawler(crawler: Crawler, on_refill: Optional[_OnFill]) -> int:
+        refilled = crawler.crawl()
+        if on_refill:
+            on_refill(crawler, refilled)
+        return refilled
+
+    def crawl_crawler(self, crawler: Crawler, *,
+                      on_refill: Optional[_OnFill] = None) -> Optional['Future[int]']:
+        """Submit crawling a single page for a crawler to the workers.
+
+        If the crawler is still filling up, it is not submitted.
+        :return: The pending crawl, which results in the number of newly added images.
+            `None` if not submitted.
+        """
+        crawl, submitted = self._submit_exclusive(crawler, self._crawl_crawler, crawler, on_refill)
+        return crawl if submitted else None
+
     def fill_up_to(self, to: int, *,
                    on_refill: Optional[_OnFill],
-                   delay: float = _FILLUP_DELAY_DEFAULT) -> None:
-        fill_treads: List[Thread] = []
-        for crawler in self.crawlers.copy():
-            fill_tread = Thread(target=crawler.fill_up_to,
-                                args=(to,),
-                                kwargs={'filled_by': on_refill, 'delay': delay},
-                                daemon=True)
-            fill_treads.append(fill_tread)
-            fill_tread.start()
-        for fill_tread in fill_treads:
-            fill_tread.join()
-
-    def reset(self) -> int:
+                   delay: float = _FILLUP_DELAY_DEFAULT,
+                   wait: bool = True) -> None:
+        """Fill up all crawlers.
+        :param wait: Whether to wait until all crawlers are filled up.
         """
-        :return: Length of blacklist before a reset.
+        fill_ups = [
+            self.fill_up_crawler(crawler, to, on_refill=on_refill, delay=delay)
+            for crawler in self.crawlers.copy()
+        ]
+        if wait:
+            wait_futures(fill_ups)
+
+    def reset(self, *, forget_oldest_only: bool = False) -> int:
+        """
+        :param forget_oldest_only: Forget the oldest generation of the blacklist only.
+            Otherwise, the blacklist is cleared. See :meth:`Blacklist.forget_oldest`.
+        :return: Number of blacklist entries that were forgotten.
         """
-        reset_treads: List[Thread] = []
         for crawler in self.crawlers.copy():
-            reset_tread = Thread(target=crawler.reset, daemon=True)
-            reset_treads.append(reset_tread)
-            reset_tread.start()
+            # does not crawl, so there is no reason to bother the workers
+            crawler.reset()
+        if forget_oldest_only:
+            return self.blacklist.forget_oldest()
         blacklist_len = len(self.blacklist)
         self.blacklist.clear()
-        for reset_tread in reset_treads:
-            reset_tread.join()
         return blacklist_len
+
+
+class AsyncNPCore(NPCore):
+    """A core, that fills its crawlers in an asyncio event loop - instead of a worker per crawler.
+
+    At most `max_concurrency` crawlers are crawling at the same time.
+    ImageCrawlers that implement :meth:`BaseImageCrawler._crawl_async()` are crawled in the event loop,
+    all others are crawled by `max_concurrency` workers.
+
+    The sync :meth:`fill_up_to()` runs in an event loop of its own, that lives in a background thread.
+    A crawler is never filled up by more than one job at a time - no matter if sync or async.
+    """
+
+    def __init__(self, *, max_concurrency: int = 8, blacklist: Optional[BaseBlacklist] = None) -> None:
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency < 1')
+        super().__init__(workers=max_concurrency, blacklist=blacklist)
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[AbstractEventLoop] = None
+        self._loop_thread: Optional[Thread] = None
+        self._loop_lock = Lock()
+
+    async def _fill_up_crawler(self, crawler: Crawler, to: int, semaphore: AsyncSemaphore, *,
+                               on_refill: Optional[_OnFill],
+                               delay: float) -> None:
+        # registered like the jobs of the workers, so they are mutually exclusive
+        fill_up: 'Future[Any]' = Future()
+        with self._fill_ups_lock:
+            running = self._fill_ups.get(crawler)
+            if running is not None and not running.done():
+                return
+            self._fill_ups[crawler] = fill_up
+        fill_up.set_running_or_notify_cancel()
+        try:
+            await self.__fill_up_crawler(crawler, to, semaphore, on_refill=on_refill, delay=delay)
+        finally:
+            fill_up.set_result(None)
+            self._fill_up_done(crawler, fill_up)
+
+    async def __fill_up_crawler(self, crawler: Crawler, to: int, semaphore: AsyncSemaphore, *,
+                                on_refill: Optional[_OnFill],
+                                delay: float) -> None:
+        while len(crawler.images) < to:
+            async with semaphore:
+                refilled = await crawler.crawl_async(self._get_workers())
+            if on_refill:
+                on_refill(crawler, refilled)
+            if refilled == 0:
+                break  # while
+            if len(crawler.images) < to and delay > 0:
+                # be nice, give the source some rest after crawling
+                await async_sleep(delay)
+
+    async def fill_up_to_async(self, to: int, *,
+                               on_refill: Optional[_OnFill],
+                               delay: float = _FILLUP_DELAY_DEFAULT) -> None:
+        """Fill up all crawlers. Crawlers that are still filling up are skipped."""
+        semaphore = AsyncSemaphore(self.max_concurrency)
+        await gather(*(
+            self._fill_up_crawler(crawler, to, semaphore, on_refill=on_refill, delay=delay)
+            for crawler in self.crawlers.copy()
+        ))
+
+    async def keep_filled_up_to(self, to: int, stop: AsyncEvent, *,
+                                on_refill: Optional[_OnFill],
+                                delay: float = _FILLUP_DELAY_DEFAULT,
+                                interval: float = 1.0) -> None:
+        """Keep all crawlers filled up, until `stop` is set.
+
+        Each crawler is filled up on its own schedule: `interval` seconds after its last fill-up finished.
+        So a slow source does not hold back the others.
+        """
+        semaphore = AsyncSemaphore(self.max_concurrency)
+
+        async def keep_filled_up(crawler: Crawler) -> None:
+            while not stop.is_set():
+                await self._fill_up_crawler(crawler, to, semaphore, on_refill=on_refill, delay=delay)
+                try:
+                    await wait_for(stop.wait(), interval)
+                except AsyncTimeoutError:
+                    pass
+
+        await gather(*(keep_filled_up(crawler) for crawler in self.crawlers.copy()))
+
+    def _get_loop(self) -> AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = new_event_loop()
+                thread = Thread(target=loop.run_forever, name=f'{type(self).__name__}_loop', daemon=True)
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+            return self._loop
+
+    def close(self) -> None:
+        """Stop the event loop of the sync :meth:`fill_up_to()` - and shut down the workers.
+
+        The core is still usable afterwards: event loop and workers are started again on demand.
+        """
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+            thread, self._loop_thread = self._loop_thread, None
+        if loop and thread:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        super().close()
+
+    def fill_up_to(self, to: int, *,
+                   on_refill: Optional[_OnFill],
+                   delay: float = _FILLUP_DELAY_DEFAULT,
+                   wait: bool = True) -> None:
+        fill_up = run_coroutine_threadsafe(
+            self.fill_up_to_async(to, on_refill=on_refill, delay=delay),
+            self._get_loop())
+        if wait:
+            fill_up.result()
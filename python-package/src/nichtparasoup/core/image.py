@@ -1,9 +1,14 @@
-__all__ = ["Image", "ImageCollection", "ImageUri", "SourceUri"]
-
-from typing import Any, Set, Union
+__all__ = ["Image", "ImageCollection", "BaseImagePool", "ImagePool", "ImageUri", "SourceUri"]
+
+import sys
+from abc import abstractmethod
+from json import dumps as json_dumps, loads as json_loads
+from random import randrange
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, MutableSet, Optional, Set, Union
 from uuid import uuid4
 
-from .._internals import _type_module_name_str
+from .._internals import _json_dumps, _type_module_name_str
 
 ImageUri = str
 
@@ -59,6 +64,17 @@ class Image:
         self.more = more
         self.is_generic = is_generic
         self.__hash = hash(uuid4() if self.is_generic else self.uri)
+        self.__json: Optional[bytes] = None
+
+    def to_json(self) -> bytes:
+        """Encode as JSON object: uri, is_generic, source, more.
+
+        The encoding is done once and cached - an image is not to be changed once it was crawled.
+        """
+        if self.__json is None:
+            dumped = dict(uri=self.uri, is_generic=self.is_generic, source=self.source, more=self.more)
+            self.__json = _json_dumps(dumped, default=_json_default)
+        return self.__json
 
     def __hash__(self) -> int:
         return self.__hash
@@ -83,3 +99,125 @@ class Image:
 class ImageCollection(Set[Image]):
     def copy(self) -> 'ImageCollection':
         return ImageCollection(super().copy())
+
+
+class BaseImagePool(MutableSet[Image]):
+    """A set of images, that supports picking and popping a random image.
+
+    A :class:`nichtparasoup.core.Crawler` adds the images it crawled to its pool,
+    the server picks and pops random images from it.
+
+    Implementations are intended to be thread safe.
+    """
+
+    shared = False
+    """Whether other processes change the pool, too - so its stock cannot be tracked in this process."""
+
+    @abstractmethod
+    def add(self, image: Image) -> bool:  # type: ignore[override]
+        """Add an image - unlike :meth:`MutableSet.add()`, this tells if it was added.
+        :return: Whether the image was added. `False` if it was in the pool already, or the pool dropped it.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_random(self) -> Optional[Image]:
+        """Get a random image - without removing it. `None` if the pool is empty."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def pop_random(self) -> Optional[Image]:
+        """Remove and return a random image. `None` if the pool is empty."""
+        raise NotImplementedError()
+
+    def copy(self) -> 'ImagePool':
+        """Copy the images to a local :class:`ImagePool`."""
+        return ImagePool(self)
+
+
+class ImagePool(BaseImagePool):
+    """A set of images, that supports picking and popping a random image in constant time.
+
+    Images are kept in an array, next to a map of each image's position in that array.
+    Removing an image moves the last image of the array into the freed position.
+
+    This class is intended to be thread safe.
+    """
+
+    def __init__(self, images: Iterable[Image] = ()) -> None:
+        self._images: List[Image] = []
+        self._positions: Dict[Image, int] = {}
+        self._lock = Lock()
+        for image in images:
+            self.add(image)
+
+    def __contains__(self, image: object) -> bool:
+        return image in self._positions
+
+    def __iter__(self) -> Iterator[Image]:
+        with self._lock:
+            images = self._images.copy()
+        return iter(images)
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __sizeof__(self) -> int:
+        return super().__sizeof__() + sys.getsizeof(self._images) + sys.getsizeof(self._positions)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f'{type(self).__name__}({self._images!r})'
+
+    def add(self, image: Image) -> bool:  # type: ignore[override]
+        with self._lock:
+            if image in self._positions:
+                return False
+            self._positions[image] = len(self._images)
+            self._images.append(image)
+            return True
+
+    def discard(self, image: Image) -> None:
+        with self._lock:
+            position = self._positions.get(image)
+            if position is not None:
+                self._remove_at(position)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._positions.clear()
+
+    def _remove_at(self, position: int) -> Image:
+        # caller must hold the lock
+        image = self._images[position]
+        last = self._images.pop()
+        del self._positions[image]
+        if last is not image:
+            self._images[position] = last
+            self._positions[last] = position
+        return image
+
+    def get_random(self) -> Optional[Image]:
+        with self._lock:
+            return self._images[randrange(len(self._images))] if self._images else None
+
+    def pop_random(self) -> Optional[Image]:
+        with self._lock:
+            return self._remove_at(randrange(len(self._images))) if self._images else None
+
+
+def _json_default(value: Any) -> Any:
+    # images' `more` might contain sets - see :class:`Image`
+    return list(value) if isinstance(value, (set, frozenset)) else str(value)
+
+
+def _encode_image(image: Image, *extra: Any) -> bytes:
+    """Encode as JSON: uri, is_generic, source, more - followed by `extra`, which is ignored on decode."""
+    return json_dumps([image.uri, image.is_generic, image.source, image.more, *extra],
+                      separators=(',', ':'), default=_json_default).encode()
+
+
+def _decode_image(encoded: bytes) -> Image:
+    """Decode what :func:`_encode_image` returned."""
+    uri, is_generic, source, more = json_loads(encoded)[:4]
+    return Image(uri=uri, source=source, is_generic=is_generic, **more)
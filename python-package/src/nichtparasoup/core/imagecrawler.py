@@ -1,22 +1,28 @@
 __all__ = [
-    "ImageCrawlerConfig",
+    "ImageCrawlerConfig", "ImageCrawlerState",
     "BaseImageCrawler",
-    "ImageCrawlerInfo", "RemoteFetcher", "ImageRecognizer"
+    "ImageCrawlerInfo", "RemoteFetcher", "JsonItems", "ImageRecognizer"
 ]
 
 import os
 from abc import ABC, abstractmethod
+from asyncio import get_event_loop
+from codecs import getincrementaldecoder
+from concurrent.futures import Executor
 from http.client import HTTPResponse
+from json import JSONDecodeError, JSONDecoder, dumps as json_dumps
 from pathlib import Path, PurePath
+from re import compile as re_compile
 from threading import Lock
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple, Union
 from urllib.parse import urlparse
-from urllib.request import Request, urlopen
+from urllib.request import Request
 from urllib.response import addinfourl
 from uuid import uuid4
 
 from .._internals import _log, _type_module_name_str
-from .image import ImageCollection
+from .image import ImageCollection, _json_default
+from .transport import BaseTransport, get_default_transport
 
 _ImageCrawlerConfigKey = str
 
@@ -53,6 +59,17 @@ class ImageCrawlerConfig(Dict[_ImageCrawlerConfigKey, Any]):
     ...
 
 
+class ImageCrawlerState(Dict[str, Any]):
+    """State of crawling, like the cursor of paging.
+
+    Values are intended to be JSON-serializable: string, int, float, list, dict, bool, None.
+
+    .. seealso:: :method:`BaseImageCrawler.get_state()`
+
+    """
+    ...
+
+
 class BaseImageCrawler(ABC):
     _np_name: Optional[str] = None
     """Internal name used in nichtparasoup configs.
@@ -115,25 +132,97 @@ class BaseImageCrawler(ABC):
         self._reset_before_next_crawl = True
         _log('debug', 'crawler reset planned for %r', self)
 
+    def _prepare_crawl(self) -> bool:
+        """Reset if planned.
+        Caller must hold the crawl lock.
+        :return: Whether crawling is possible.
+        """
+        if self._reset_before_next_crawl:
+            _log('debug', 'Crawler resetting %r', self)
+            self._reset()
+            self._reset_before_next_crawl = False
+        if self.is_exhausted():
+            _log('debug', 'Prevented exhausted crawling %s', self)
+            return False
+        _log('debug', 'Crawling started %r', self)
+        return True
+
+    def _crawl_failed(self, ex: Exception) -> ImageCollection:
+        _log('debug', 'Error during crawling %r: %s', self, ex, exc_info=ex)
+        _log('error', 'Handled an error during crawling %s', self)
+        return ImageCollection()
+
     def crawl(self) -> ImageCollection:
         with self._crawl_lock:
-            if self._reset_before_next_crawl:
-                _log('debug', 'Crawler resetting %r', self)
-                self._reset()
-                self._reset_before_next_crawl = False
-            if self.is_exhausted():
-                _log('debug', 'Prevented exhausted crawling %s', self)
+            if not self._prepare_crawl():
                 return ImageCollection()
-            _log('debug', 'Crawling started %r', self)
             try:
                 crawled = self._crawl()
             except Exception as ex:
-                _log('debug', 'Error during crawling %r: %s', self, ex, exc_info=ex)
-                _log('error', 'Handled an error during crawling %s', self)
-                return ImageCollection()
+                return self._crawl_failed(ex)
             _log('debug', 'Crawling finished %r', self)
             return crawled
 
+    def get_state(self) -> ImageCrawlerState:
+        """Get the state of crawling - so it can be checkpointed, or migrated to another process.
+
+        Waits for a running crawl to finish.
+        An empty state means: start at front.
+        """
+        with self._crawl_lock:
+            if self._reset_before_next_crawl:
+                return ImageCrawlerState()
+            return self._get_state()
+
+    def set_state(self, state: ImageCrawlerState) -> None:
+        """Continue crawling from a state that was returned by :meth:`get_state()` - of an equal ImageCrawler.
+
+        Waits for a running crawl to finish.
+        :raise ValueError: If the state is invalid.
+        """
+        with self._crawl_lock:
+            if not state:
+                self._reset()
+            else:
+                try:
+                    self._set_state(state)
+                except (KeyError, TypeError) as ex:
+                    raise ValueError(f'invalid state {state!r}') from ex
+            self._reset_before_next_crawl = False
+        _log('debug', 'Crawler state set for %r', self)
+
+    def is_crawl_async_native(self) -> bool:
+        """Whether this ImageCrawler implements :meth:`_crawl_async()`."""
+        return type(self)._crawl_async is not BaseImageCrawler._crawl_async
+
+    async def crawl_async(self, executor: Optional[Executor] = None) -> ImageCollection:
+        """Asynchronous variant of :meth:`crawl()`.
+
+        If this ImageCrawler implements :meth:`_crawl_async()`, it is crawled in the running event loop.
+        A concurrent crawl is not waited for, but an empty result is returned.
+
+        Otherwise :meth:`crawl()` is run in the `executor` - or the event loop's default executor.
+        """
+        if not self.is_crawl_async_native():
+            return await get_event_loop().run_in_executor(executor, self.crawl)
+        if not self._crawl_lock.acquire(blocking=False):
+            _log('debug', 'Prevented concurrent crawling %r', self)
+            return ImageCollection()
+        try:
+            return await self.__crawl_async_locked()
+        finally:
+            self._crawl_lock.release()
+
+    async def __crawl_async_locked(self) -> ImageCollection:
+        if not self._prepare_crawl():
+            return ImageCollection()
+        try:
+            crawled = await self._crawl_async()
+        except Exception as ex:
+            return self._crawl_failed(ex)
+        _log('debug', 'Crawling finished %r', self)
+        return crawled
+
     @classmethod
     @abstractmethod
     def info(cls) -> ImageCrawlerInfo:
@@ -196,11 +285,50 @@ class BaseImageCrawler(ABC):
         """
         raise NotImplementedError()
 
+    def _get_state(self) -> ImageCrawlerState:
+        """This function is intended to return the state of crawling, like the cursor of paging.
+
+        Implementing this is optional - if the ImageCrawler has a state.
+        Caller holds the crawl lock.
+        """
+        return ImageCrawlerState()
+
+    def _set_state(self, state: ImageCrawlerState) -> None:
+        """This function is intended to restore a non-empty state that was returned by :meth:`_get_state()`.
+
+        Implementing this is optional - if the ImageCrawler has a state.
+        Caller holds the crawl lock.
+        :raises: ValueError, KeyError, TypeError if the state is invalid.
+        """
+        return None
+
+    async def _crawl_async(self) -> ImageCollection:  # pragma: no cover
+        """This function is intended to find and fetch ImageURIs, without blocking the running event loop.
+
+        Implementing this is optional.
+        If not implemented, :meth:`crawl_async()` falls back to :meth:`_crawl()` in an executor.
+        :raises: can raise arbitrary errors.
+        """
+        raise NotImplementedError()
+
+
+def _imagecrawler_key(imagecrawler: BaseImageCrawler) -> str:
+    """Identify an ImageCrawler by its type and config - across processes and runs."""
+    return json_dumps([_type_module_name_str(type(imagecrawler)), imagecrawler.get_config()],
+                      sort_keys=True, default=_json_default)
+
 
 _DebugStoreDir = Union[str, os.PathLike]
 
 
 class RemoteFetcher:
+    """Fetch remote resources.
+
+    :param transport: The transport to open requests with.
+        Defaults to the process-wide transport, that keeps connections alive -
+        see :func:`nichtparasoup.core.transport.get_default_transport()`.
+    """
+
     ENV_STOREDIR = 'NP_DEBUG_REMOTEFETCHER_STOREDIR'
 
     _HEADERS_DEFAULT = {
@@ -209,9 +337,11 @@ class RemoteFetcher:
 
     def __init__(self, *,
                  timeout: float = 10.0,
-                 headers: Optional[Dict[str, str]] = None
+                 headers: Optional[Dict[str, str]] = None,
+                 transport: Optional[BaseTransport] = None
                  ) -> None:
         self._timeout = timeout
+        self._transport = transport
         self._headers = self._HEADERS_DEFAULT.copy()
         if headers:
             self._headers.update(headers)
@@ -250,16 +380,17 @@ class RemoteFetcher:
             fp_meta.write('\n')
             fp_meta.writelines(f'{header}: {value}\n' for header, value in response.getheaders())
             fp_meta.write('\n')
-        response_fp = response.fp  # type: ignore[attr-defined]
-        if response_fp:
+        if not response.isclosed():
             with open(file, 'ab') as fp_data:
                 fp_pos = fp_data.tell()
-                fp_data.write(response_fp.read())
-            response_fp.close()
+                # read decoded and completely - so a kept-alive connection is released
+                fp_data.write(response.read())
             fp_data = open(file, 'rb')
             fp_data.seek(fp_pos)
             fp_data.seekable = lambda: False  # type: ignore[assignment]
             response.fp = fp_data  # type: ignore[attr-defined]
+            response.length = None
+            response.chunked = False  # type: ignore[attr-defined]
 
     def get_stream(self, uri: _Uri) -> Tuple[Union[HTTPResponse, addinfourl], _Uri]:
         if not self._valid_uri(uri):
@@ -267,7 +398,7 @@ class RemoteFetcher:
         _log('debug', 'Fetch remote %r in %ss with %r', uri, self._timeout, self._headers)
         request = Request(uri, headers=self._headers)
         try:
-            response: Union[HTTPResponse, addinfourl] = urlopen(request, timeout=self._timeout)
+            response = (self._transport or get_default_transport()).open(request, self._timeout)
         except Exception as ex:
             _log('debug', 'Caught error on fetch remote %r', uri, exc_info=ex)
             raise RemoteFetchError(str(ex), uri) from ex
@@ -288,6 +419,116 @@ class RemoteFetcher:
         response.close()
         return response_string, actual_uri
 
+    def get_json_items(self, uri: _Uri, path: Sequence[str], charset_fallback: str = 'UTF-8') -> 'JsonItems':
+        """Stream the items of a JSON array, that is nested in objects.
+
+        :param path: Keys of the objects, down to the array. Like `('data', 'children')`.
+        """
+        response, actual_uri = self.get_stream(uri)
+        charset = str(response.info().get_param('charset', charset_fallback))
+        return JsonItems(response, charset, path, actual_uri)
+
+
+_JSON_WHITESPACE = re_compile(r'[ \t\n\r]*')
+
+
+class JsonItems(Iterator[Any]):
+    """Iterate the items of a JSON array, that is nested in objects - while the JSON document is read.
+
+    Only the current item is kept in memory, not the whole array.
+    All other values of the document are collected in :attr:`document` -
+    which is complete when the iteration is done.
+    The array itself appears as an empty list in :attr:`document`.
+    """
+
+    _CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, response: Union[HTTPResponse, addinfourl], charset: str, path: Sequence[str], uri: _Uri
+                 ) -> None:
+        self.uri = uri
+        self.document: Dict[str, Any] = {}
+        self._response = response
+        self._decoder = getincrementaldecoder(charset)()
+        self._json_decoder = JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._items = self.__items(path)
+
+    def __next__(self) -> Any:
+        return next(self._items)
+
+    def __items(self, path: Sequence[str]) -> Iterator[Any]:
+        try:
+            yield from self._object(path, self.document)
+        finally:
+            self._response.close()
+
+    def _object(self, path: Sequence[str], target: Dict[str, Any]) -> Iterator[Any]:
+        self._expect('{')
+        while not self._next_is('}'):
+            key = self._value()
+            self._expect(':')
+            if path and key == path[0]:
+                target[key] = {} if len(path) > 1 else []
+                yield from (self._object(path[1:], target[key]) if len(path) > 1 else self._array())
+            else:
+                target[key] = self._value()
+            self._next_is(',')
+
+    def _array(self) -> Iterator[Any]:
+        self._expect('[')
+        while not self._next_is(']'):
+            yield self._value()
+            self._next_is(',')
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buffer) or not self._read():
+                break
+
+    def _next_is(self, char: str) -> bool:
+        """Skip whitespace, and consume the next char if it is `char`."""
+        self._skip_whitespace()
+        is_char = self._buffer.startswith(char, self._pos)
+        if is_char:
+            self._pos += 1
+        return is_char
+
+    def _expect(self, char: str) -> None:
+        if not self._next_is(char):
+            raise JSONDecodeError(f'Expecting {char!r}', self._buffer, self._pos)
+
+    def _value(self) -> Any:
+        self._skip_whitespace()
+        value, end = self._decode()
+        # a number at the end of the buffer might continue in the next chunk
+        while end == len(self._buffer) and self._read():
+            value, end = self._decode()
+        self._pos = end
+        return value
+
+    def _decode(self) -> Tuple[Any, int]:
+        while True:
+            try:
+                return self._json_decoder.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError:
+                if not self._read():
+                    raise
+
+    def _read(self) -> bool:
+        """Read the next chunk into the buffer - dropping the consumed part.
+        :return: Whether there might be more to read.
+        """
+        if self._eof:
+            return False
+        chunk = self._response.read(self._CHUNK_SIZE)
+        self._eof = not chunk
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(chunk, final=self._eof)
+        self._pos = 0
+        return True
+
 
 class RemoteFetchError(Exception):
 
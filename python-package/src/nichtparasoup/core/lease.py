@@ -0,0 +1,185 @@
+__all__ = ["BaseLeases", "FileLeases", "preferred_node"]
+
+import os
+from abc import ABC, abstractmethod
+from hashlib import blake2b
+from socket import gethostname
+from threading import Lock
+from typing import Dict, Iterable, Optional, Set
+from uuid import uuid4
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+def preferred_node(nodes: Iterable[str], name: str) -> str:
+    """Pick the node that is preferred to hold a lease - via rendezvous hashing.
+
+    All nodes agree on it, as long as they agree on the nodes.
+    When a node leaves, only its leases move to other nodes.
+    """
+    return max(nodes, key=lambda node: blake2b(f'{node}\n{name}'.encode(), digest_size=8).digest())
+
+
+class BaseLeases(ABC):
+    """Exclusive, time-limited leases - so several nodes coordinate which one does what.
+
+    Nodes announce that they are alive via :meth:`heartbeat`.
+
+    :param node: Name of this node. Must be unique among the nodes. Defaults to a random one.
+    """
+
+    def __init__(self, node: Optional[str] = None) -> None:
+        self.node = node or f'{gethostname()}-{os.getpid()}-{uuid4().hex[:8]}'
+
+    @abstractmethod
+    def acquire(self, name: str, ttl: float) -> bool:
+        """Acquire a lease, or renew it if this node holds it already.
+
+        :param ttl: Number of seconds the lease is held at least - unless released.
+        :return: Whether this node holds the lease.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def release(self, name: str) -> None:
+        """Release a lease - if this node holds it."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def holder(self, name: str) -> Optional[str]:
+        """Get the node that holds a lease. `None` if nobody does."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def heartbeat(self, ttl: float) -> None:
+        """Announce that this node is alive - for at least `ttl` seconds."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def nodes(self) -> Set[str]:
+        """Get the nodes that are alive - see :meth:`heartbeat`. Includes this node."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release all leases and leave the nodes."""
+        raise NotImplementedError()
+
+
+class FileLeases(BaseLeases):
+    """Leases via file locks - for nodes on the same host.
+
+    A lease is held as long as the node holds the lock of its file, so leases do not time out.
+    The operating system releases the locks when a node dies - so other nodes take over right away.
+
+    Requires `fcntl`, which is available on POSIX systems.
+
+    :param directory: Directory to keep the lock files in. Nodes that use the same directory coordinate.
+    """
+
+    def __init__(self, directory: str, node: Optional[str] = None) -> None:
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError('file leases require fcntl')
+        super().__init__(node)
+        self._directory = directory
+        self._nodes_directory = os.path.join(directory, 'nodes')
+        os.makedirs(self._nodes_directory, exist_ok=True)
+        self._held: Dict[str, int] = {}
+        """lock file descriptors by name"""
+        self._lock = Lock()
+
+    def _lease_file(self, name: str) -> str:
+        return os.path.join(self._directory, f'{name}.lease')
+
+    def _node_file(self, node: str) -> str:
+        return os.path.join(self._nodes_directory, f'{node}.node')
+
+    @classmethod
+    def _try_lock(cls, file: str) -> Optional[int]:
+        """:return: The file descriptor, if locked."""
+        while True:
+            fd = os.open(file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return None
+            if cls._is_linked(fd, file):
+                return fd
+            # another node removed the file after it was opened - a lock on the removed file is worthless
+            os.close(fd)
+
+    @staticmethod
+    def _is_linked(fd: int, file: str) -> bool:
+        """Whether the file descriptor still refers to the file at that path."""
+        try:
+            linked = os.stat(file)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(fd)
+        return (linked.st_dev, linked.st_ino) == (opened.st_dev, opened.st_ino)
+
+    @staticmethod
+    def _write(fd: int, content: str) -> None:
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, content.encode(), 0)
+
+    def _hold(self, key: str, file: str) -> bool:
+        with self._lock:
+            if key in self._held:
+                return True
+            fd = self._try_lock(file)
+            if fd is None:
+                return False
+            self._write(fd, self.node)
+            self._held[key] = fd
+            return True
+
+    def _unhold(self, key: str) -> None:
+        with self._lock:
+            fd = self._held.pop(key, None)
+        if fd is not None:
+            self._write(fd, '')
+            os.close(fd)
+
+    def acquire(self, name: str, ttl: float) -> bool:
+        return self._hold(name, self._lease_file(name))
+
+    def release(self, name: str) -> None:
+        self._unhold(name)
+
+    def holder(self, name: str) -> Optional[str]:
+        try:
+            with open(self._lease_file(name)) as file:
+                return file.read() or None
+        except FileNotFoundError:
+            return None
+
+    def heartbeat(self, ttl: float) -> None:
+        self._hold('\0node', self._node_file(self.node))
+
+    def nodes(self) -> Set[str]:
+        nodes = {self.node}
+        for file in os.listdir(self._nodes_directory):
+            node, ext = os.path.splitext(file)
+            if ext == '.node' and node != self.node and self._is_node_alive(node):
+                nodes.add(node)
+        return nodes
+
+    def _is_node_alive(self, node: str) -> bool:
+        fd = self._try_lock(self._node_file(node))
+        if fd is None:
+            return True
+        # nobody holds it: the node is gone
+        os.remove(self._node_file(node))
+        os.close(fd)
+        return False
+
+    def close(self) -> None:
+        with self._lock:
+            keys = list(self._held)
+        for key in keys:
+            self._unhold(key)
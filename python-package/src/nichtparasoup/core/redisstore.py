@@ -0,0 +1,280 @@
+__all__ = ["RedisStore", "RedisImagePool", "RedisBlacklist", "RedisLeases"]
+
+from hashlib import blake2b
+from math import ceil
+from threading import Lock
+from time import time
+from typing import Any, Iterator, List, Optional, Set
+from uuid import uuid4
+
+from . import BaseBlacklist
+from .image import BaseImagePool, Image, ImageUri, _decode_image, _encode_image
+from .imagecrawler import BaseImageCrawler, _imagecrawler_key
+from .lease import BaseLeases
+
+try:
+    from redis import Redis
+except ImportError:  # pragma: no cover
+    Redis = None  # type: ignore
+
+_RedisClient = Any
+"""A client like :class:`redis.Redis`, that speaks the commands
+DEL, EXPIREAT, GET, PEXPIRE, SADD, SCAN, SCARD, SET, SISMEMBER, SMEMBERS, SPOP, SRANDMEMBER and SREM -
+pipelines them via ``pipeline()``, and runs Lua scripts via ``register_script()`` - EVAL and EVALSHA.
+"""
+
+
+class RedisStore:
+    """Storage in a Redis server - so several nichtparasoup nodes share their images and their blacklist.
+
+    Since they are shared, clearing them - like a reset of the server does - applies to all nodes.
+
+    :param redis: The client.
+    :param prefix: Prefix of all keys. Nodes with the same prefix share their storage.
+    """
+
+    def __init__(self, redis: _RedisClient, prefix: str = 'nichtparasoup') -> None:
+        self.redis = redis
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = 'nichtparasoup') -> 'RedisStore':
+        """Connect to a Redis server via URL - like ``redis://localhost:6379/0``.
+
+        Requires the optional package `redis`.
+        """
+        if Redis is None:
+            raise ImportError('Redis support requires the package "redis". Install "nichtparasoup[redis]".')
+        return cls(Redis.from_url(url), prefix)
+
+    def image_pool(self, imagecrawler: BaseImageCrawler) -> 'RedisImagePool':
+        """Get the image pool for a crawler. Nodes share the pools of equal ImageCrawlers."""
+        key = blake2b(_imagecrawler_key(imagecrawler).encode(), digest_size=16).hexdigest()
+        return RedisImagePool(self.redis, f'{self.prefix}:images:{key}')
+
+    def blacklist(self, *, window: Optional[float] = None, generations: int = 2) -> 'RedisBlacklist':
+        """Get the blacklist - see :class:`RedisBlacklist`."""
+        return RedisBlacklist(self.redis, f'{self.prefix}:blacklist', window=window, generations=generations)
+
+    def leases(self, node: Optional[str] = None) -> 'RedisLeases':
+        """Get the leases - see :class:`RedisLeases`."""
+        return RedisLeases(self.redis, f'{self.prefix}:leases', node)
+
+
+class RedisImagePool(BaseImagePool):
+    """An image pool in a Redis set.
+
+    Images are stored encoded as JSON: uri, is_generic, source, more.
+    Generic images get a random suffix, so they are always distinct.
+    Picking and popping a random image is done via SRANDMEMBER and SPOP - so each image is served once, across nodes.
+    The pool is shared: other nodes refill it, too.
+
+    :param redis: The client.
+    :param key: Key of the set.
+    """
+
+    shared = True
+
+    def __init__(self, redis: _RedisClient, key: str) -> None:
+        self._redis = redis
+        self.key = key
+
+    @staticmethod
+    def _encode(image: Image) -> bytes:
+        return _encode_image(image, uuid4().hex) if image.is_generic else _encode_image(image)
+
+    def __contains__(self, image: object) -> bool:
+        if not isinstance(image, Image) or image.is_generic:
+            return False
+        return bool(self._redis.sismember(self.key, _encode_image(image)))
+
+    def __iter__(self) -> Iterator[Image]:
+        return map(_decode_image, self._redis.smembers(self.key))
+
+    def __len__(self) -> int:
+        return int(self._redis.scard(self.key))
+
+    def add(self, image: Image) -> bool:  # type: ignore[override]
+        return bool(self._redis.sadd(self.key, self._encode(image)))
+
+    def discard(self, image: Image) -> None:
+        if not image.is_generic:
+            self._redis.srem(self.key, _encode_image(image))
+
+    def clear(self) -> None:
+        """Remove all images - for all nodes that share the pool."""
+        self._redis.delete(self.key)
+
+    def get_random(self) -> Optional[Image]:
+        encoded = self._redis.srandmember(self.key)
+        return _decode_image(encoded) if encoded is not None else None
+
+    def pop_random(self) -> Optional[Image]:
+        encoded = self._redis.spop(self.key)
+        return _decode_image(encoded) if encoded is not None else None
+
+
+class RedisBlacklist(BaseBlacklist):
+    """A blacklist in Redis sets - see :class:`nichtparasoup.core.Blacklist`.
+
+    URIs are not stored, but hashed fingerprints of them.
+    A rolling blacklist keeps a set per generation. Generations are started at fixed times
+    of the wall clock, so all nodes agree on them, and expire via TTL.
+
+    :param redis: The client.
+    :param key: Key of the set - prefix of the sets' keys, if rolling.
+    :param fingerprint_size: Bytes per fingerprint.
+    :param window: Number of seconds a URI is remembered at most - a rolling blacklist.
+        `None` means URIs are remembered until :meth:`clear`.
+    :param generations: Number of generations of a rolling blacklist.
+    """
+
+    def __init__(self, redis: _RedisClient, key: str, *,
+                 fingerprint_size: int = 8,
+                 window: Optional[float] = None,
+                 generations: int = 2
+                 ) -> None:
+        if generations < 1:
+            raise ValueError('generations < 1')
+        if window is not None and window <= 0:
+            raise ValueError('window <= 0')
+        self._redis = redis
+        self.key = key
+        self._fingerprint_size = fingerprint_size
+        self._generation_ttl = window / generations if window is not None else None
+        self._max_generations = generations
+
+    def is_rolling(self) -> bool:
+        return self._generation_ttl is not None
+
+    def _fingerprint(self, uri: ImageUri) -> bytes:
+        return blake2b(uri.encode(), digest_size=self._fingerprint_size).digest()
+
+    def _generation_key(self, generation: int) -> str:
+        return f'{self.key}:{generation}'
+
+    def _keys(self) -> List[str]:
+        """Keys of the live generations - newest first."""
+        if self._generation_ttl is None:
+            return [self.key]
+        generation = int(time() // self._generation_ttl)
+        return [self._generation_key(generation - age) for age in range(self._max_generations)]
+
+    def __contains__(self, uri: object) -> bool:
+        if not isinstance(uri, str):
+            return False
+        fingerprint = self._fingerprint(uri)
+        return any(self._redis.sismember(key, fingerprint) for key in self._keys())
+
+    def add(self, uri: ImageUri) -> None:
+        fingerprint = self._fingerprint(uri)
+        if self._generation_ttl is None:
+            self._redis.sadd(self.key, fingerprint)
+            return
+        generation = int(time() // self._generation_ttl)
+        key = self._generation_key(generation)
+        with self._redis.pipeline() as pipeline:  # in one round trip
+            pipeline.sadd(key, fingerprint)
+            # expires when it is no live generation anymore
+            pipeline.expireat(key, ceil((generation + self._max_generations) * self._generation_ttl))
+            pipeline.execute()
+
+    def __len__(self) -> int:
+        return sum(int(self._redis.scard(key)) for key in self._keys())
+
+    def clear(self) -> None:
+        """Forget all URIs - for all nodes that share the blacklist."""
+        self._redis.delete(*self._keys())
+
+    def forget_oldest(self) -> int:
+        if self._generation_ttl is None:
+            return super().forget_oldest()
+        oldest = self._keys()[-1]
+        forgotten = int(self._redis.scard(oldest))
+        self._redis.delete(oldest)
+        return forgotten
+
+
+_LEASE_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+"""renew the lease KEYS[1] for ARGV[2] milliseconds - if node ARGV[1] holds it"""
+
+_LEASE_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+"""release the lease KEYS[1] - if node ARGV[1] holds it"""
+
+
+class RedisLeases(BaseLeases):
+    """Leases in Redis keys - for nodes on any host.
+
+    A lease is a key that holds the node's name, and expires unless it is renewed.
+    So other nodes take over, when a node died.
+
+    :param redis: The client.
+    :param key: Prefix of the keys.
+    :param node: Name of this node - see :class:`nichtparasoup.core.lease.BaseLeases`.
+    """
+
+    def __init__(self, redis: _RedisClient, key: str, node: Optional[str] = None) -> None:
+        super().__init__(node)
+        self._redis = redis
+        self.key = key
+        self._held: Set[str] = set()
+        self._lock = Lock()
+        # a holder's check and change run atomically in Redis, so they cannot hit a lease that another node took over
+        self._renew_script = redis.register_script(_LEASE_RENEW_SCRIPT)
+        self._release_script = redis.register_script(_LEASE_RELEASE_SCRIPT)
+
+    def _lease_key(self, name: str) -> str:
+        return f'{self.key}:lease:{name}'
+
+    def _node_key(self, node: str) -> str:
+        return f'{self.key}:node:{node}'
+
+    def acquire(self, name: str, ttl: float) -> bool:
+        ttl_ms = int(ttl * 1000)
+        key = self._lease_key(name)
+        acquired = bool(self._redis.set(key, self.node, nx=True, px=ttl_ms))
+        if not acquired:
+            acquired = bool(self._renew_script(keys=[key], args=[self.node, ttl_ms]))
+        with self._lock:
+            if acquired:
+                self._held.add(name)
+            else:
+                self._held.discard(name)
+        return acquired
+
+    def release(self, name: str) -> None:
+        with self._lock:
+            if name not in self._held:
+                return
+            self._held.discard(name)
+        self._release_script(keys=[self._lease_key(name)], args=[self.node])
+
+    def holder(self, name: str) -> Optional[str]:
+        holder = self._redis.get(self._lease_key(name))
+        return holder.decode() if holder is not None else None
+
+    def heartbeat(self, ttl: float) -> None:
+        self._redis.set(self._node_key(self.node), b'', px=int(ttl * 1000))
+
+    def nodes(self) -> Set[str]:
+        prefix = self._node_key('')
+        nodes = {key.decode()[len(prefix):] for key in self._redis.scan_iter(match=f'{prefix}*')}
+        nodes.add(self.node)
+        return nodes
+
+    def close(self) -> None:
+        with self._lock:
+            held = list(self._held)
+        for name in held:
+            self.release(name)
+        self._redis.delete(self._node_key(self.node))
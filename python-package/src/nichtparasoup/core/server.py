@@ -1,18 +1,26 @@
 __all__ = ["Server", "ImageResponse", "ResetResponse",
            "ServerStatistics",
            "StatusLike", "ServerStatus", "BlacklistStatus", "CrawlerStatus",
-           "ServerRefiller",
+           "ServerRefiller", "ServerSnapshotter",
            ]
 
+import os
 import sys
+from concurrent.futures import Future, wait as wait_futures
+from functools import partial
+from hashlib import blake2b
+from heapq import heapify, heappop, heappush
 from threading import Event, Lock, Thread
-from time import sleep, time
-from typing import Any, Dict, List, Optional, Set, Type, TypeVar, Union
+from time import monotonic, time
+from typing import Any, Dict, List, Optional, Sized, Type, TypeVar
 from weakref import ref as weak_ref
 
 from .._internals import _log, _type_module_name_str
 from . import Crawler, NPCore
 from .image import Image
+from .imagecrawler import _imagecrawler_key
+from .lease import BaseLeases, preferred_node
+from .snapshot import load_snapshot, save_snapshot
 
 if sys.version_info >= (3, 8):
     from typing import Protocol
@@ -28,6 +36,8 @@ class ServerStatistics:
     def __init__(self) -> None:  # pragma: no cover
         self.time_started: Optional[_Timestamp] = None
         self.count_images_served: int = 0
+        self.count_images_served_by_crawler: Dict[int, int] = {}
+        """Images served by crawler, by crawler's `id()`."""
         self.count_reset: int = 0
         self.time_last_reset: Optional[_Timestamp] = None
         self.cum_blacklist_on_flush: int = 0
@@ -55,34 +65,101 @@ class Server:
     :param core: the core
     :param crawler_upkeep: number of images the server must keep at all time
     :param reset_timeout: number of seconds the server must nt be reset
+    :param crawler_low_watermark: number of images, below which a crawler is refilled immediately.
+        Defaults to half the `crawler_upkeep`.
+    :param snapshot_file: file to save the blacklist and the crawlers' images to, and restore them from on start.
+    :param snapshot_interval: number of seconds between two snapshots
+    :param leases: leases to coordinate with other nodes - so each crawler is crawled by one node at a time.
+        The crawlers are sharded across the nodes that are alive. A node takes over the crawlers of a dead node.
+        `None` means this node crawls all crawlers.
+    :param lease_ttl: number of seconds a node holds a lease, and is considered alive, without renewing it
     """
 
     def __init__(self, core: NPCore, *,
                  crawler_upkeep: int = 30,
-                 reset_timeout: int = 60 * 60
+                 reset_timeout: int = 60 * 60,
+                 crawler_low_watermark: Optional[int] = None,
+                 snapshot_file: Optional[str] = None,
+                 snapshot_interval: int = 5 * 60,
+                 leases: Optional[BaseLeases] = None,
+                 lease_ttl: float = 30.0
                  ) -> None:  # pragma: no cover
         self.core = core
         self.keep = max(crawler_upkeep, 10)
+        self.keep_low = min(max(crawler_low_watermark, 0), self.keep) \
+            if crawler_low_watermark is not None \
+            else self.keep // 2
         self.reset_timeout = max(reset_timeout, 600)
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = max(snapshot_interval, 10)
+        self.leases = leases
+        self.lease_ttl = max(lease_ttl, 3.0)
+        self._heartbeat_at = 0.0
         self.stats = ServerStatistics()
         self._refiller: Optional[ServerRefiller] = None
+        self._snapshotter: Optional[ServerSnapshotter] = None
         self._trigger_reset = False
         self._locks = _ServerLocks()
         self.__running = False
 
     def has_image(self) -> bool:
-        return any(crawler.images for crawler in self.core.crawlers)
+        return self.core.crawlers.has_stocked()
 
     def get_image(self) -> Optional[ImageResponse]:
-        for crawler in self.core.crawlers.shuffle():
+        for crawler in self.core.crawlers.shuffle(stocked_only=True):
             image = crawler.pop_random_image()
             if image is None:
                 continue
-            with self._locks.stats_get_image:
-                self.stats.count_images_served += 1
-            return ImageResponse(image, crawler)
+            response = ImageResponse(image, crawler)
+            self._served([response])
+            return response
         return None
 
+    def get_images(self, count: int) -> List[ImageResponse]:
+        """Pop up to `count` random images.
+
+        The crawlers are picked by their weights in a single pass - a crawler might be picked several times.
+        Images missing because a picked crawler ran out are made up one by one - see :meth:`get_image`.
+        """
+        responses = []
+        for crawler in self.core.crawlers.sample(count, stocked_only=True):
+            image = crawler.pop_random_image()
+            if image is not None:
+                responses.append(ImageResponse(image, crawler))
+        self._served(responses)
+        while len(responses) < count:
+            response = self.get_image()
+            if response is None:
+                break
+            responses.append(response)
+        return responses
+
+    def _served(self, responses: List[ImageResponse]) -> None:
+        self.count_served([response.crawler for response in responses])
+
+    def count_served(self, crawlers: List[Crawler]) -> None:
+        """Count served images - one per listed crawler.
+
+        Images that other processes popped from shared pools are counted this way.
+        """
+        with self._locks.stats_get_image:
+            self.stats.count_images_served += len(crawlers)
+            served_by_crawler = self.stats.count_images_served_by_crawler
+            for crawler in crawlers:
+                served_by_crawler[id(crawler)] = served_by_crawler.get(id(crawler), 0) + 1
+        for crawler in set(crawlers):
+            if crawler.is_below_low_watermark():
+                self._request_refill(crawler)
+
+    def _request_refill(self, crawler: Crawler) -> None:
+        """Signal the refiller to refill the crawler as soon as possible. Does not block."""
+        refiller = self._refiller
+        if refiller:
+            refiller.request_refill(crawler)
+
+    def _apply_watermarks(self, crawler: Crawler) -> None:
+        crawler.set_watermarks(self.keep_low, self.keep)
+
     @staticmethod
     def _log_refill_crawler(crawler: Crawler, refilled: int) -> None:
         # must be compatible to nichtparasoup.core._OnFill
@@ -91,13 +168,99 @@ class Server:
 
     def refill(self) -> None:
         with self._locks.refill:
-            self.core.fill_up_to(self.keep, on_refill=self._log_refill_crawler)
+            for crawler in self.core.crawlers:
+                self._apply_watermarks(crawler)
+            if self.leases is None:
+                self.core.fill_up_to(self.keep, on_refill=self._log_refill_crawler)
+                return
+            self.heartbeat()
+            fill_ups = [self.core.fill_up_crawler(crawler, self.keep, on_refill=self._log_refill_crawler)
+                        for crawler in self.core.crawlers.copy()
+                        if self.lease_crawler(crawler)]
+            wait_futures(fill_ups)
+
+    @staticmethod
+    def _lease_name(crawler: Crawler) -> str:
+        return 'crawler-' + blake2b(_imagecrawler_key(crawler.imagecrawler).encode(), digest_size=16).hexdigest()
+
+    def heartbeat(self) -> None:
+        """Announce that this node is alive - see :attr:`leases`. Does nothing if called too often."""
+        now = monotonic()
+        if self.leases is None or now < self._heartbeat_at:
+            return
+        self._heartbeat_at = now + self.lease_ttl / 3
+        try:
+            self.leases.heartbeat(self.lease_ttl)
+        except Exception as ex:
+            _log('warning', ' * failed heartbeat of node %r', self.leases.node, exc_info=ex)
+
+    def lease_crawler(self, crawler: Crawler) -> bool:
+        """Acquire or renew the lease to crawl a crawler - see :attr:`leases`.
+
+        A node releases a crawler's lease, if another node is preferred to crawl it.
+        :return: Whether this node may crawl the crawler.
+        """
+        leases = self.leases
+        if leases is None:
+            return True
+        name = self._lease_name(crawler)
+        try:
+            if preferred_node(leases.nodes(), name) != leases.node:
+                leases.release(name)
+                return False
+            return leases.acquire(name, self.lease_ttl)
+        except Exception as ex:
+            _log('warning', ' * failed leasing %s', crawler.imagecrawler, exc_info=ex)
+            return False
+
+    def crawler_lease_holder(self, crawler: Crawler) -> Optional[str]:
+        """Get the node that holds the lease to crawl a crawler - see :attr:`leases`. `None` if unknown."""
+        if self.leases is None:
+            return None
+        try:
+            return self.leases.holder(self._lease_name(crawler))
+        except Exception as ex:
+            _log('warning', ' * failed looking up lease of %s', crawler.imagecrawler, exc_info=ex)
+            return None
+
+    def save_snapshot(self) -> bool:
+        """Save a snapshot to :attr:`snapshot_file` - if set.
+        :return: Whether a snapshot was saved.
+        """
+        if not self.snapshot_file:
+            return False
+        with self._locks.snapshot:
+            try:
+                save_snapshot(self.core, self.snapshot_file)
+            except OSError as ex:
+                _log('warning', ' * failed saving snapshot to %r', self.snapshot_file, exc_info=ex)
+                return False
+        _log('debug', ' * saved snapshot to %r', self.snapshot_file)
+        return True
+
+    def _restore_snapshot(self) -> int:
+        """Restore a snapshot from :attr:`snapshot_file` - if exists.
+        :return: Number of crawlers that were restored.
+        """
+        if not self.snapshot_file or not os.path.isfile(self.snapshot_file):
+            return 0
+        with self._locks.snapshot:
+            try:
+                restored = load_snapshot(self.core, self.snapshot_file)
+            except (OSError, ValueError) as ex:
+                _log('warning', ' * failed restoring snapshot from %r', self.snapshot_file, exc_info=ex)
+                return 0
+        _log('info', ' * restored %d crawlers from snapshot %r', restored, self.snapshot_file)
+        return restored
 
     def _reset(self) -> None:
         with self._locks.reset:
-            self.stats.cum_blacklist_on_flush += self.core.reset()
+            self.stats.cum_blacklist_on_flush += self.core.reset(forget_oldest_only=self.core.blacklist.is_rolling())
             self.stats.count_reset += 1
             self.stats.time_last_reset = int(time())
+        refiller = self._refiller
+        if refiller:
+            refiller.reschedule_all()
 
     def request_reset(self) -> ResetResponse:
         if not self.is_alive():
@@ -120,11 +283,15 @@ class Server:
             if self.__running:
                 raise RuntimeError('already running')
             _log('info', ' * starting %s', type(self).__name__)
-            _log('info', ' * fill all crawlers up to %d', self.keep)
-            self.refill()  # initial fill
+            if not self._restore_snapshot():
+                _log('info', ' * fill all crawlers up to %d', self.keep)
+                self.refill()  # initial fill
             if not self._refiller:
                 self._refiller = ServerRefiller(self, 1.0)
                 self._refiller.start()  # start threaded periodical refill
+            if self.snapshot_file and not self._snapshotter:
+                self._snapshotter = ServerSnapshotter(self, self.snapshot_interval)
+                self._snapshotter.start()  # start threaded periodical snapshots
             self.stats.time_started = int(time())
             self.__running = True
 
@@ -139,6 +306,13 @@ class Server:
             if self._refiller:
                 self._refiller.stop()
                 self._refiller = None
+            if self._snapshotter:
+                self._snapshotter.stop()
+                self._snapshotter = None
+                self.save_snapshot()
+            self.core.close()
+            if self.leases:
+                self.leases.close()
             self.__running = False
 
 
@@ -148,7 +322,7 @@ class _CollectionStatus:
         self.size = size
 
     @classmethod
-    def of_collection(cls: Type['_CS'], collection: Union[List[Any], Set[Any]]) -> '_CS':
+    def of_collection(cls: Type['_CS'], collection: Sized) -> '_CS':
         return cls(
             length=len(collection),
             size=sys.getsizeof(collection)
@@ -201,7 +375,7 @@ class ServerStatus(StatusLike):
             ),
             images=cls._Images(
                 stats.count_images_served,
-                stats.cum_blacklist_on_flush + len(server.core.blacklist)
+                stats.cum_blacklist_on_flush + len(server.core.blacklist) + server.core.blacklist.forgotten
             )
         )
 
@@ -214,13 +388,21 @@ class BlacklistStatus(_CollectionStatus, StatusLike):
 
 
 class CrawlerStatus(Dict[int, 'CrawlerStatus._Crawler'], StatusLike):
+    class _Crawl:
+        def __init__(self, crawler: Crawler, server: Server) -> None:  # pragma: no cover
+            self.count = crawler.count_crawls
+            self.last_duration = crawler.last_crawl_duration
+            self.node = server.leases.node if server.leases else None
+            self.lease_holder = server.crawler_lease_holder(crawler)
+
     class _Crawler:
-        def __init__(self, crawler: Crawler) -> None:  # pragma: no cover
+        def __init__(self, crawler: Crawler, server: Server) -> None:  # pragma: no cover
             self.name = crawler.imagecrawler.internal_name
             self.weight = crawler.weight
             self.type = _type_module_name_str(type(crawler.imagecrawler))
             self.config = crawler.imagecrawler.get_config()
             self.images = _CollectionStatus.of_collection(crawler.images)
+            self.crawl = CrawlerStatus._Crawl(crawler, server)
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:  # pragma: no cover
         super().__init__(*args, **kwargs)
@@ -228,31 +410,211 @@ class CrawlerStatus(Dict[int, 'CrawlerStatus._Crawler'], StatusLike):
     @classmethod
     def of_server(cls, server: Server) -> 'CrawlerStatus':
         return cls(
-            (id(crawler), cls._Crawler(crawler))
+            (id(crawler), cls._Crawler(crawler, server))
             for crawler
             in server.core.crawlers
         )
 
 
+class _CrawlerSchedule:
+    def __init__(self, crawler: Crawler, due: float) -> None:  # pragma: no cover
+        self.crawler = crawler
+        self.due = due
+        self.served: Optional[int] = None
+        self.served_checked = due
+        self.drain_rate = 0.0
+        """Images served per second."""
+        self.backoff = 0.0
+        self.crawling = False
+
+    def __lt__(self, other: '_CrawlerSchedule') -> bool:
+        return self.due < other.due
+
+
 class ServerRefiller(Thread):
+    """Refill the server's crawlers - each on its own schedule.
+
+    Each refill crawls a single page.
+    The next refill of a crawler is scheduled based on
+    * how fast its images are served - see :attr:`ServerStatistics.count_images_served_by_crawler`,
+    * how long its source takes to answer - see :attr:`Crawler.last_crawl_duration`,
+    * whether it is exhausted.
+
+    So fast-draining crawlers are refilled early, and idle ones are not polled.
+    Crawlers that dropped below their low watermark can be refilled on demand - see :meth:`request_refill`.
 
-    def __init__(self, server: Server, delay: float) -> None:  # pragma: no cover
+    :param delay: Minimum number of seconds between two refills of the same crawler.
+    :param max_interval: Maximum number of seconds between two checks of the same crawler.
+    """
+
+    def __init__(self, server: Server, delay: float, max_interval: float = 10.0) -> None:  # pragma: no cover
         super().__init__(daemon=True)
         self._server_wr = weak_ref(server)
         self._delay = delay
+        self._max_interval = max(max_interval, delay)
         self._stop_event = Event()
+        self._wakeup = Event()
         self._run_lock = Lock()
+        self._schedule_lock = Lock()
+        self._schedules: Dict[Crawler, _CrawlerSchedule] = {}
+        self._queue: List[_CrawlerSchedule] = []
 
     def run(self) -> None:
         while not self._stop_event.is_set():
             server: Optional[Server] = self._server_wr()
-            if server:
-                server.refill()
-            else:
+            if not server:
                 _log('info', ' * server gone. stopping %s', type(self).__name__)
                 self._stop_event.set()
-            if not self._stop_event.is_set():
-                sleep(self._delay)
+                break
+            server.heartbeat()
+            timeout = self._refill_due(server)
+            del server  # do not keep the server alive while waiting
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    def _refill_due(self, server: Server) -> float:
+        """Refill all crawlers that are due.
+        :return: Seconds until the next crawler is due.
+        """
+        now = monotonic()
+        with self._schedule_lock:
+            self._sync_schedules(server, now)
+            due: List[_CrawlerSchedule] = []
+            while self._queue and self._queue[0].due <= now:
+                due.append(heappop(self._queue))
+        for schedule in due:
+            self._refill(server, schedule, now)
+        with self._schedule_lock:
+            return min(self._queue[0].due - now, self._max_interval) if self._queue else self._max_interval
+
+    def _sync_schedules(self, server: Server, now: float) -> None:
+        # caller must hold the schedule lock
+        crawlers = set(server.core.crawlers)
+        for crawler in crawlers.difference(self._schedules):
+            server._apply_watermarks(crawler)
+            schedule = self._schedules[crawler] = _CrawlerSchedule(crawler, now)
+            heappush(self._queue, schedule)
+        for crawler in set(self._schedules).difference(crawlers):
+            del self._schedules[crawler]
+        self._queue = [schedule for schedule in self._queue if schedule.crawler in crawlers]
+        heapify(self._queue)
+
+    def _refill(self, server: Server, schedule: _CrawlerSchedule, now: float) -> None:
+        crawler = schedule.crawler
+        self._update_drain_rate(server, schedule, now)
+        crawl = None
+        if crawler.is_below_high_watermark() and not crawler.is_exhausted() and server.lease_crawler(crawler):
+            crawl = server.core.crawl_crawler(crawler, on_refill=server._log_refill_crawler)
+        if crawl:
+            schedule.crawling = True
+            crawl.add_done_callback(partial(self._crawled, schedule))
+        else:
+            self._schedule(schedule, now + self._next_interval(schedule, None))
+
+    def _crawled(self, schedule: _CrawlerSchedule, crawl: 'Future[int]') -> None:
+        server: Optional[Server] = self._server_wr()
+        if not server:
+            return
+        refilled = 0 if crawl.exception() else crawl.result()
+        schedule.crawling = False
+        self._schedule(schedule, monotonic() + self._next_interval(schedule, refilled))
+
+    def _schedule(self, schedule: _CrawlerSchedule, due: float) -> None:
+        with self._schedule_lock:
+            if self._schedules.get(schedule.crawler) is not schedule:
+                return  # crawler was removed
+            schedule.due = due
+            heappush(self._queue, schedule)
+        self._wakeup.set()
+
+    @staticmethod
+    def _update_drain_rate(server: Server, schedule: _CrawlerSchedule, now: float) -> None:
+        served = server.stats.count_images_served_by_crawler.get(id(schedule.crawler), 0)
+        elapsed = now - schedule.served_checked
+        if schedule.served is not None and elapsed > 0:
+            # exponentially weighted moving average
+            schedule.drain_rate = (schedule.drain_rate + (served - schedule.served) / elapsed) / 2
+        schedule.served = served
+        schedule.served_checked = now
+
+    def _next_interval(self, schedule: _CrawlerSchedule, refilled: Optional[int]) -> float:
+        """Seconds until the crawler should be refilled again.
+        :param refilled: Number of images the crawler was just refilled by. `None` if it was not crawled.
+        """
+        crawler = schedule.crawler
+        if crawler.is_exhausted():
+            return self._max_interval
+        latency = crawler.last_crawl_duration or 0.0
+        missing = crawler.high_watermark - len(crawler.images)
+        if missing > 0:
+            if refilled == 0:
+                schedule.backoff = min(max(schedule.backoff * 2, self._delay), self._max_interval)
+                return schedule.backoff
+            schedule.backoff = 0.0
+            # be nice, give the source some rest after crawling
+            return max(self._delay, latency)
+        if schedule.drain_rate <= 0:
+            return self._max_interval
+        # refill before dropping below the high watermark - ahead by the time the source takes to answer
+        return min(max((1 - missing) / schedule.drain_rate - latency, self._delay), self._max_interval)
+
+    def request_refill(self, crawler: Crawler) -> None:
+        """Make a crawler due now, unless it is crawling at the moment. Does not block."""
+        now = monotonic()
+        with self._schedule_lock:
+            schedule = self._schedules.get(crawler)
+            if schedule and not schedule.crawling and schedule.due > now:
+                schedule.due = now
+                heapify(self._queue)
+        self._wakeup.set()
+
+    def reschedule_all(self) -> None:
+        """Make all crawlers due now, except the ones that are crawling at the moment."""
+        with self._schedule_lock:
+            now = monotonic()
+            for schedule in self._queue:
+                schedule.due = now
+                schedule.backoff = 0.0
+        self._wakeup.set()
+
+    def start(self) -> None:
+        with self._run_lock:
+            if self.is_alive():
+                raise RuntimeError('already running')
+            _log('info', ' * starting %s', type(self).__name__)
+            self._stop_event.clear()
+            super().start()
+
+    def stop(self) -> None:
+        with self._run_lock:
+            if not self.is_alive():
+                raise RuntimeError('not running')
+            _log('info', ' * stopping %s', type(self).__name__)
+            self._stop_event.set()
+            self._wakeup.set()
+
+
+class ServerSnapshotter(Thread):
+    """Periodically save snapshots of the server - see :meth:`Server.save_snapshot`.
+
+    :param interval: Number of seconds between two snapshots.
+    """
+
+    def __init__(self, server: Server, interval: float) -> None:  # pragma: no cover
+        super().__init__(daemon=True)
+        self._server_wr = weak_ref(server)
+        self._interval = interval
+        self._stop_event = Event()
+        self._run_lock = Lock()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            server: Optional[Server] = self._server_wr()
+            if not server:
+                _log('info', ' * server gone. stopping %s', type(self).__name__)
+                break
+            server.save_snapshot()
+            del server  # do not keep the server alive while waiting
 
     def start(self) -> None:
         with self._run_lock:
@@ -276,3 +638,4 @@ class _ServerLocks:
         self.reset = Lock()
         self.refill = Lock()
         self.run = Lock()
+        self.snapshot = Lock()
@@ -0,0 +1,310 @@
+__all__ = ["SharedImagePools", "SharedImagePool"]
+
+import sys
+from hashlib import blake2b
+from json import dumps as json_dumps
+from multiprocessing import get_context
+from random import randrange
+from struct import Struct
+from typing import Any, Iterator, Optional, Sequence, cast, overload
+
+from .._internals import _log
+from .image import BaseImagePool, Image, _decode_image, _encode_image
+
+if sys.version_info >= (3, 8):
+    from multiprocessing.shared_memory import SharedMemory
+
+_COUNT = Struct('<I')
+"""header of a pool: number of used slots"""
+
+_ENTRY = Struct('<I')
+"""entry of a pool's index: position of a slot + 1 - `0` is an empty entry"""
+
+_SLOT = Struct('<QI')
+"""header of a slot: fingerprint of the URI - `0` for generic images, number of used bytes"""
+
+
+def _encode_uri_prefix(uri: str) -> bytes:
+    """The beginning of each encoded non-generic image with that URI - see :func:`_encode_image`."""
+    return json_dumps([uri, False], separators=(',', ':'))[:-1].encode() + b','
+
+
+def _fingerprint(image: Image) -> int:
+    """Fingerprint of the URI - `0` for generic images, that are always distinct."""
+    if image.is_generic:
+        return 0
+    return int.from_bytes(blake2b(image.uri.encode(), digest_size=8).digest(), 'little') or 1
+
+
+def _index_size(capacity: int) -> int:
+    """Number of entries of a pool's index: a power of two, at least twice the capacity."""
+    return 1 << (2 * capacity - 1).bit_length()
+
+
+class SharedImagePools(Sequence['SharedImagePool']):
+    """Image pools in shared memory - one per crawler.
+
+    All pools live in one block of shared memory, that is split in fixed-size slots.
+    Each slot holds an image encoded as JSON: uri, is_generic, source and more.
+    Each pool has a lock of its own, so the pools do not hold each other up.
+    Processes that are forked after construction share the pools - without pickling images through a manager.
+    Images that do not fit in a slot, or in a full pool, are dropped.
+
+    Requires Python >= 3.8.
+
+    :param pools: Number of pools. Use one per crawler, so the crawlers can still be weighted.
+    :param capacity: Number of images a pool can hold.
+    :param slot_size: Number of bytes an encoded image can take.
+    """
+
+    def __init__(self, pools: int, capacity: int, slot_size: int = 1024) -> None:
+        if sys.version_info < (3, 8):  # pragma: no cover
+            raise RuntimeError('shared memory requires Python >= 3.8')
+        if pools < 1 or capacity < 1:
+            raise ValueError('pools < 1 or capacity < 1')
+        if slot_size <= _SLOT.size:
+            raise ValueError(f'slot_size <= {_SLOT.size}')
+        pool_size = SharedImagePool._size(capacity, slot_size)
+        self._shm = SharedMemory(create=True, size=pools * pool_size)
+        buf = cast(memoryview, self._shm.buf)  # `None` after close, only
+        context = get_context()
+        self._pools = [SharedImagePool(buf, n * pool_size, capacity, slot_size, context.Lock())
+                       for n in range(pools)]
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block."""
+        return self._shm.name
+
+    @overload
+    def __getitem__(self, index: int) -> 'SharedImagePool':
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence['SharedImagePool']:
+        ...
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._pools[index]
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+    def close(self) -> None:
+        """Close the access to the shared memory, for this process.
+
+        The pools must not be used afterwards.
+        """
+        for pool in self._pools:
+            pool._release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory. To be called once, by the process that created the pools."""
+        self._shm.unlink()
+
+
+class SharedImagePool(BaseImagePool):
+    """An image pool in shared memory - see :class:`SharedImagePools`.
+
+    Picking and popping an image takes constant time.
+    Adding and looking up an image takes constant time, too - via an index of the URIs' fingerprints,
+    that is kept in the shared memory next to the slots: a hash table with linear probing.
+    Generic images are always distinct - they are not indexed.
+
+    This class is intended to be thread safe and process safe.
+    """
+
+    shared = True
+
+    def __init__(self, buf: memoryview, offset: int, capacity: int, slot_size: int, lock: Any) -> None:
+        self._buf: Optional[memoryview] = buf
+        self._offset = offset
+        self._capacity = capacity
+        self._slot_size = slot_size
+        self._lock = lock
+        self._index_mask = _index_size(capacity) - 1
+        self._slots_offset = offset + _COUNT.size + _index_size(capacity) * _ENTRY.size
+
+    @staticmethod
+    def _size(capacity: int, slot_size: int) -> int:
+        """Number of bytes a pool takes."""
+        return _COUNT.size + _index_size(capacity) * _ENTRY.size + capacity * slot_size
+
+    def _release(self) -> None:
+        self._buf = None
+
+    @property
+    def _mem(self) -> memoryview:
+        if self._buf is None:
+            raise ValueError('shared memory is closed')
+        return self._buf
+
+    def _count(self) -> int:
+        count: int = _COUNT.unpack_from(self._mem, self._offset)[0]
+        return count
+
+    def _set_count(self, count: int) -> None:
+        _COUNT.pack_into(self._mem, self._offset, count)
+
+    def _entry_offset(self, entry: int) -> int:
+        return self._offset + _COUNT.size + entry * _ENTRY.size
+
+    def _get_entry(self, entry: int) -> int:
+        position_1: int = _ENTRY.unpack_from(self._mem, self._entry_offset(entry))[0]
+        return position_1
+
+    def _set_entry(self, entry: int, position_1: int) -> None:
+        _ENTRY.pack_into(self._mem, self._entry_offset(entry), position_1)
+
+    def _slot_offset(self, position: int) -> int:
+        return self._slots_offset + position * self._slot_size
+
+    def _read_fingerprint(self, position: int) -> int:
+        fingerprint: int = _SLOT.unpack_from(self._mem, self._slot_offset(position))[0]
+        return fingerprint
+
+    def _read(self, position: int) -> bytes:
+        slot = self._slot_offset(position)
+        length: int = _SLOT.unpack_from(self._mem, slot)[1]
+        start = slot + _SLOT.size
+        return bytes(self._mem[start:start + length])
+
+    def _write(self, position: int, fingerprint: int, encoded: bytes) -> None:
+        slot = self._slot_offset(position)
+        _SLOT.pack_into(self._mem, slot, fingerprint, len(encoded))
+        start = slot + _SLOT.size
+        self._mem[start:start + len(encoded)] = encoded
+
+    def _move(self, source: int, target: int) -> None:
+        start = self._slot_offset(source)
+        length: int = _SLOT.unpack_from(self._mem, start)[1]
+        self._mem[self._slot_offset(target):self._slot_offset(target) + _SLOT.size + length] = \
+            self._mem[start:start + _SLOT.size + length]
+
+    def _probe(self, fingerprint: int) -> Iterator[int]:
+        """The entries of the index, in the order they are probed for a fingerprint - up to an empty one."""
+        entry = fingerprint & self._index_mask
+        while True:
+            yield entry
+            if not self._get_entry(entry):
+                return
+            entry = (entry + 1) & self._index_mask
+
+    def _find(self, image: Image) -> Optional[int]:
+        # caller must hold the lock
+        fingerprint = _fingerprint(image)
+        if not fingerprint:
+            return None
+        entry = self._find_entry(fingerprint, _encode_uri_prefix(image.uri))
+        return None if entry is None else self._get_entry(entry) - 1
+
+    def _find_entry(self, fingerprint: int, prefix: bytes) -> Optional[int]:
+        # caller must hold the lock
+        for entry in self._probe(fingerprint):
+            position_1 = self._get_entry(entry)
+            if not position_1:
+                break
+            if self._read_fingerprint(position_1 - 1) == fingerprint and self._read(position_1 - 1).startswith(prefix):
+                return entry
+        return None
+
+    def _entry_of(self, position: int) -> int:
+        # caller must hold the lock
+        return next(entry for entry in self._probe(self._read_fingerprint(position))
+                    if self._get_entry(entry) == position + 1)
+
+    def _index(self, position: int, fingerprint: int) -> None:
+        # caller must hold the lock
+        if fingerprint:
+            empty = next(entry for entry in self._probe(fingerprint) if not self._get_entry(entry))
+            self._set_entry(empty, position + 1)
+
+    def _unindex(self, entry: int) -> None:
+        """Remove an entry of the index - and shift back the entries that were probed past it."""
+        # caller must hold the lock
+        mask = self._index_mask
+        for following in self._probe((entry + 1) & mask):
+            position_1 = self._get_entry(following)
+            if not position_1:
+                break
+            home = self._read_fingerprint(position_1 - 1) & mask
+            if (following - home) & mask >= (following - entry) & mask:
+                # the freed entry is on the probe path of the following one
+                self._set_entry(entry, position_1)
+                entry = following
+        self._set_entry(entry, 0)
+
+    def _remove_at(self, position: int) -> bytes:
+        # caller must hold the lock
+        encoded = self._read(position)
+        if self._read_fingerprint(position):
+            self._unindex(self._entry_of(position))
+        last = self._count() - 1
+        if position != last:
+            if self._read_fingerprint(last):
+                self._set_entry(self._entry_of(last), position + 1)
+            self._move(last, position)
+        self._set_count(last)
+        return encoded
+
+    def __contains__(self, image: object) -> bool:
+        if not isinstance(image, Image):
+            return False
+        with self._lock:
+            return self._find(image) is not None
+
+    def __iter__(self) -> Iterator[Image]:
+        with self._lock:
+            encoded = [self._read(position) for position in range(self._count())]
+        return map(_decode_image, encoded)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def __sizeof__(self) -> int:
+        return super().__sizeof__() + self._size(self._capacity, self._slot_size)
+
+    def add(self, image: Image) -> bool:  # type: ignore[override]
+        encoded = _encode_image(image)
+        if _SLOT.size + len(encoded) > self._slot_size:
+            _log('warning', 'Dropped image that does not fit a slot: %r', image)
+            return False
+        fingerprint = _fingerprint(image)
+        with self._lock:
+            if self._find(image) is not None:
+                return False
+            count = self._count()
+            if count >= self._capacity:
+                _log('warning', 'Dropped image, pool is full: %r', image)
+                return False
+            self._write(count, fingerprint, encoded)
+            self._index(count, fingerprint)
+            self._set_count(count + 1)
+            return True
+
+    def discard(self, image: Image) -> None:
+        with self._lock:
+            position = self._find(image)
+            if position is not None:
+                self._remove_at(position)
+
+    def clear(self) -> None:
+        with self._lock:
+            start = self._entry_offset(0)
+            end = self._entry_offset(self._index_mask + 1)
+            self._mem[start:end] = bytes(end - start)
+            self._set_count(0)
+
+    def get_random(self) -> Optional[Image]:
+        with self._lock:
+            count = self._count()
+            encoded = self._read(randrange(count)) if count else None
+        return _decode_image(encoded) if encoded is not None else None
+
+    def pop_random(self) -> Optional[Image]:
+        with self._lock:
+            count = self._count()
+            encoded = self._remove_at(randrange(count)) if count else None
+        return _decode_image(encoded) if encoded is not None else None
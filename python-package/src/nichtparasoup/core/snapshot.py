@@ -0,0 +1,85 @@
+__all__ = ["save_snapshot", "load_snapshot"]
+
+import gzip
+import os
+from json import dump as json_dump, load as json_load
+from typing import Any, Dict, List, Optional
+
+from .._internals import _log
+from . import NPCore
+from .image import Image, _json_default
+from .imagecrawler import BaseImageCrawler, ImageCrawlerState, _imagecrawler_key
+
+_SNAPSHOT_VERSION = 1
+
+
+def _dump_image(image: Image) -> Dict[str, Any]:
+    return dict(uri=image.uri, source=image.source, is_generic=image.is_generic, more=image.more)
+
+
+def _load_image(dumped: Dict[str, Any]) -> Image:
+    return Image(uri=dumped['uri'], source=dumped['source'], is_generic=dumped['is_generic'], **dumped['more'])
+
+
+def save_snapshot(core: NPCore, file: str) -> None:
+    """Save the core's blacklist, and the crawlers' images and states to a gzipped JSON file.
+
+    The file is replaced atomically.
+    """
+    snapshot = dict(
+        version=_SNAPSHOT_VERSION,
+        blacklist=core.blacklist.dump(),
+        crawlers=[dict(
+            imagecrawler=_imagecrawler_key(crawler.imagecrawler),
+            images=[_dump_image(image) for image in crawler.images.copy()],
+            state=crawler.imagecrawler.get_state(),
+        ) for crawler in core.crawlers.copy()],
+    )
+    file_tmp = f'{file}.tmp'
+    with gzip.open(file_tmp, 'wt', encoding='utf-8') as fp:
+        json_dump(snapshot, fp, separators=(',', ':'), default=_json_default)
+    os.replace(file_tmp, file)
+
+
+def load_snapshot(core: NPCore, file: str) -> int:
+    """Restore the core's blacklist, and the crawlers' images and states from a file - see :func:`save_snapshot`.
+
+    Crawlers are matched by their imagecrawler's type and config.
+    Crawlers that are not in the snapshot are left untouched.
+
+    :return: Number of crawlers whose images were restored.
+    :raise OSError: If the file cannot be read.
+    :raise ValueError: If the file is no valid snapshot.
+    """
+    with gzip.open(file, 'rt', encoding='utf-8') as fp:
+        snapshot = json_load(fp)
+    try:
+        if snapshot['version'] != _SNAPSHOT_VERSION:
+            raise ValueError(f'snapshot version {snapshot["version"]!r} not supported')
+        if snapshot['blacklist'] is not None:
+            core.blacklist.load(snapshot['blacklist'])
+        return _restore_crawlers(core, snapshot['crawlers'])
+    except (KeyError, TypeError) as ex:
+        raise ValueError('invalid snapshot') from ex
+
+
+def _restore_crawlers(core: NPCore, crawler_snapshots: List[Dict[str, Any]]) -> int:
+    crawlers = {_imagecrawler_key(crawler.imagecrawler): crawler for crawler in core.crawlers.copy()}
+    restored = 0
+    for crawler_snapshot in crawler_snapshots:
+        crawler = crawlers.get(crawler_snapshot['imagecrawler'])
+        if crawler:
+            crawler.images = map(_load_image, crawler_snapshot['images'])
+            _restore_state(crawler.imagecrawler, crawler_snapshot.get('state'))
+            restored += 1
+    return restored
+
+
+def _restore_state(imagecrawler: BaseImageCrawler, state: Optional[Dict[str, Any]]) -> None:
+    if state is None:
+        # snapshot was taken before states were introduced
+        return
+    try:
+        imagecrawler.set_state(ImageCrawlerState(state))
+    except ValueError as ex:
+        _log('warning', 'Crawler state not restored for %r: %s', imagecrawler, ex)
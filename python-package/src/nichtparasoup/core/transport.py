@@ -0,0 +1,541 @@
+__all__ = [
+    "BaseTransport", "UrllibTransport", "PooledTransport",
+    "CachingTransport", "CacheStatistics",
+    "get_default_transport", "set_default_transport",
+]
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from email.message import Message
+from email.utils import parsedate_to_datetime
+from hashlib import sha256
+from http.client import HTTPConnection, HTTPException, HTTPMessage, HTTPResponse, HTTPSConnection
+from io import BytesIO
+from json import dumps as json_dumps, loads as json_loads
+from pathlib import Path
+from ssl import create_default_context
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlparse
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
+from urllib.response import addinfourl
+
+from .._internals import _log
+
+_Response = Union[HTTPResponse, addinfourl]
+
+_PoolKey = Tuple[str, str, Optional[int]]
+"""scheme, host, port"""
+
+_Release = Callable[[bool], None]
+
+
+class BaseTransport(ABC):
+    """The transport a :class:`nichtparasoup.core.imagecrawler.RemoteFetcher` opens requests with.
+    """
+
+    @abstractmethod
+    def open(self, request: Request, timeout: float) -> _Response:  # pragma: no cover
+        """Open a request and return the response, after redirects were followed.
+
+        Must raise :class:`urllib.error.HTTPError` on error status codes, like :func:`urllib.request.urlopen` does.
+        """
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Release all resources."""
+        return None
+
+
+class UrllibTransport(BaseTransport):
+    """Open every request on a new connection - via :func:`urllib.request.urlopen`.
+    """
+
+    def open(self, request: Request, timeout: float) -> _Response:
+        response: _Response = urlopen(request, timeout=timeout)
+        return response
+
+
+class _PooledResponse(HTTPResponse):
+    """A response that hands its connection back to the pool, when the body was read or the response was closed.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.__release: Optional[_Release] = None
+        self.__incomplete = False
+        self.__done = False
+
+    def set_release(self, release: _Release) -> None:
+        self.__release = release
+        if self.isclosed():
+            self.__released()
+
+    def close(self) -> None:
+        self.__incomplete = self.fp is not None
+        super().close()
+        self.__released()
+
+    def _close_conn(self) -> None:
+        super()._close_conn()  # type: ignore[misc]
+        self.__released()
+
+    def __released(self) -> None:
+        if self.__done or not self.__release:
+            return
+        self.__done = True
+        self.__release(not self.__incomplete and not self.will_close)
+
+
+class _HTTPConnection(HTTPConnection):
+    response_class = _PooledResponse
+
+
+class _HTTPSConnection(HTTPSConnection):
+    response_class = _PooledResponse
+
+
+class PooledTransport(BaseTransport):
+    """Keep connections alive and reuse them - per host.
+
+    Plain HTTP/1.1 keep-alive via :mod:`http.client`.
+    Requests that are not `http` or `https`, or that must go via a proxy, are passed to `fallback`.
+
+    :param pool_size: Maximum number of idle connections kept per host.
+    :param idle_timeout: Seconds an idle connection is kept, before it is dropped.
+    :param max_redirects: Maximum number of redirects that are followed.
+    :param fallback: Transport for requests that cannot be pooled.
+    """
+
+    _REDIRECT_CODES = {301, 302, 303, 307, 308}
+
+    def __init__(self, *,
+                 pool_size: int = 4,
+                 idle_timeout: float = 30.0,
+                 max_redirects: int = 10,
+                 fallback: Optional[BaseTransport] = None
+                 ) -> None:
+        if pool_size < 0:
+            raise ValueError('pool_size < 0')
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_redirects = max_redirects
+        self._fallback = fallback or UrllibTransport()
+        self._pools: Dict[_PoolKey, List[Tuple[HTTPConnection, float]]] = {}
+        self._pools_lock = Lock()
+        self._ssl_context = create_default_context()
+
+    @staticmethod
+    def _pool_key(request: Request) -> _PoolKey:
+        url = urlparse(request.full_url)
+        return url.scheme, url.hostname or '', url.port
+
+    def _is_poolable(self, request: Request) -> bool:
+        scheme, host, _ = self._pool_key(request)
+        if scheme not in {'http', 'https'}:
+            return False
+        return scheme not in getproxies() or bool(proxy_bypass(host))
+
+    def open(self, request: Request, timeout: float) -> _Response:
+        for _ in range(self.max_redirects + 1):
+            if not self._is_poolable(request):
+                return self._fallback.open(request, timeout)
+            response = self._open_pooled(request, timeout)
+            location = response.getheader('Location') if response.status in self._REDIRECT_CODES else None
+            if not location:
+                return self._checked(response)
+            response.read()  # drain, so the connection can be reused
+            response.close()
+            request = self._redirected(request, location)
+        raise HTTPError(request.full_url, 310, 'Too many redirects', response.msg, None)  # type: ignore[arg-type]
+
+    _CONTENT_HEADERS = {'content-length', 'content-type'}
+
+    _CREDENTIAL_HEADERS = {'authorization', 'cookie'}
+
+    @classmethod
+    def _redirected(cls, request: Request, location: str) -> Request:
+        """Get the request that follows a redirect - like :class:`urllib.request.HTTPRedirectHandler` does.
+
+        The redirected request has no body, so its content headers are dropped.
+        Credentials are dropped, if the redirect leaves the scheme or host.
+        """
+        url = urljoin(request.full_url, location)
+        dropped = cls._CONTENT_HEADERS
+        if urlparse(url)[:2] != urlparse(request.full_url)[:2]:
+            dropped = dropped | cls._CREDENTIAL_HEADERS
+        return Request(url, headers={k: v for k, v in request.header_items() if k.lower() not in dropped})
+
+    @staticmethod
+    def _checked(response: HTTPResponse) -> HTTPResponse:
+        if 200 <= response.status < 300:
+            return response
+        response.close()
+        raise HTTPError(response.geturl(), response.status, response.reason,
+                        response.msg, None)  # type: ignore[arg-type]
+
+    def _open_pooled(self, request: Request, timeout: float) -> HTTPResponse:
+        key = self._pool_key(request)
+        connection, reused = self._acquire(key, timeout)
+        try:
+            response = self._request(connection, request)
+        except (HTTPException, ConnectionError):
+            connection.close()
+            if not reused:
+                raise
+            # the server might have closed the idle connection meanwhile - retry once on a new one
+            _log('debug', 'Retry %r on a new connection', request.full_url)
+            connection, _ = self._acquire(key, timeout, reuse=False)
+            response = self._request(connection, request)
+        response.url = request.full_url  # type: ignore[attr-defined]
+        if isinstance(response, _PooledResponse):
+            response.set_release(lambda reusable: self._release(key, connection, reusable))
+        return response
+
+    @staticmethod
+    def _request(connection: HTTPConnection, request: Request) -> HTTPResponse:
+        connection.request(request.get_method(), request.selector, request.data,  # type: ignore[arg-type]
+                           dict(request.header_items()))
+        return connection.getresponse()
+
+    def _acquire(self, key: _PoolKey, timeout: float, *, reuse: bool = True) -> Tuple[HTTPConnection, bool]:
+        """Get an idle connection of the pool, or a new one.
+        :return: The connection, and whether it was reused.
+        """
+        connection = self._pop_idle(key) if reuse else None
+        if connection:
+            connection.timeout = timeout
+            if connection.sock:
+                connection.sock.settimeout(timeout)
+            return connection, True
+        scheme, host, port = key
+        if scheme == 'https':
+            return _HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context), False
+        return _HTTPConnection(host, port, timeout=timeout), False
+
+    def _pop_idle(self, key: _PoolKey) -> Optional[HTTPConnection]:
+        expired = monotonic() - self.idle_timeout
+        with self._pools_lock:
+            pool = self._pools.get(key, [])
+            while pool:
+                connection, last_used = pool.pop()
+                if last_used > expired:
+                    return connection
+                connection.close()
+        return None
+
+    def _release(self, key: _PoolKey, connection: HTTPConnection, reusable: bool) -> None:
+        with self._pools_lock:
+            pool = self._pools.setdefault(key, [])
+            if reusable and len(pool) < self.pool_size:
+                pool.append((connection, monotonic()))
+                return
+        connection.close()
+
+    def close(self) -> None:
+        with self._pools_lock:
+            pools = self._pools
+            self._pools = {}
+        for pool in pools.values():
+            for connection, _ in pool:
+                connection.close()
+        self._fallback.close()
+
+
+class CacheStatistics:
+    def __init__(self) -> None:  # pragma: no cover
+        self.hits = 0
+        """Responses served from the cache, without asking the server."""
+        self.revalidations = 0
+        """Responses served from the cache, after the server answered "304 Not Modified"."""
+        self.misses = 0
+        """Responses fetched from the server."""
+
+
+class _CacheEntry:
+
+    def __init__(self, url: str, code: int, headers: List[Tuple[str, str]], body: bytes, expires: float
+                 ) -> None:  # pragma: no cover
+        self.url = url
+        self.code = code
+        self.headers = headers
+        self.body = body
+        self.expires = expires
+        """Timestamp, when the entry needs to be revalidated."""
+
+    def get_header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        return next((value for header, value in self.headers if header.lower() == name), None)
+
+    def to_response(self) -> addinfourl:
+        headers = HTTPMessage()
+        for header, value in self.headers:
+            headers[header] = value
+        return addinfourl(BytesIO(self.body), headers, self.url, self.code)
+
+    def to_bytes(self) -> bytes:
+        meta = dict(url=self.url, code=self.code, headers=self.headers, expires=self.expires)
+        return json_dumps(meta).encode() + b'\n' + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> '_CacheEntry':
+        meta, _, body = data.partition(b'\n')
+        meta_dict = json_loads(meta)
+        return cls(meta_dict['url'], meta_dict['code'], [(h, v) for h, v in meta_dict['headers']], body,
+                   meta_dict['expires'])
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, str]:
+    directives = {}
+    for directive in (value or '').split(','):
+        name, _, argument = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"')
+    return directives
+
+
+def _cache_expires(headers: Message, now: float) -> Optional[float]:
+    """When a response must be revalidated.
+    :return: Timestamp, or `None` if the response must not be cached.
+    """
+    cache_control = _parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in cache_control or headers.get('Vary') == '*':
+        return None
+    expires = now if 'no-cache' in cache_control else _cache_expires_explicit(headers, cache_control, now)
+    if expires is None and (headers.get('ETag') or headers.get('Last-Modified')):
+        return now  # revalidate every time
+    return expires
+
+
+def _cache_expires_explicit(headers: Message, cache_control: Dict[str, str], now: float) -> Optional[float]:
+    max_age = cache_control.get('max-age', '')
+    if max_age.isdigit():
+        return now + int(max_age)
+    try:
+        return parsedate_to_datetime(headers['Expires']).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class _DiskCache:
+    """Cache entries as files in a directory - least recently used are evicted first.
+
+    Failing file operations are logged, and degrade to a cache miss - they never fail the fetch.
+    """
+
+    _SUFFIX = '.nprc'
+
+    def __init__(self, directory: str, max_size: int) -> None:
+        self._directory = Path(directory)
+        self._max_size = max_size
+        self._directory.mkdir(parents=True, exist_ok=True)
+        files = sorted(self._directory.glob(f'*{self._SUFFIX}'), key=lambda file: file.stat().st_mtime)
+        self._sizes: 'OrderedDict[str, int]' = OrderedDict((file.stem, file.stat().st_size) for file in files)
+        self._size = sum(self._sizes.values())
+
+    def _file(self, key: str) -> Path:
+        return self._directory / f'{sha256(key.encode()).hexdigest()}{self._SUFFIX}'
+
+    def get(self, key: str) -> Optional[_CacheEntry]:
+        file = self._file(key)
+        if file.stem not in self._sizes:
+            return None
+        try:
+            entry = _CacheEntry.from_bytes(file.read_bytes())
+        except (OSError, ValueError, KeyError) as ex:
+            _log('debug', 'Dropping broken cache file %r', str(file), exc_info=ex)
+            self._remove(file.stem)
+            return None
+        self._touch(file)
+        self._sizes.move_to_end(file.stem)
+        return entry
+
+    def put(self, key: str, entry: _CacheEntry) -> None:
+        file = self._file(key)
+        data = entry.to_bytes()
+        if len(data) > self._max_size:
+            return
+        self._remove(file.stem)
+        try:
+            file.write_bytes(data)
+        except OSError as ex:
+            _log('warning', 'Could not write cache file %r: %s', str(file), ex)
+            self._unlink(file)  # might be partially written
+            return
+        self._sizes[file.stem] = len(data)
+        self._size += len(data)
+        while self._size > self._max_size:
+            self._remove(next(iter(self._sizes)))
+
+    def _remove(self, stem: str) -> None:
+        size = self._sizes.pop(stem, None)
+        if size is None:
+            return
+        self._size -= size
+        self._unlink(self._directory / f'{stem}{self._SUFFIX}')
+
+    @staticmethod
+    def _touch(file: Path) -> None:
+        try:
+            file.touch()
+        except OSError as ex:
+            _log('debug', 'Could not touch cache file %r', str(file), exc_info=ex)
+
+    @staticmethod
+    def _unlink(file: Path) -> None:
+        try:
+            file.unlink()
+        except OSError:
+            pass
+
+
+class CachingTransport(BaseTransport):
+    """Cache responses of another transport - in memory, and optionally on disk.
+
+    Honours `Cache-Control`, `Expires`, `ETag` and `Last-Modified`:
+    fresh responses are served from the cache, stale ones are revalidated with a conditional request.
+    Only successful `GET` requests are cached - by URL. The least recently used responses are evicted first.
+
+    :param transport: The transport to fetch with. Defaults to the shared one - see :func:`get_default_transport()`.
+    :param max_memory_size: Maximum number of bytes of response bodies kept in memory.
+    :param directory: Directory to keep responses in, additionally. `None` disables the cache on disk.
+    :param max_disk_size: Maximum number of bytes kept in `directory`.
+    """
+
+    def __init__(self, transport: Optional[BaseTransport] = None, *,
+                 max_memory_size: int = 16 * 1024 * 1024,
+                 directory: Optional[str] = None,
+                 max_disk_size: int = 64 * 1024 * 1024
+                 ) -> None:
+        self._transport = transport
+        self._max_memory_size = max_memory_size
+        self._memory: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._memory_size = 0
+        self._disk = _DiskCache(directory, max_disk_size) if directory else None
+        self._lock = Lock()
+        self.stats = CacheStatistics()
+
+    def _get_transport(self) -> BaseTransport:
+        return self._transport or get_default_transport()
+
+    def open(self, request: Request, timeout: float) -> _Response:
+        if request.get_method() != 'GET' or request.data is not None:
+            return self._get_transport().open(request, timeout)
+        key = request.full_url
+        entry = self._get(key)
+        if entry and entry.expires > time():
+            with self._lock:
+                self.stats.hits += 1
+            return entry.to_response()
+        return self._fetch(key, request, entry, timeout)
+
+    def _fetch(self, key: str, request: Request, entry: Optional[_CacheEntry], timeout: float) -> _Response:
+        try:
+            response = self._get_transport().open(self._conditional(request, entry), timeout)
+        except HTTPError as ex:
+            if entry and ex.code == 304:
+                return self._revalidated(key, entry, ex.headers)
+            raise
+        with self._lock:
+            self.stats.misses += 1
+        return self._fetched(key, response)
+
+    @staticmethod
+    def _conditional(request: Request, entry: Optional[_CacheEntry]) -> Request:
+        if not entry:
+            return request
+        headers = dict(request.header_items())
+        etag = entry.get_header('ETag')
+        if etag:
+            headers['If-None-Match'] = etag
+        last_modified = entry.get_header('Last-Modified')
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return Request(request.full_url, headers=headers)
+
+    def _revalidated(self, key: str, entry: _CacheEntry, headers: Message) -> addinfourl:
+        with self._lock:
+            self.stats.revalidations += 1
+        updated = {header.lower(): value for header, value in headers.items()}
+        entry.headers = [(header, updated.pop(header.lower(), value)) for header, value in entry.headers]
+        entry.expires = _cache_expires(headers, time()) or 0.0
+        self._put(key, entry)
+        return entry.to_response()
+
+    def _fetched(self, key: str, response: _Response) -> _Response:
+        if response.getcode() != 200:
+            return response
+        headers = response.info()
+        expires = _cache_expires(headers, time())
+        if expires is None:
+            return response  # not cacheable - keep streaming
+        body = response.read()
+        response.close()
+        entry = _CacheEntry(response.geturl(), 200, list(headers.items()), body, expires)
+        self._put(key, entry)
+        return entry.to_response()
+
+    def _get(self, key: str) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                self._memory.move_to_end(key)
+                return entry
+            entry = self._disk.get(key) if self._disk else None
+            if entry:
+                self._put_memory(key, entry)
+            return entry
+
+    def _put(self, key: str, entry: _CacheEntry) -> None:
+        with self._lock:
+            self._put_memory(key, entry)
+            if self._disk:
+                self._disk.put(key, entry)
+
+    def _put_memory(self, key: str, entry: _CacheEntry) -> None:
+        # caller must hold the lock
+        previous = self._memory.pop(key, None)
+        if previous:
+            self._memory_size -= len(previous.body)
+        if len(entry.body) > self._max_memory_size:
+            return
+        self._memory[key] = entry
+        self._memory_size += len(entry.body)
+        while self._memory_size > self._max_memory_size:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted.body)
+
+    def close(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        if self._transport:
+            self._transport.close()
+
+
+_default_transport: Optional[BaseTransport] = None
+_default_transport_lock = Lock()
+
+
+def get_default_transport() -> BaseTransport:
+    """Get the transport that is shared by all :class:`nichtparasoup.core.imagecrawler.RemoteFetcher`
+    that do not have their own.
+    """
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = PooledTransport()
+        return _default_transport
+
+
+def set_default_transport(transport: Optional[BaseTransport]) -> None:
+    """Replace the shared transport. `None` resets to a new :class:`PooledTransport` on next use.
+    """
+    global _default_transport
+    with _default_transport_lock:
+        previous = _default_transport
+        _default_transport = transport
+    if previous and previous is not transport:
+        previous.close()
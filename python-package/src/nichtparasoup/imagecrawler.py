@@ -2,11 +2,13 @@
 """
 
 __all__ = [
-    "BaseImageCrawler", "ImageCrawlerConfig", "ImageCrawlerInfo",
+    "BaseImageCrawler", "ImageCrawlerConfig", "ImageCrawlerInfo", "ImageCrawlerState",
     "Image", "ImageCollection",
     "RemoteFetcher", "ImageRecognizer",
 ]
 
 
 from .core.image import Image, ImageCollection
-from .core.imagecrawler import BaseImageCrawler, ImageCrawlerConfig, ImageCrawlerInfo, ImageRecognizer, RemoteFetcher
+from .core.imagecrawler import (
+    BaseImageCrawler, ImageCrawlerConfig, ImageCrawlerInfo, ImageCrawlerState, ImageRecognizer, RemoteFetcher,
+)
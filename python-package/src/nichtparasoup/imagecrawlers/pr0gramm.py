@@ -1,10 +1,11 @@
 __all__ = ["Pr0gramm"]
 
-from json import loads as json_loads
 from typing import Any, Dict, Optional
 from urllib.parse import urlencode, urljoin
 
-from ..imagecrawler import BaseImageCrawler, Image, ImageCollection, ImageCrawlerConfig, ImageCrawlerInfo, RemoteFetcher
+from ..imagecrawler import (
+    BaseImageCrawler, Image, ImageCollection, ImageCrawlerConfig, ImageCrawlerInfo, ImageCrawlerState, RemoteFetcher,
+)
 
 
 class Pr0gramm(BaseImageCrawler):
@@ -79,6 +80,16 @@ class Pr0gramm(BaseImageCrawler):
         self._older = None
         self._at_end = False
 
+    def _get_state(self) -> ImageCrawlerState:
+        return ImageCrawlerState(older=self._older, at_end=self._at_end)
+
+    def _set_state(self, state: ImageCrawlerState) -> None:
+        older = state['older']
+        if older is not None and type(older) is not int:
+            raise TypeError(f'older {older!r} is not int')
+        self._older = older
+        self._at_end = bool(state['at_end'])
+
     __IMG_BASE_URL = 'https://img.pr0gramm.com/'
     __POST_BASE_URL = 'https://pr0gramm.com/new/'
 
@@ -90,9 +101,10 @@ class Pr0gramm(BaseImageCrawler):
             promoted=promoted,
             tags=self._config.get('tags', None),
             older=self._older)
-        response_raw, api_uri = self._remote_fetcher.get_string(api_uri)
-        response = json_loads(response_raw)
-        for item in response['items']:
+        response = self._remote_fetcher.get_json_items(api_uri, ('items',))
+        last_item: Optional[Dict[str, Any]] = None
+        for item in response:
+            last_item = item
             images.add(
                 Image(
                     uri=urljoin(self.__IMG_BASE_URL, str(item['image'])),
@@ -101,7 +113,7 @@ class Pr0gramm(BaseImageCrawler):
                     height=item.get('height'),
                 )
             )
-        self._at_end = response['atEnd']
-        if not self._at_end:
-            self._older = response['items'][-1]['promoted' if promoted else 'id']
+        self._at_end = response.document['atEnd'] or last_item is None
+        if last_item and not self._at_end:
+            self._older = last_item['promoted' if promoted else 'id']
         return images
@@ -1,11 +1,11 @@
 __all__ = ["Reddit"]
 
-from json import loads as json_loads
 from typing import Any, Dict, Optional
 from urllib.parse import quote_plus as url_quote, urljoin
 
 from ..imagecrawler import (
-    BaseImageCrawler, Image, ImageCollection, ImageCrawlerConfig, ImageCrawlerInfo, ImageRecognizer, RemoteFetcher,
+    BaseImageCrawler, Image, ImageCollection, ImageCrawlerConfig, ImageCrawlerInfo, ImageCrawlerState, ImageRecognizer,
+    RemoteFetcher,
 )
 
 
@@ -48,21 +48,29 @@ class Reddit(BaseImageCrawler):
         self._after = None
         self._at_end = False
 
+    def _get_state(self) -> ImageCrawlerState:
+        return ImageCrawlerState(after=self._after, at_end=self._at_end)
+
+    def _set_state(self, state: ImageCrawlerState) -> None:
+        after = state['after']
+        if after is not None and type(after) is not str:
+            raise TypeError(f'after {after!r} is not str')
+        self._after = after
+        self._at_end = bool(state['at_end'])
+
     def _crawl(self) -> ImageCollection:
         images = ImageCollection()
-        listing_string, uri = self._remote_fetcher.get_string(self._get_uri(self._after))
-        listing = json_loads(listing_string)
-        del listing_string  # free up some ram
-        for child in listing['data']['children']:
+        listing = self._remote_fetcher.get_json_items(self._get_uri(self._after), ('data', 'children'))
+        for child in listing:
             image_uri = self._get_image(child['data'])
             if image_uri:
                 images.add(
                     Image(
                         uri=image_uri,
-                        source=urljoin(uri, child['data']['permalink']),
+                        source=urljoin(listing.uri, child['data']['permalink']),
                     )
                 )
-        after: Optional[str] = listing['data']['after']
+        after: Optional[str] = listing.document['data']['after']
         self._at_end = after is None
         if not self._at_end:
             self._after = after
@@ -1,32 +1,55 @@
-__all__ = ["WebServer"]
+__all__ = ["WebServer", "create_app"]
 
-from json import JSONEncoder
+import logging
+import sys
+from atexit import register as atexit_register
+from contextlib import contextmanager
+from hashlib import blake2b
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.connection import Client, Connection, Listener, wait
+from operator import attrgetter
+from os import environ, urandom
 from os.path import dirname, join as path_join
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
+from queue import Empty, Queue
+from signal import SIGTERM, signal
+from threading import Condition, Event, Lock, Thread, current_thread, main_thread
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
+from weakref import WeakKeyDictionary
 
 from mako.template import Template  # type: ignore
 from werkzeug.datastructures import Headers
-from werkzeug.exceptions import HTTPException, InternalServerError, NotFound
+from werkzeug.exceptions import BadRequest, HTTPException, InternalServerError, NotFound
 from werkzeug.routing import Map, Rule
-from werkzeug.serving import run_simple
+from werkzeug.serving import BaseWSGIServer, make_server, run_simple
 from werkzeug.utils import redirect
 from werkzeug.wrappers import Request, Response
 
 from . import __version__ as nichtparasoup_version
-from ._internals import _log, _type_module_name_str
+from ._internals import _json_dumps, _log, _logging_init, _type_module_name_str
+from ._staticfiles import _StaticFiles
+from .config import ConfigFilePath, get_config, get_imageserver
+from .core import Crawler
+from .core.image import ImagePool
 from .core.imagecrawler import BaseImageCrawler
-from .core.server import BlacklistStatus, CrawlerStatus, Server, ServerStatus, StatusLike
+from .core.server import BlacklistStatus, CrawlerStatus, ImageResponse, Server, ServerStatus, StatusLike
+from .core.sharedimagepool import SharedImagePools
 
 
-class _SimpleJsonEncoder(JSONEncoder):
-    def default(self, o: Any) -> Any:
-        if hasattr(o, '__dict__'):
-            return o.__dict__
-        return super().default(o)
+def _simple_json_default(o: Any) -> Any:
+    if isinstance(o, (set, frozenset, tuple)):
+        # images' `more` might contain sets - see :class:`nichtparasoup.core.image.Image`
+        # some JSON backends take no subclasses of tuple and float
+        return list(o)
+    if isinstance(o, float):
+        return float(o)
+    if hasattr(o, '__dict__'):
+        return o.__dict__
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
 
 
 class _SimpleJsonResponse(Response):
-    __json_encoder: Optional[_SimpleJsonEncoder] = None
+    """A JSON response - of any data, or of pre-encoded JSON bytes."""
 
     def __init__(self,
                  response: Any,
@@ -36,10 +59,8 @@ class _SimpleJsonResponse(Response):
                  content_type: Optional[str] = 'application/json',
                  direct_passthrough: bool = False
                  ) -> None:  # pragma: no cover
-        if not self.__json_encoder:
-            self.__json_encoder = _SimpleJsonEncoder()
         super().__init__(
-            response=self.__json_encoder.encode(response),
+            response=response if isinstance(response, bytes) else _json_dumps(response, _simple_json_default),
             status=status,
             headers=headers,
             mimetype=mimetype,
@@ -52,6 +73,215 @@ _DirPath = str
 _FilePath = str
 
 
+class _PoolClient:
+    """Query payloads from the :class:`_PoolOwner`, in a web worker process.
+
+    This class is intended to be thread save: each query uses a connection of its own.
+    Idle connections are reused.
+    """
+
+    def __init__(self, address: Any, authkey: bytes) -> None:
+        self._address = address
+        self._authkey = authkey
+        self._idle: List[Connection] = []
+        self._lock = Lock()
+
+    def query(self, payload: str, *args: Any) -> Any:
+        connection = self._acquire()
+        try:
+            connection.send((payload, args))
+            succeeded, result = connection.recv()
+        except BaseException:
+            connection.close()
+            raise
+        self._release(connection)
+        if not succeeded:
+            raise RuntimeError(f'pool owner failed on {payload!r}: {result}')
+        return result
+
+    def _acquire(self) -> Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return Client(self._address, authkey=self._authkey)
+
+    def _release(self, connection: Connection) -> None:
+        with self._lock:
+            self._idle.append(connection)
+
+
+class _PoolOwner(Thread):
+    """Answer the payload queries of web worker processes - see :class:`_PoolClient`.
+
+    Runs in the process that owns the imageserver and its crawlers.
+    """
+
+    def __init__(self, webserver: 'WebServer') -> None:
+        super().__init__(daemon=True)
+        self._webserver = webserver
+        self.authkey = urandom(32)
+        self._listener = Listener(backlog=128, authkey=self.authkey)
+        self.address = self._listener.address
+
+    def run(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:  # listener was closed
+                break
+            except Exception as ex:
+                _log('debug', 'Handled exception: %s', ex, exc_info=ex)
+                continue
+            Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def close(self) -> None:
+        self._listener.close()
+
+    def _serve(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    payload, args = connection.recv()
+                except (EOFError, OSError):
+                    break
+                connection.send(self._answer(payload, args))
+
+    def _answer(self, payload: str, args: Tuple[Any, ...]) -> Tuple[bool, Any]:
+        try:
+            return True, self._webserver._payload(payload, *args)
+        except Exception as ex:
+            _log('debug', 'Handled exception: %s', ex, exc_info=ex)
+            return False, str(ex)
+
+
+class _ServedReporter(Thread):
+    """Report the crawlers that served images to the :class:`_PoolOwner`, in a web worker process.
+
+    Used when the web worker process pops the images from shared pools itself,
+    while the pool owner keeps the statistics and schedules the refills.
+    Reports are batched in the background, so serving does not wait for the pool owner.
+    """
+
+    def __init__(self, pool_client: _PoolClient, crawlers: Sequence[Crawler]) -> None:
+        super().__init__(daemon=True)
+        self._pool_client = pool_client
+        self._indexes = {crawler: index for index, crawler in enumerate(crawlers)}
+        self._pending: List[int] = []
+        self._lock = Lock()
+        self._wakeup = Event()
+
+    def report(self, responses: Sequence[ImageResponse]) -> None:
+        with self._lock:
+            self._pending.extend(self._indexes[response.crawler] for response in responses)
+        self._wakeup.set()
+
+    def run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                pending, self._pending = self._pending, []
+            try:
+                self._pool_client.query('served', pending)
+            except Exception as ex:
+                _log('debug', 'Handled exception: %s', ex, exc_info=ex)
+
+
+def _stream_event(image: Optional[bytes]) -> bytes:
+    """A server-sent event: the image, encoded as JSON - or a keep-alive comment."""
+    return b''.join((b'data: ', image, b'\n\n')) if image is not None else b': keep-alive\n\n'
+
+
+class _StreamSubscription:
+    def __init__(self, interval: float, deliver: Callable[[bytes], None]) -> None:  # pragma: no cover
+        self.interval = interval
+        self.deliver = deliver
+        self.due = monotonic()
+
+
+class _ImageStreamer(Thread):
+    """Push images to subscribed streams - each at its own interval.
+
+    Once per tick, the images for all subscriptions that are due are fetched in a single batch.
+    If there are not enough images, the subscriptions that waited the longest are served first.
+    The others stay due - so they are served first on the next tick.
+
+    :param fetch: Fetch up to a number of images, encoded as JSON.
+    """
+
+    TICK = 0.5
+    """Seconds between two batches."""
+
+    def __init__(self, fetch: Callable[[int], List[bytes]]) -> None:
+        super().__init__(daemon=True)
+        self._fetch = fetch
+        self._subscriptions: Set[_StreamSubscription] = set()
+        self._changed = Condition()
+
+    def subscribe(self, interval: float, deliver: Callable[[bytes], None]) -> _StreamSubscription:
+        """Get an image delivered right away, and then every `interval` seconds - if there are images."""
+        subscription = _StreamSubscription(interval, deliver)
+        with self._changed:
+            self._subscriptions.add(subscription)
+            self._changed.notify()
+        return subscription
+
+    def unsubscribe(self, subscription: _StreamSubscription) -> None:
+        with self._changed:
+            self._subscriptions.discard(subscription)
+
+    def run(self) -> None:
+        while True:
+            with self._changed:
+                while not self._subscriptions:
+                    self._changed.wait()
+                subscriptions = list(self._subscriptions)
+            self._push(subscriptions)
+            sleep(self.TICK)
+
+    def _push(self, subscriptions: List[_StreamSubscription]) -> None:
+        now = monotonic()
+        due = sorted((subscription for subscription in subscriptions if subscription.due <= now),
+                     key=attrgetter('due'))
+        if not due:
+            return
+        try:
+            images = self._fetch(len(due))
+        except Exception as ex:
+            _log('debug', 'Handled exception: %s', ex, exc_info=ex)
+            return
+        for subscription, image in zip(due, images):
+            subscription.due = now + subscription.interval
+            self._deliver(subscription, image)
+
+    @staticmethod
+    def _deliver(subscription: _StreamSubscription, image: bytes) -> None:
+        try:
+            subscription.deliver(image)
+        except Exception as ex:  # the receiving end is gone
+            _log('debug', 'Handled exception: %s', ex, exc_info=ex)
+
+
+def _raise_keyboard_interrupt(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt()
+
+
+@contextmanager
+def _interrupt_on_sigterm() -> Iterator[None]:
+    """Raise :class:`KeyboardInterrupt` on SIGTERM - so a terminated process cleans up like an interrupted one.
+
+    Signal handlers can be set in the main thread only - elsewhere this does nothing.
+    """
+    if current_thread() is not main_thread():
+        yield
+        return
+    previous = signal(SIGTERM, _raise_keyboard_interrupt)
+    try:
+        yield
+    finally:
+        signal(SIGTERM, previous)
+
+
 class WebServer:
     _TEMPLATE_FILES: _DirPath = path_join(dirname(__file__), '_web-ui', 'templates')
     _STATIC_FILES: _DirPath = path_join(dirname(__file__), '_web-ui', 'static')
@@ -60,16 +290,25 @@ class WebServer:
     def __init__(self, imageserver: Server,
                  hostname: str, port: int,
                  *,
-                 developer_mode: bool = False) -> None:
+                 developer_mode: bool = False,
+                 processes: int = 1) -> None:
         """
         :param imageserver: The imageserver to represent.
         :param hostname: The hostname to bind to.
         :param port: The port to bind to.
         :param developer_mode: Run in insecure web-developer mode; sets CORS to "*".
+        :param processes: Number of pre-forked web worker processes.
+            If more than one, the imageserver and its crawlers run in the main process,
+            and the web workers query it via a local socket.
+            The crawlers' images are moved to pools in shared memory - if supported -
+            so the web workers pop the images themselves.
         """
+        if processes < 1:
+            raise ValueError(f'processes must be greater than 0, got {processes!r}')
         rules = [
             Rule('/', endpoint='root'),
             Rule('/get', endpoint='get'),
+            Rule('/stream', endpoint='stream'),
             Rule('/status', endpoint='status'),
             Rule('/status/<what>', endpoint='status_what'),
             Rule('/reset', endpoint='reset'),
@@ -82,7 +321,15 @@ class WebServer:
         self.imageserver = imageserver
         self.hostname = hostname
         self.port = port
+        self.processes = processes
         self._url_map = Map(rules)
+        self._pool_client: Optional[_PoolClient] = None
+        self._served_reporter: Optional[_ServedReporter] = None
+        self._crawler_json: 'WeakKeyDictionary[Crawler, bytes]' = WeakKeyDictionary()
+        self._streamer: Optional[_ImageStreamer] = None
+        self._streamer_lock = Lock()
+        self._sourceicons: Optional[Tuple[FrozenSet[Type[BaseImageCrawler]], List[Tuple[str, str]]]] = None
+        self._sourceicons_css: Optional[Tuple[Tuple[Tuple[str, ...], ...], bytes, str]] = None
 
     def __call__(self, environ: Dict[str, Any], start_response: Any) -> Any:  # pragma: no cover
         return self.wsgi_app(environ, start_response)
@@ -103,8 +350,9 @@ class WebServer:
     def wsgi_app(self, environ: Dict[str, Any], start_response: Any) -> Any:
         request = Request(environ)
         response = self.dispatch_request(request)
-        response.cache_control.no_cache = True
-        response.cache_control.no_store = True
+        if not response.cache_control:
+            response.cache_control.no_cache = True
+            response.cache_control.no_store = True
         if self.developer_mode:
             # via `werkzeug.wrappers.CORSResponseMixin`
             response.access_control_allow_origin = '*'  # type: ignore[attr-defined]
@@ -117,56 +365,167 @@ class WebServer:
         forward.autocorrect_location_header = False
         return forward
 
-    def on_get(self, _: Request) -> Response:
-        response = self.imageserver.get_image()
-        return _SimpleJsonResponse({
-            'uri': response.image.uri,
-            'is_generic': response.image.is_generic,
-            'source': response.image.source,
-            'more': response.image.more,
-            'crawler': {
-                'id': id(response.crawler),
-                'type': _type_module_name_str(type(response.crawler.imagecrawler)),
-            },
-        }) if response else _SimpleJsonResponse({
+    _PAYLOADS = frozenset({'get', 'images', 'served', 'status', 'reset', 'sourceicons'})
+
+    _SHARED_PAYLOADS = frozenset({'get', 'images'})
+    """payloads that a web worker process gets itself - when the crawlers' images are in shared pools"""
+
+    def _payload(self, payload: str, *args: Any) -> Any:
+        """Get the payload of an endpoint from the imageserver in this process."""
+        if payload not in self._PAYLOADS:
+            raise ValueError(f'unknown payload {payload!r}')
+        return getattr(self, f'_payload_{payload}')(*args)
+
+    def _query(self, payload: str, *args: Any) -> Any:
+        """Get the payload of an endpoint - from the pool owner process, if this is a web worker process."""
+        if self._pool_client and not (self._served_reporter and payload in self._SHARED_PAYLOADS):
+            return self._pool_client.query(payload, *args)
+        return self._payload(payload, *args)
+
+    def _payload_served(self, crawlers: List[int]) -> None:
+        """Count images that a web worker process popped from the shared pools - by the crawlers' indexes."""
+        all_crawlers = self.imageserver.core.crawlers
+        self.imageserver.count_served([all_crawlers[crawler] for crawler in crawlers])
+
+    def _report_served(self, responses: List[ImageResponse]) -> None:
+        if self._served_reporter and responses:
+            self._served_reporter.report(responses)
+
+    def _get_crawler_json(self, crawler: Crawler) -> bytes:
+        crawler_json = self._crawler_json.get(crawler)
+        if crawler_json is None:
+            crawler_json = self._crawler_json[crawler] = _json_dumps({
+                'id': id(crawler),
+                'type': _type_module_name_str(type(crawler.imagecrawler)),
+            })
+        return crawler_json
+
+    def _image_json(self, response: ImageResponse) -> bytes:
+        """The image as JSON: uri, is_generic, source, more and crawler.
+
+        Composed of the image's pre-encoded JSON - see :meth:`nichtparasoup.core.image.Image.to_json`.
+        """
+        return b''.join((response.image.to_json()[:-1], b',"crawler":', self._get_crawler_json(response.crawler), b'}'))
+
+    def _payload_get(self, count: Optional[int] = None) -> Optional[bytes]:
+        if count is None:
+            response = self.imageserver.get_image()
+            self._report_served([response] if response else [])
+            return self._image_json(response) if response else None
+        responses = self.imageserver.get_images(count)
+        self._report_served(responses)
+        return b''.join((b'[', b','.join(map(self._image_json, responses)), b']')) if responses else None
+
+    @staticmethod
+    def _get_int_arg(request: Request, name: str, lower: int, upper: int) -> Optional[int]:
+        """Get an integer query parameter, clamped to `lower`..`upper`. `None` if not set."""
+        value = request.args.get(name)
+        if value is None:
+            return None
+        try:
+            return min(max(int(value), lower), upper)
+        except ValueError as ex:
+            raise BadRequest(f'{name} must be an integer, got {value!r}') from ex
+
+    _GET_COUNT_MAX = 50
+
+    def on_get(self, request: Request) -> Response:
+        images = self._query('get', self._get_int_arg(request, 'count', 1, self._GET_COUNT_MAX))
+        return _SimpleJsonResponse(images) if images else _SimpleJsonResponse({
             'status': 404,
             'desc': 'Server is exhausted. Come back later.',
         }, status='404 EXHAUSTED')
 
+    def _payload_images(self, count: int) -> List[bytes]:
+        responses = self.imageserver.get_images(count)
+        self._report_served(responses)
+        return [self._image_json(response) for response in responses]
+
+    def _fetch_images(self, count: int) -> List[bytes]:
+        images: List[bytes] = self._query('images', count)
+        return images
+
+    def _get_streamer(self) -> _ImageStreamer:
+        # started on demand - so it is started in the web worker process, after forking
+        with self._streamer_lock:
+            if not self._streamer:
+                self._streamer = _ImageStreamer(self._fetch_images)
+                self._streamer.start()
+            return self._streamer
+
+    _STREAM_INTERVAL_DEFAULT = 10
+    _STREAM_INTERVAL_MAX = 60 * 60
+    _STREAM_KEEPALIVE = 15.0
+
+    def on_stream(self, request: Request) -> Response:
+        interval = self._get_int_arg(request, 'interval', 1, self._STREAM_INTERVAL_MAX)
+        images: 'Queue[bytes]' = Queue()
+        streamer = self._get_streamer()
+        subscription = streamer.subscribe(interval or self._STREAM_INTERVAL_DEFAULT, images.put)
+        return Response(self._stream_events(streamer, subscription, images),
+                        mimetype='text/event-stream', headers={'X-Accel-Buffering': 'no'})
+
+    def _stream_events(self, streamer: _ImageStreamer, subscription: _StreamSubscription,
+                       images: 'Queue[bytes]') -> Iterator[bytes]:
+        """Server-sent events: an image per message, encoded as JSON.
+        Comments keep the connection alive, and reveal when the client is gone.
+        """
+        try:
+            while True:
+                try:
+                    image: Optional[bytes] = images.get(timeout=self._STREAM_KEEPALIVE)
+                except Empty:
+                    image = None
+                yield _stream_event(image)
+        finally:
+            streamer.unsubscribe(subscription)
+
     _STATUS_WHATS: Dict[str, Type[StatusLike]] = {
         'server': ServerStatus,
         'blacklist': BlacklistStatus,
         'crawlers': CrawlerStatus,
     }
 
+    def _payload_status(self, what: Optional[str]) -> Optional[Union[StatusLike, Dict[str, Union[StatusLike, str]]]]:
+        if what is None:
+            response: Dict[str, Union[StatusLike, str]] = {
+                what: status_type.of_server(self.imageserver)
+                for what, status_type
+                in self._STATUS_WHATS.items()
+            }
+            response['version'] = nichtparasoup_version
+            return response
+        status_type = self._STATUS_WHATS.get(what)
+        return status_type.of_server(self.imageserver) if status_type else None
+
     def on_status(self, _: Request) -> Response:
-        response: Dict[str, Union[StatusLike, str]] = {
-            what: status_type.of_server(self.imageserver)
-            for what, status_type
-            in self._STATUS_WHATS.items()
-        }
-        response['version'] = nichtparasoup_version
-        return _SimpleJsonResponse(response)
+        return _SimpleJsonResponse(self._query('status', None))
 
     def on_status_what(self, _: Request, what: str) -> Response:
-        status_type = self._STATUS_WHATS.get(what)
-        if status_type:
-            return _SimpleJsonResponse(status_type.of_server(self.imageserver))
+        status = self._query('status', what)
+        if status is not None:
+            return _SimpleJsonResponse(status)
         raise NotFound()
 
-    def on_reset(self, _: Request) -> Response:
+    def _payload_reset(self) -> Dict[str, Any]:
         reset = self.imageserver.request_reset()
-        return _SimpleJsonResponse({
+        return {
             'requested': reset.requested,
             'timeout': reset.timeout,
-        }, status=202)
+        }
 
-    def on_sourceicons(self, _: Request) -> Response:
-        imagecrawlers: Set[Type[BaseImageCrawler]] = {
+    def on_reset(self, _: Request) -> Response:
+        return _SimpleJsonResponse(self._query('reset'), status=202)
+
+    def _payload_sourceicons(self) -> List[Tuple[str, str]]:
+        imagecrawlers: FrozenSet[Type[BaseImageCrawler]] = frozenset(
             type(crawler.imagecrawler)
             for crawler
             in self.imageserver.core.crawlers
-        }
+        )
+        cached = self._sourceicons
+        if cached is not None and cached[0] == imagecrawlers:
+            return cached[1]
         names_icons_list: List[Tuple[str, str]] = [
             (_type_module_name_str(imagecrawler), icon)
             for imagecrawler, icon
@@ -177,21 +536,59 @@ class WebServer:
             )
             if icon
         ]
+        self._sourceicons = imagecrawlers, names_icons_list
+        return names_icons_list
+
+    _SOURCEICONS_MAX_AGE = 24 * 60 * 60
+
+    def _render_sourceicons(self, names_icons_list: List[Tuple[str, str]]) -> Tuple[bytes, str]:
+        """:return: The CSS and its ETag. Rendered again only if the crawlers' icons changed."""
+        key = tuple(map(tuple, names_icons_list))
+        cached = self._sourceicons_css
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
         # cannot use dict for `names_icons_list` in template. will break the template occasionally :-/
         template = Template(filename=path_join(self._TEMPLATE_FILES, 'css', 'sourceIcons.css.mako'))
-        css = template.render(names_icons_list=names_icons_list)
-        return Response(css, mimetype='text/css')
+        css: bytes = template.render(names_icons_list=names_icons_list).encode()
+        etag = blake2b(css, digest_size=16).hexdigest()
+        self._sourceicons_css = key, css, etag
+        return css, etag
+
+    def on_sourceicons(self, request: Request) -> Response:
+        css, etag = self._render_sourceicons(self._query('sourceicons'))
+        response = Response(css, mimetype='text/css')
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self._SOURCEICONS_MAX_AGE
+        conditional: Response = response.make_conditional(request)
+        return conditional
+
+    def start(self) -> None:
+        """Start the imageserver - unless it runs already."""
+        if not self.imageserver.is_alive():
+            self.imageserver.start()
+
+    def stop(self) -> None:
+        """Stop the imageserver - if it runs."""
+        if self.imageserver.is_alive():
+            self.imageserver.stop()
 
     def run(self) -> None:  # pragma: no cover
+        if self.processes > 1 and 'fork' not in get_all_start_methods():
+            _log('warning', ' * cannot fork web worker processes on this platform. running a single process')
+            self.processes = 1
+        if self.processes > 1:
+            self._run_workers()
+        else:
+            self._run_simple()
+
+    def _run_simple(self) -> None:  # pragma: no cover
         self.imageserver.start()
-        if self.developer_mode:
-            _log('info', ' * starting %s in web-developer mode', type(self).__name__)
-        _log('info', ' * starting %s bound to %s:%d', type(self).__name__, self.hostname, self.port)
+        self._log_starting()
         try:
             run_simple(
                 self.hostname, self.port,
-                application=self,
-                static_files={'/': self._STATIC_FILES},
+                application=_StaticFiles(self, self._STATIC_FILES),
                 processes=1, threaded=True,
                 use_reloader=False,
                 use_debugger=False)
@@ -203,3 +600,112 @@ class WebServer:
             _log('info', ' * stopped %s bound to %s:%d', type(self).__name__, self.hostname, self.port)
         finally:
             self.imageserver.stop()
+
+    def _log_starting(self) -> None:  # pragma: no cover
+        if self.developer_mode:
+            _log('info', ' * starting %s in web-developer mode', type(self).__name__)
+        _log('info', ' * starting %s bound to %s:%d', type(self).__name__, self.hostname, self.port)
+
+    def _run_workers(self) -> None:  # pragma: no cover
+        """Pre-fork web worker processes that share the bound socket.
+
+        Workers are forked before the imageserver starts its threads.
+        """
+        shared_pools = self._share_pools()
+        httpd = make_server(self.hostname, self.port, _StaticFiles(self, self._STATIC_FILES),
+                            threaded=True)
+        pool_owner = _PoolOwner(self)
+        fork = get_context('fork')
+        workers = [fork.Process(target=self._serve_worker, args=(httpd, pool_owner.address, pool_owner.authkey),
+                                name=f'{type(self).__name__}-worker-{n}', daemon=True)
+                   for n in range(self.processes)]
+        for worker in workers:
+            worker.start()
+        httpd.server_close()  # the workers own the socket now
+        try:
+            with _interrupt_on_sigterm():
+                self._run_pool_owner(pool_owner, workers)
+        finally:
+            pool_owner.close()
+            for worker in workers:
+                worker.terminate()
+                worker.join()
+            if shared_pools:
+                shared_pools.close()
+                shared_pools.unlink()
+
+    def _run_pool_owner(self, pool_owner: _PoolOwner, workers: List[Any]) -> None:  # pragma: no cover
+        self.imageserver.start()
+        pool_owner.start()
+        self._log_starting()
+        _log('info', ' * serving via %d web worker processes', len(workers))
+        try:
+            wait([worker.sentinel for worker in workers])
+            raise RuntimeError('web worker process ended unexpectedly')
+        except KeyboardInterrupt:
+            _log('info', ' * stopped %s bound to %s:%d', type(self).__name__, self.hostname, self.port)
+        except Exception as ex:
+            _log('debug', 'Handled exception: %s', ex, exc_info=ex)
+            _log('error', ' * Error occurred. stopping everything')
+            raise ex
+        finally:
+            self.imageserver.stop()
+
+    def _serve_worker(self, httpd: BaseWSGIServer, address: Any, authkey: bytes) -> None:  # pragma: no cover
+        """Serve in a forked web worker process - query the payloads from the pool owner."""
+        self._pool_client = _PoolClient(address, authkey)
+        if self._is_pool_shared():
+            self._served_reporter = _ServedReporter(self._pool_client, self.imageserver.core.crawlers)
+            self._served_reporter.start()
+        httpd.serve_forever()
+
+    _SHARED_POOL_HEADROOM = 512
+    """number of images a shared pool can hold beyond the crawler upkeep - a crawl adds a page at once"""
+
+    _SHARED_POOL_SLOT_SIZE = 2048
+
+    def _share_pools(self) -> Optional[SharedImagePools]:
+        """Move the images of the crawlers to pools in shared memory - so web worker processes can pop them.
+
+        Only the in-process :class:`nichtparasoup.core.image.ImagePool` are moved.
+        :return: The shared pools. `None` if there were none to move, or shared memory is not supported.
+        """
+        crawlers = [crawler for crawler in self.imageserver.core.crawlers if isinstance(crawler.images, ImagePool)]
+        if not crawlers or sys.version_info < (3, 8):
+            return None
+        pools = SharedImagePools(len(crawlers), self.imageserver.keep + self._SHARED_POOL_HEADROOM,
+                                 self._SHARED_POOL_SLOT_SIZE)
+        for crawler, pool in zip(crawlers, pools):
+            pool |= crawler.images
+            crawler.images = pool
+        return pools
+
+    def _is_pool_shared(self) -> bool:
+        """Whether the images of all crawlers are in shared pools - see :attr:`BaseImagePool.shared`."""
+        return all(crawler.images.shared for crawler in self.imageserver.core.crawlers)
+
+
+_CONFIG_FILE_ENV = 'NICHTPARASOUP_CONFIG'
+"""environment variable of the config file that :func:`create_app` defaults to"""
+
+
+def create_app(config_file: Optional[ConfigFilePath] = None, *, developer_mode: bool = False) -> _StaticFiles:
+    """Create the WSGI application - for WSGI servers like gunicorn or waitress.
+
+    Sets up the imageserver as configured, and starts it. It is stopped when the process exits.
+    Call once per worker process: do not let the WSGI server load the application before it forks its workers.
+    The config settings of the webserver are not used - the WSGI server binds.
+
+    Example: ``gunicorn --worker-class gthread 'nichtparasoup.webserver:create_app("config.yaml")'``
+
+    :param config_file: The config file. Defaults to the file in environment variable ``NICHTPARASOUP_CONFIG``,
+        or the default config.
+    :param developer_mode: Run in insecure web-developer mode; sets CORS to "*".
+    :return: The application, including the static files of the web-UI.
+    """
+    config = get_config(config_file or environ.get(_CONFIG_FILE_ENV))
+    _logging_init(getattr(logging, config['logging']['level']))
+    webserver = WebServer(get_imageserver(config), '', 0, developer_mode=developer_mode)
+    webserver.start()
+    atexit_register(webserver.stop)
+    return _StaticFiles(webserver, WebServer._STATIC_FILES)
@@ -1,4 +1,4 @@
-__all__ = ["MockableImageCrawler", "YetAnotherImageCrawler"]
+__all__ = ["MockableImageCrawler", "YetAnotherImageCrawler", "AsyncMockableImageCrawler"]
 
 from typing import Any, Dict
 
@@ -39,3 +39,11 @@ class YetAnotherImageCrawler(MockableImageCrawler):
     another implementation, to see if type matters
     """
     pass
+
+
+class AsyncMockableImageCrawler(MockableImageCrawler):
+    """An imagecrawler that natively crawls async, but does nothing. use it for mocking ...
+    """
+
+    async def _crawl_async(self) -> ImageCollection:
+        return ImageCollection()
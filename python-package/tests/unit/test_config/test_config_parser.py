@@ -41,6 +41,13 @@ class TestConfigParserCall:
         with pytest.raises(FileNotFoundError):
             parse_yaml_file(file)
 
+    def test_snapshot_with_redis(self) -> None:
+        # arrange
+        file = _TESTDATA_NEGATIVE / 'snapshot_with_redis.yaml'
+        # act & assert
+        with pytest.raises(ValueError, match='snapshot_file'):
+            parse_yaml_file(file)
+
 
 class TestConfigParserDefaults:
 
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from nichtparasoup.config import get_imageserver, parse_yaml_file
+from nichtparasoup.core import Blacklist
+from nichtparasoup.core.lease import FileLeases
+
+_CONFIG = '''
+webserver:
+  hostname: "localhost"
+  port: 5000
+imageserver:
+  crawler_upkeep: 20
+  lease_directory: "{lease_directory}"
+crawlers:
+  - name: "Echo"
+    weight: 2
+    config:
+      image_uri: "test://echo"
+'''
+
+
+def test_get_imageserver(tmp_path: Path) -> None:
+    # arrange
+    config_file = tmp_path / 'config.yaml'
+    config_file.write_text(_CONFIG.format(lease_directory=tmp_path / 'leases'))
+    config = parse_yaml_file(config_file)
+    # act
+    imageserver = get_imageserver(config)
+    # assert
+    assert not imageserver.is_alive()
+    assert 20 == imageserver.keep
+    assert isinstance(imageserver.core.blacklist, Blacklist)
+    assert isinstance(imageserver.leases, FileLeases)
+    crawler, = imageserver.core.crawlers
+    assert 2 == crawler.weight
+    assert 'test://echo' == crawler.imagecrawler.get_config()['image_uri']
+    assert 'lease_directory' in config['imageserver'], 'config untouched'
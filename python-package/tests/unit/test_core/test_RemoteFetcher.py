@@ -1,13 +1,16 @@
-from http.client import HTTPResponse
+from http.client import HTTPMessage, HTTPResponse
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+from json import JSONDecodeError, dumps as json_dumps
 from pathlib import Path
 from threading import Thread
-from typing import List, Tuple, Type
+from typing import List, Sequence, Tuple, Type
+from urllib.response import addinfourl
 
 import pytest
 from _pytest.tmpdir import TempdirFactory
 
-from nichtparasoup.core.imagecrawler import RemoteFetcher
+from nichtparasoup.core.imagecrawler import JsonItems, RemoteFetcher
 
 
 class TestRemoteFetcher:
@@ -129,3 +132,54 @@ class TestRemoteFetcher:
         httpd.shutdown()
         # assert
         assert got_body == exp_body
+
+
+class TestJsonItems:
+
+    @staticmethod
+    def get_items(document: str, path: Sequence[str], chunk_size: int) -> JsonItems:
+        response = addinfourl(BytesIO(document.encode()), HTTPMessage(), 'test', 200)
+        items = JsonItems(response, 'UTF-8', path, 'test')
+        items._CHUNK_SIZE = chunk_size
+        return items
+
+    @pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+    def test_items_and_document(self, chunk_size: int) -> None:
+        # arrange
+        document = {'kind': 'Listing', 'data': {
+            'after': None, 'dist': 123456,
+            'children': [{'data': {'id': n, 'title': 'ä ' * n}} for n in range(5)],
+            'before': 't3_foo',
+        }}
+        # act
+        items = self.get_items(json_dumps(document, indent=1), ('data', 'children'), chunk_size)
+        got_items = list(items)
+        # assert
+        assert document['data']['children'] == got_items  # type: ignore[index]
+        assert {'kind': 'Listing', 'data': {'after': None, 'dist': 123456, 'children': [], 'before': 't3_foo'}} \
+            == items.document
+
+    def test_path_not_found(self) -> None:
+        # act
+        items = self.get_items('{"foo": [1, 2]}', ('items',), 2)
+        # assert
+        assert [] == list(items)
+        assert {'foo': [1, 2]} == items.document
+
+    def test_path_not_an_array(self) -> None:
+        # act & assert
+        with pytest.raises(JSONDecodeError):
+            list(self.get_items('{"items": {"foo": 1}}', ('items',), 2))
+
+    def test_malformed(self) -> None:
+        # act & assert
+        with pytest.raises(JSONDecodeError):
+            list(self.get_items('{"items": [1, 2', ('items',), 2))
+
+    def test_closes_response(self) -> None:
+        # arrange
+        items = self.get_items('{"items": []}', ('items',), 2)
+        # act
+        list(items)
+        # assert
+        assert items._response.closed  # type: ignore[union-attr]
@@ -0,0 +1,146 @@
+from asyncio import Event as AsyncEvent, ensure_future, gather, new_event_loop, sleep as async_sleep
+from concurrent.futures import Future
+from typing import Any, Awaitable, List, Optional
+
+import pytest
+
+from nichtparasoup.core import AsyncNPCore, Crawler
+from nichtparasoup.core.image import Image, ImageCollection
+
+from .._mocks.mockable_imagecrawler import AsyncMockableImageCrawler, MockableImageCrawler
+
+
+class _Running:
+    def __init__(self) -> None:
+        self.now = 0
+        self.max = 0
+
+
+class _CountingImageCrawler(AsyncMockableImageCrawler):
+
+    def __init__(self, running: _Running, **config: Any) -> None:
+        super().__init__(**config)
+        self.running = running
+        self.crawled = 0
+
+    async def _crawl_async(self) -> ImageCollection:
+        self.crawled += 1
+        self.running.now += 1
+        self.running.max = max(self.running.max, self.running.now)
+        await async_sleep(0.01)
+        self.running.now -= 1
+        return ImageCollection(
+            Image(uri=f'{self.config}_{self.crawled}_{i}', source='test') for i in range(self.config['per_crawl'])
+        )
+
+
+def _run(awaitable: Awaitable[None]) -> None:
+    loop = new_event_loop()
+    try:
+        loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
+
+
+class TestAsyncNPCore:
+
+    def test_max_concurrency_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            AsyncNPCore(max_concurrency=0)
+
+    def test_fill_up_to(self) -> None:
+        # arrange
+        running = _Running()
+        core = AsyncNPCore(max_concurrency=2)
+        imagecrawlers = [_CountingImageCrawler(running, per_crawl=3, n=n) for n in range(5)]
+        for imagecrawler in imagecrawlers:
+            core.add_imagecrawler(imagecrawler)
+        refilled: List[int] = []
+
+        def on_refill(_: Crawler, count: int) -> None:
+            refilled.append(count)
+
+        # act
+        core.fill_up_to(10, on_refill=on_refill, delay=0)
+        # assert
+        assert all(len(crawler.images) == 12 for crawler in core.crawlers)
+        assert [3] * 4 * 5 == refilled
+        assert all(imagecrawler.crawled == 4 for imagecrawler in imagecrawlers)
+        assert 2 == running.max
+
+    def test_fill_up_to_sync_imagecrawler(self) -> None:
+        # arrange
+        core = AsyncNPCore()
+        core.add_imagecrawler(MockableImageCrawler())
+        imagecrawler = core.crawlers[0].imagecrawler
+        imagecrawler._crawl = lambda: ImageCollection({Image(uri='test', source='test')})  # type: ignore[assignment]
+        # act
+        core.fill_up_to(10, on_refill=None, delay=0)
+        # assert
+        assert 1 == len(core.crawlers[0].images)
+
+    def test_keep_filled_up_to(self) -> None:
+        # arrange
+        core = AsyncNPCore()
+        imagecrawler = _CountingImageCrawler(_Running(), per_crawl=1)
+        core.add_imagecrawler(imagecrawler)
+        crawler = core.crawlers[0]
+
+        async def drain_and_stop(stop: AsyncEvent) -> None:
+            await async_sleep(0.1)
+            crawler.images.clear()
+            await async_sleep(0.1)
+            stop.set()
+
+        async def keep_filled_up_and_drain() -> None:
+            stop = AsyncEvent()
+            await gather(
+                core.keep_filled_up_to(2, stop, on_refill=None, delay=0, interval=0.01),
+                drain_and_stop(stop))
+
+        # act
+        _run(keep_filled_up_and_drain())
+        # assert
+        assert 2 == len(crawler.images)
+        assert 4 == imagecrawler.crawled
+
+    def test_exclusive_with_workers(self) -> None:
+        # arrange
+        core = AsyncNPCore()
+        imagecrawler = _CountingImageCrawler(_Running(), per_crawl=1)
+        core.add_imagecrawler(imagecrawler)
+        crawler = core.crawlers[0]
+        crawls: List[Optional['Future[int]']] = []
+
+        async def fill_up_and_crawl() -> None:
+            fill_up = ensure_future(core.fill_up_to_async(2, on_refill=None, delay=0))
+            await async_sleep(0.005)  # while crawling
+            crawls.append(core.crawl_crawler(crawler))
+            await fill_up
+
+        # act
+        _run(fill_up_and_crawl())
+        # assert
+        assert [None] == crawls
+        assert 2 == imagecrawler.crawled
+        assert not core._fill_ups
+        core.close()
+
+    def test_close(self) -> None:
+        # arrange
+        core = AsyncNPCore()
+        core.add_imagecrawler(MockableImageCrawler())
+        crawler = core.crawlers[0]
+        crawler.imagecrawler._crawl = lambda: ImageCollection(  # type: ignore[assignment]
+            {Image(uri=f'test_{len(crawler.images)}', source='test')})
+        core.fill_up_to(1, on_refill=None, delay=0)
+        loop, thread = core._loop, core._loop_thread
+        # act
+        core.close()
+        # assert
+        assert loop and loop.is_closed()
+        assert thread and not thread.is_alive()
+        assert core._workers is None
+        core.fill_up_to(2, on_refill=None, delay=0)
+        assert 2 == len(crawler.images), 'started again on demand'
+        core.close()
@@ -1,8 +1,13 @@
-from typing import List
+from asyncio import new_event_loop
+from threading import Thread, current_thread
+from typing import Any, List
 
 import pytest
 
-from .._mocks.mockable_imagecrawler import MockableImageCrawler, YetAnotherImageCrawler
+from nichtparasoup.core.image import Image, ImageCollection
+from nichtparasoup.core.imagecrawler import ImageCrawlerState
+
+from .._mocks.mockable_imagecrawler import AsyncMockableImageCrawler, MockableImageCrawler, YetAnotherImageCrawler
 
 
 class TestBaseImageCrawlerEqual:
@@ -128,3 +133,135 @@ class TestExhaustedCrawling:
         c.crawl()
         # assert
         assert expected_call_craw == did_call_craw
+
+
+class _StatefulImageCrawler(MockableImageCrawler):
+
+    def __init__(self, **config: Any) -> None:
+        super().__init__(**config)
+        self.page = 0
+
+    def _reset(self) -> None:
+        self.page = 0
+
+    def _get_state(self) -> ImageCrawlerState:
+        return ImageCrawlerState(page=self.page)
+
+    def _set_state(self, state: ImageCrawlerState) -> None:
+        self.page = int(state['page'])
+
+
+class TestBaseImageCrawlerState:
+
+    def test_default_is_empty(self) -> None:
+        # act & assert
+        assert ImageCrawlerState() == MockableImageCrawler().get_state()
+
+    def test_roundtrip(self) -> None:
+        # arrange
+        c1 = _StatefulImageCrawler()
+        c1._reset_before_next_crawl = False
+        c1.page = 3
+        c2 = _StatefulImageCrawler()
+        # act
+        c2.set_state(c1.get_state())
+        # assert
+        assert 3 == c2.page
+        assert False is c2._reset_before_next_crawl
+
+    def test_reset_pending_is_empty(self) -> None:
+        # arrange
+        c = _StatefulImageCrawler()
+        c.page = 3
+        c.reset()
+        # act & assert
+        assert ImageCrawlerState() == c.get_state()
+
+    def test_set_empty_resets(self) -> None:
+        # arrange
+        c = _StatefulImageCrawler()
+        c.page = 3
+        # act
+        c.set_state(ImageCrawlerState())
+        # assert
+        assert 0 == c.page
+
+    def test_set_invalid(self) -> None:
+        # arrange
+        c = _StatefulImageCrawler()
+        # act & assert
+        with pytest.raises(ValueError):
+            c.set_state(ImageCrawlerState(foo='bar'))
+
+
+class TestBaseImageCrawlerCrawlAsync:
+
+    @staticmethod
+    def _run(imagecrawler: MockableImageCrawler) -> ImageCollection:
+        loop = new_event_loop()
+        try:
+            return loop.run_until_complete(imagecrawler.crawl_async())
+        finally:
+            loop.close()
+
+    def test_is_crawl_async_native(self) -> None:
+        assert MockableImageCrawler().is_crawl_async_native() is False
+        assert AsyncMockableImageCrawler().is_crawl_async_native() is True
+
+    def test_sync_via_executor(self) -> None:
+        # arrange
+        images = ImageCollection({Image(uri='test', source='test')})
+        crawled_in: List[Thread] = []
+        c = MockableImageCrawler()
+
+        def fake_crawl() -> ImageCollection:
+            crawled_in.append(current_thread())
+            return images
+
+        c._crawl = fake_crawl  # type: ignore[assignment]
+        # act
+        crawled = self._run(c)
+        # assert
+        assert images == crawled
+        assert [current_thread()] != crawled_in
+
+    def test_native(self) -> None:
+        # arrange
+        images = ImageCollection({Image(uri='test', source='test')})
+        c = AsyncMockableImageCrawler()
+        c._reset_before_next_crawl = True
+
+        async def fake_crawl_async() -> ImageCollection:
+            return images
+
+        c._crawl_async = fake_crawl_async  # type: ignore[assignment]
+        # act
+        crawled = self._run(c)
+        # assert
+        assert images == crawled
+        assert False is c._reset_before_next_crawl
+        assert not c._crawl_lock.locked()
+
+    def test_native_error_handled(self) -> None:
+        # arrange
+        c = AsyncMockableImageCrawler()
+
+        async def fake_crawl_async() -> ImageCollection:
+            raise Exception('test')
+
+        c._crawl_async = fake_crawl_async  # type: ignore[assignment]
+        # act
+        crawled = self._run(c)
+        # assert
+        assert ImageCollection() == crawled
+        assert not c._crawl_lock.locked()
+
+    def test_native_concurrent(self) -> None:
+        # arrange
+        c = AsyncMockableImageCrawler()
+        c._crawl_lock.acquire()
+        # act
+        crawled = self._run(c)
+        # assert
+        assert ImageCollection() == crawled
+        assert c._crawl_lock.locked()
@@ -0,0 +1,156 @@
+import sys
+from json import dumps as json_dumps, loads as json_loads
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from nichtparasoup.core import Blacklist
+
+
+def _uris(count: int, prefix: str = 'https://foo.bar/') -> List[str]:
+    return [f'{prefix}{i}.jpg' for i in range(count)]
+
+
+class TestBlacklist:
+
+    @pytest.mark.parametrize('fingerprint_size', [4, 8])
+    def test_add_contains(self, fingerprint_size: int) -> None:
+        # arrange
+        blacklist = Blacklist(fingerprint_size=fingerprint_size)
+        uris = _uris(1000)
+        # act
+        for uri in uris:
+            blacklist.add(uri)
+        for uri in uris:
+            blacklist.add(uri)
+        # assert
+        assert 1000 == len(blacklist)
+        assert all(uri in blacklist for uri in uris)
+        assert not any(uri in blacklist for uri in _uris(1000, 'https://other/'))
+        assert 1 not in blacklist
+
+    def test_fingerprint_size_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            Blacklist(fingerprint_size=3)
+
+    def test_max_memory_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            Blacklist(max_memory=10)
+
+    def test_clear(self) -> None:
+        # arrange
+        blacklist = Blacklist()
+        uris = _uris(100)
+        for uri in uris:
+            blacklist.add(uri)
+        # act
+        blacklist.clear()
+        # assert
+        assert 0 == len(blacklist)
+        assert not any(uri in blacklist for uri in uris)
+
+    def test_max_memory(self) -> None:
+        # arrange
+        max_memory = 64 * 1024
+        blacklist = Blacklist(max_memory=max_memory)
+        uris = _uris(10000)
+        # act
+        for uri in uris:
+            blacklist.add(uri)
+        # assert
+        assert blacklist.__sizeof__() - Blacklist().__sizeof__() <= max_memory
+        assert uris[-1] in blacklist, 'newest is kept'
+        assert uris[0] not in blacklist, 'oldest is forgotten'
+
+    def test_compact(self) -> None:
+        # arrange
+        blacklist = Blacklist()
+        uris = _uris(10000)
+        # act
+        for uri in uris:
+            blacklist.add(uri)
+        # assert
+        assert sys.getsizeof(blacklist) < sum(map(sys.getsizeof, uris)) / 2
+
+
+class TestBlacklistRolling:
+
+    def test_window(self) -> None:
+        # arrange
+        now = [1000.0]
+        with patch('nichtparasoup.core.monotonic', lambda: now[0]):
+            blacklist = Blacklist(window=60, generations=3)
+            # act & assert
+            blacklist.add('uri0')
+            now[0] += 20
+            blacklist.add('uri20')
+            assert blacklist.is_rolling()
+            assert 'uri0' in blacklist
+            now[0] += 40
+            assert 'uri0' not in blacklist, 'aged out'
+            assert 'uri20' in blacklist
+            assert 1 == blacklist.forgotten
+            now[0] += 1000
+            assert 0 == len(blacklist)
+            assert 2 == blacklist.forgotten
+
+    def test_forget_oldest(self) -> None:
+        # arrange
+        now = [1000.0]
+        with patch('nichtparasoup.core.monotonic', lambda: now[0]):
+            blacklist = Blacklist(window=60, generations=2)
+            blacklist.add('uri0')
+            blacklist.add('uri1')
+            now[0] += 30
+            blacklist.add('uri30')
+            # act
+            forgotten = blacklist.forget_oldest()
+            # assert
+            assert 2 == forgotten
+            assert 'uri0' not in blacklist
+            assert 'uri30' in blacklist
+            assert 0 == blacklist.forgotten
+
+    def test_not_rolling(self) -> None:
+        # act
+        blacklist = Blacklist()
+        blacklist.add('uri0')
+        forgotten = blacklist.forget_oldest()
+        # assert
+        assert not blacklist.is_rolling()
+        assert 1 == forgotten
+        assert 0 == len(blacklist)
+
+
+class TestBlacklistDump:
+
+    def test_roundtrip(self) -> None:
+        # arrange
+        blacklist = Blacklist(window=3600, generations=3)
+        uris = _uris(100)
+        for uri in uris:
+            blacklist.add(uri)
+        loaded = Blacklist(window=3600, generations=3)
+        # act
+        loaded.load(json_loads(json_dumps(blacklist.dump())))
+        # assert
+        assert 100 == len(loaded)
+        assert all(uri in loaded for uri in uris)
+        assert not any(uri in loaded for uri in _uris(100, 'https://other/'))
+
+    def test_aged(self) -> None:
+        # arrange
+        blacklist = Blacklist(window=60)
+        blacklist.add('uri0')
+        dumped = blacklist.dump()
+        dumped['generations'][0]['age'] = 1000
+        loaded = Blacklist(window=60)
+        # act
+        loaded.load(dumped)
+        # assert
+        assert 'uri0' not in loaded
+
+    def test_fingerprint_size_mismatch(self) -> None:
+        with pytest.raises(ValueError):
+            Blacklist(fingerprint_size=4).load(Blacklist(fingerprint_size=8).dump())
@@ -4,7 +4,7 @@ from weakref import ref as weak_ref
 import pytest
 
 from nichtparasoup.core import Crawler
-from nichtparasoup.core.image import Image, ImageCollection
+from nichtparasoup.core.image import Image, ImageCollection, ImagePool
 
 from .._mocks.mockable_imagecrawler import MockableImageCrawler
 
@@ -222,6 +222,66 @@ class TestCrawlerAddImages:
         assert len(addable_images) == crawled
 
 
+class TestCrawlerStockChanged:
+
+    def test_add_images(self) -> None:
+        # arrange
+        called_with: List[Crawler] = []
+        crawler = Crawler(MockableImageCrawler())
+        crawler.get_stock_changed = lambda: called_with.append  # type: ignore[assignment]
+        # act
+        crawler._add_images(ImageCollection())
+        crawler._add_images(ImageCollection({Image(uri='1', source='test1')}))
+        # assert
+        assert [crawler] == called_with
+
+    def test_pop_random_image(self) -> None:
+        # arrange
+        called_with: List[Crawler] = []
+        crawler = Crawler(MockableImageCrawler())
+        crawler.images.add(Image(uri='1', source='test1'))
+        crawler.images.add(Image(uri='2', source='test2'))
+        crawler.get_stock_changed = lambda: called_with.append  # type: ignore[assignment]
+        # act & assert
+        crawler.pop_random_image()
+        assert [] == called_with, 'still stocked'
+        crawler.pop_random_image()
+        assert [crawler] == called_with, 'ran out'
+
+    def test_set_images(self) -> None:
+        # arrange
+        called_with: List[Crawler] = []
+        crawler = Crawler(MockableImageCrawler())
+        crawler.get_stock_changed = lambda: called_with.append  # type: ignore[assignment]
+        # act
+        crawler.images = ImageCollection({Image(uri='1', source='test1')})
+        # assert
+        assert [crawler] == called_with
+        assert isinstance(crawler.images, ImagePool)
+
+
+class TestCrawlerWatermarks:
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            Crawler(MockableImageCrawler(), low_watermark=-1, high_watermark=1)
+        with pytest.raises(ValueError):
+            Crawler(MockableImageCrawler(), low_watermark=2, high_watermark=1)
+
+    def test_below(self) -> None:
+        # arrange
+        crawler = Crawler(MockableImageCrawler(), low_watermark=1, high_watermark=2)
+        # act & assert
+        assert crawler.is_below_low_watermark()
+        assert crawler.is_below_high_watermark()
+        crawler.images.add(Image(uri='1', source='test1'))
+        assert not crawler.is_below_low_watermark()
+        assert crawler.is_below_high_watermark()
+        crawler.images.add(Image(uri='2', source='test2'))
+        assert not crawler.is_below_low_watermark()
+        assert not crawler.is_below_high_watermark()
+
+
 class TestCrawlerExhaustedCrawling:
 
     @pytest.mark.parametrize(
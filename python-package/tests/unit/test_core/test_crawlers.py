@@ -1,4 +1,14 @@
-from nichtparasoup.core import CrawlerCollection
+from collections import Counter
+from threading import Thread
+
+from nichtparasoup.core import Crawler, CrawlerCollection, _WeightedSampler
+from nichtparasoup.core.image import Image, ImagePool
+
+from .._mocks.mockable_imagecrawler import MockableImageCrawler
+
+
+def _crawler(weight: float) -> Crawler:
+    return Crawler(MockableImageCrawler(weight=weight), weight=weight)
 
 
 class TestCrawlers:
@@ -20,3 +30,184 @@ class TestCrawlers:
         assert isinstance(copy, CrawlerCollection)
         assert copy is not crawlers
         assert copy == crawlers
+
+    def test_get_random_weighted(self) -> None:
+        # arrange
+        light = _crawler(1)
+        heavy = _crawler(9)
+        crawlers = CrawlerCollection([light, heavy])
+        # act
+        counts = Counter(crawlers.get_random() for _ in range(10000))
+        # assert
+        assert set(counts) == {light, heavy}
+        assert counts[heavy] > counts[light] * 5
+
+    def test_get_random_after_change(self) -> None:
+        # arrange
+        crawler1 = _crawler(1)
+        crawler2 = _crawler(1)
+        crawlers = CrawlerCollection([crawler1])
+        assert crawler1 is crawlers.get_random()
+        # act
+        crawlers.append(crawler2)
+        crawlers.remove(crawler1)
+        # assert
+        assert crawler2 is crawlers.get_random()
+
+    def test_change_waits_for_sampling(self) -> None:
+        # arrange
+        crawler1 = _crawler(1)
+        crawler2 = _crawler(1)
+        crawlers = CrawlerCollection([crawler1])
+        change = Thread(target=crawlers.append, args=(crawler2,))
+        # act
+        with crawlers._sampling_lock:  # as if sampling is in progress
+            crawlers._get_sampling()
+            change.start()
+            change.join(0.1)
+            changed_while_sampling = len(crawlers) > 1
+        change.join()
+        # assert
+        assert not changed_while_sampling
+        assert crawlers._sampling is None, 'invalidated after the change'
+        assert (crawler1, crawler2) == crawlers._get_sampling().crawlers
+
+    def test_shuffle_yields_each_once(self) -> None:
+        # arrange
+        crawlers = CrawlerCollection(_crawler(weight) for weight in (1, 2, 3, 0.5, 10))
+        # act
+        shuffled = list(crawlers.shuffle())
+        # assert
+        assert len(shuffled) == len(crawlers)
+        assert set(shuffled) == set(crawlers)
+
+    def test_sample_weighted(self) -> None:
+        # arrange
+        light = _crawler(1)
+        heavy = _crawler(9)
+        crawlers = CrawlerCollection([light, heavy])
+        # act
+        counts = Counter(crawlers.sample(10000))
+        # assert
+        assert 10000 == sum(counts.values())
+        assert counts[heavy] > counts[light] * 5
+
+    def test_sample_empty(self) -> None:
+        # act
+        sample = CrawlerCollection().sample(3)
+        # assert
+        assert [] == sample
+
+    def test_shuffle_empty(self) -> None:
+        # arrange
+        crawlers = CrawlerCollection()
+        # act
+        shuffled = list(crawlers.shuffle())
+        # assert
+        assert shuffled == []
+
+
+class TestWeightedSampler:
+
+    def test_skips_zero_weights(self) -> None:
+        # arrange
+        sampler = _WeightedSampler([0.0, 1.0, 0.0, 0.0, 2.0])
+        # act
+        samples = {sampler.sample() for _ in range(1000)}
+        # assert
+        assert samples == {1, 4}
+
+    def test_set_weight(self) -> None:
+        # arrange
+        sampler = _WeightedSampler([1.0, 1.0, 1.0])
+        # act
+        sampler.set_weight(0, 0.0)
+        sampler.set_weight(2, 0.0)
+        # assert
+        assert 1.0 == sampler.total
+        assert {1} == {sampler.sample() for _ in range(100)}
+
+    def test_all_zero(self) -> None:
+        # arrange
+        sampler = _WeightedSampler([0.0, 0.0])
+        # act
+        sample = sampler.sample()
+        # assert
+        assert sample is None
+
+    def test_copy_is_independent(self) -> None:
+        # arrange
+        sampler = _WeightedSampler([1.0, 1.0])
+        # act
+        copy = sampler.copy()
+        copy.set_weight(0, 0.0)
+        # assert
+        assert 2.0 == sampler.total
+        assert 1.0 == copy.total
+
+
+class TestCrawlersStocked:
+
+    def test_sample_stocked_only(self) -> None:
+        # arrange
+        empty = _crawler(100)
+        stocked = _crawler(1)
+        stocked.images.add(Image(uri='test', source='test'))
+        crawlers = CrawlerCollection([empty, stocked])
+        # act
+        samples = {crawlers.get_random(stocked_only=True) for _ in range(100)}
+        shuffled = list(crawlers.shuffle(stocked_only=True))
+        # assert
+        assert crawlers.has_stocked()
+        assert {stocked} == samples
+        assert [stocked] == shuffled
+
+    def test_none_stocked(self) -> None:
+        # arrange
+        crawlers = CrawlerCollection([_crawler(1), _crawler(2)])
+        # act
+        sample = crawlers.get_random(stocked_only=True)
+        shuffled = list(crawlers.shuffle(stocked_only=True))
+        # assert
+        assert not crawlers.has_stocked()
+        assert sample is None
+        assert [] == shuffled
+
+    def test_update_stocked(self) -> None:
+        # arrange
+        crawler = _crawler(1)
+        crawlers = CrawlerCollection([crawler])
+        assert not crawlers.has_stocked()
+        # act & assert
+        crawler.images.add(Image(uri='test', source='test'))
+        assert not crawlers.has_stocked(), 'not updated, yet'
+        crawlers.update_stocked(crawler)
+        assert crawlers.has_stocked()
+        crawler.images.clear()
+        crawlers.update_stocked(crawler)
+        assert not crawlers.has_stocked()
+
+    def test_update_stocked_unknown(self) -> None:
+        # arrange
+        crawlers = CrawlerCollection([_crawler(1)])
+        crawlers.has_stocked()
+        unknown = _crawler(1)
+        unknown.images.add(Image(uri='test', source='test'))
+        # act
+        crawlers.update_stocked(unknown)
+        # assert
+        assert not crawlers.has_stocked()
+
+    def test_shared_pool_always_stocked(self) -> None:
+        # arrange
+        class SharedImagePool(ImagePool):
+            shared = True
+
+        crawler = Crawler(MockableImageCrawler(), images=SharedImagePool())
+        crawlers = CrawlerCollection([crawler, _crawler(1)])
+        # act
+        sample = crawlers.get_random(stocked_only=True)
+        crawlers.update_stocked(crawler)
+        # assert
+        assert crawlers.has_stocked(), 'restocked by others, maybe'
+        assert crawler is sample
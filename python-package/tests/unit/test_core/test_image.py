@@ -1,4 +1,5 @@
 import unittest
+from json import loads as json_loads
 from typing import Any, List
 
 from nichtparasoup.core.image import Image, ImageCollection
@@ -41,6 +42,16 @@ class ImageTest(unittest.TestCase):
         self.assertEqual(image3, image3)
         self.assertNotEqual(image3, image4)
 
+    def test_to_json(self) -> None:
+        # arrange
+        image = Image(uri='test', source='test_src', tags={'foo'})
+        # act
+        encoded = image.to_json()
+        # assert
+        self.assertEqual(dict(uri='test', is_generic=False, source='test_src', more=dict(tags=['foo'])),
+                         json_loads(encoded))
+        self.assertIs(encoded, image.to_json(), 'cached')
+
     def test_remove_nongeneric_from_container(self) -> None:
         # arrange
         image1 = Image(uri="testA", source='testA', is_generic=True)
@@ -0,0 +1,120 @@
+from timeit import repeat
+
+import pytest
+
+from nichtparasoup.core.image import Image, ImageCollection, ImagePool
+
+
+def _images(count: int) -> ImageCollection:
+    return ImageCollection(Image(uri=f'test{i}', source='test') for i in range(count))
+
+
+class TestImagePool:
+
+    def test_set_semantics(self) -> None:
+        # arrange
+        image1 = Image(uri='test1', source='test')
+        image2 = Image(uri='test1', source='other')
+        image3 = Image(uri='test3', source='test')
+        pool = ImagePool()
+        # act
+        added = [pool.add(image1), pool.add(image2), pool.add(image3)]
+        # assert
+        assert [True, False, True] == added
+        assert 2 == len(pool)
+        assert image1 in pool
+        assert image3 in pool
+        assert ImageCollection({image1, image3}) == pool
+
+    def test_generic_images_are_distinct(self) -> None:
+        # arrange
+        pool = ImagePool()
+        # act
+        pool.add(Image(uri='test', source='test', is_generic=True))
+        pool.add(Image(uri='test', source='test', is_generic=True))
+        # assert
+        assert 2 == len(pool)
+
+    def test_discard(self) -> None:
+        # arrange
+        images = _images(5)
+        pool = ImagePool(images)
+        image = next(iter(images))
+        # act
+        pool.discard(image)
+        pool.discard(image)
+        # assert
+        assert 4 == len(pool)
+        assert image not in pool
+        assert ImageCollection(images - {image}) == pool
+
+    def test_clear(self) -> None:
+        # arrange
+        pool = ImagePool(_images(5))
+        # act
+        pool.clear()
+        # assert
+        assert 0 == len(pool)
+        assert pool.get_random() is None
+
+    def test_copy(self) -> None:
+        # arrange
+        pool = ImagePool(_images(5))
+        # act
+        copy = pool.copy()
+        # assert
+        assert isinstance(copy, ImagePool)
+        assert copy is not pool
+        assert copy == pool
+
+    def test_get_random(self) -> None:
+        # arrange
+        images = _images(5)
+        pool = ImagePool(images)
+        # act
+        image = pool.get_random()
+        # assert
+        assert image in images
+        assert 5 == len(pool)
+
+    def test_pop_random_drains(self) -> None:
+        # arrange
+        images = _images(5)
+        pool = ImagePool(images)
+        # act
+        popped = ImageCollection(pool.pop_random() for _ in range(5))  # type: ignore[misc]
+        # assert
+        assert images == popped
+        assert 0 == len(pool)
+        assert pool.pop_random() is None
+
+    def test_pop_random_keeps_positions(self) -> None:
+        # arrange
+        pool = ImagePool(_images(10))
+        # act
+        for _ in range(5):
+            pool.pop_random()
+        # assert
+        assert all(pool._images[position] is image for image, position in pool._positions.items())
+        assert len(pool._images) == len(pool._positions)
+
+    @pytest.mark.slow
+    def test_pop_random_flat_latency(self) -> None:
+        """Popping must not get slower when the pool grows - other than a list-copy would."""
+        small, big = 100, 10000
+        pops = 50
+
+        def timing(size: int) -> float:
+            images = list(_images(size + pops))
+            return min(repeat(
+                'for _ in range(pops): pool.pop_random()',
+                setup='pool = ImagePool(images)',
+                globals={'ImagePool': ImagePool, 'images': images, 'pops': pops},
+                number=1, repeat=20
+            ))
+
+        # act
+        timing_small = timing(small)
+        timing_big = timing(big)
+        # assert
+        assert timing_big < timing_small * 5
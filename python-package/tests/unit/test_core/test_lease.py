@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from nichtparasoup.core.lease import FileLeases, preferred_node
+
+fcntl = pytest.importorskip('fcntl')
+
+
+class TestPreferredNode:
+
+    def test_agreed(self) -> None:
+        # act
+        preferred = {preferred_node(nodes, 'test') for nodes in (['a', 'b', 'c'], ['c', 'a', 'b'], {'b', 'c', 'a'})}
+        # assert
+        assert 1 == len(preferred)
+
+    def test_only_leaving_node_moves(self) -> None:
+        # arrange
+        names = [f'test{n}' for n in range(50)]
+        nodes = ['a', 'b', 'c']
+        before = {name: preferred_node(nodes, name) for name in names}
+        # act
+        after = {name: preferred_node(['a', 'b'], name) for name in names}
+        # assert
+        assert {'a', 'b', 'c'} == set(before.values()), 'sharded'
+        assert all(before[name] == after[name] for name in names if before[name] != 'c')
+
+
+class TestFileLeases:
+
+    def test_exclusive(self, tmp_path: Path) -> None:
+        # arrange
+        leases1 = FileLeases(str(tmp_path), 'node1')
+        leases2 = FileLeases(str(tmp_path), 'node2')
+        # act
+        acquired = leases1.acquire('test', 1), leases2.acquire('test', 1), leases1.acquire('test', 1)
+        # assert
+        assert (True, False, True) == acquired
+        assert 'node1' == leases2.holder('test')
+        leases1.close()
+        leases2.close()
+
+    def test_release(self, tmp_path: Path) -> None:
+        # arrange
+        leases1 = FileLeases(str(tmp_path), 'node1')
+        leases2 = FileLeases(str(tmp_path), 'node2')
+        leases1.acquire('test', 1)
+        # act
+        leases1.release('test')
+        # assert
+        assert leases2.holder('test') is None
+        assert leases2.acquire('test', 1)
+        assert 'node2' == leases1.holder('test')
+        leases2.close()
+
+    def test_nodes(self, tmp_path: Path) -> None:
+        # arrange
+        leases1 = FileLeases(str(tmp_path), 'node1')
+        leases2 = FileLeases(str(tmp_path), 'node2')
+        leases1.heartbeat(1)
+        leases2.heartbeat(1)
+        # act
+        nodes_before = leases1.nodes()
+        leases2.close()
+        nodes_after = leases1.nodes()
+        # assert
+        assert {'node1', 'node2'} == nodes_before
+        assert {'node1'} == nodes_after
+        assert ['node1.node'] == os.listdir(tmp_path / 'nodes')
+        leases1.close()
+
+    def test_default_node(self, tmp_path: Path) -> None:
+        # act
+        leases1 = FileLeases(str(tmp_path))
+        leases2 = FileLeases(str(tmp_path))
+        # assert
+        assert leases1.node != leases2.node
+        assert {leases1.node} == leases1.nodes()
+
+    def test_lock_file_removed_meanwhile(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # arrange
+        leases1 = FileLeases(str(tmp_path), 'node1')
+        leases2 = FileLeases(str(tmp_path), 'node2')
+        flock = fcntl.flock
+
+        def racing_flock(fd: int, operation: int) -> None:
+            # as if another node found the file unlocked, and removed it - after it was opened, before it is locked
+            monkeypatch.setattr(fcntl, 'flock', flock)
+            os.remove(tmp_path / 'nodes' / 'node1.node')
+            flock(fd, operation)
+
+        monkeypatch.setattr(fcntl, 'flock', racing_flock)
+        # act
+        leases1.heartbeat(1)
+        # assert
+        assert {'node1', 'node2'} == leases2.nodes()
+        leases1.close()
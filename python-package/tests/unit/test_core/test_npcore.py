@@ -1,7 +1,10 @@
 import unittest
+from threading import Event
+from typing import List
+from uuid import uuid4
 
 from nichtparasoup.core import NPCore
-from nichtparasoup.core.image import Image
+from nichtparasoup.core.image import Image, ImageCollection
 
 from .._mocks.mockable_imagecrawler import MockableImageCrawler
 
@@ -46,3 +49,85 @@ class NPCoreTest(unittest.TestCase):
             [crawler.imagecrawler for crawler in core.crawlers])
         self.assertTrue(core.has_imagecrawler(imagecrawler1))
         self.assertTrue(core.has_imagecrawler(imagecrawler3))
+
+
+class NPCoreFillUpTest(unittest.TestCase):
+
+    def test_workers_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            NPCore(workers=0)
+
+    def test_fill_up_to(self) -> None:
+        # arrange
+        core = NPCore(workers=2)
+        for n in range(5):
+            core.add_imagecrawler(MockableImageCrawler(n=n))
+        for crawler in core.crawlers:
+            crawler.imagecrawler._crawl = lambda: ImageCollection(  # type: ignore[assignment]
+                Image(uri=f'{uuid4()}', source='test') for _ in range(3))
+        # act
+        core.fill_up_to(10, on_refill=None, delay=0)
+        # assert
+        self.assertTrue(all(len(crawler.images) == 12 for crawler in core.crawlers))
+        self.assertTrue(all(fill_up.done() for fill_up in core._fill_ups.values()))
+
+    def test_fill_up_crawler_not_twice(self) -> None:
+        # arrange
+        core = NPCore(workers=2)
+        core.add_imagecrawler(MockableImageCrawler())
+        crawler = core.crawlers[0]
+        crawling = Event()
+        crawled = Event()
+        crawl_count: List[int] = []
+
+        def fake_crawl() -> ImageCollection:
+            crawl_count.append(1)
+            crawling.set()
+            crawled.wait(5)
+            return ImageCollection({Image(uri='test', source='test')})
+
+        crawler.imagecrawler._crawl = fake_crawl  # type: ignore[assignment]
+        # act
+        fill_up1 = core.fill_up_crawler(crawler, 1, on_refill=None, delay=0)
+        crawling.wait(5)
+        fill_up2 = core.fill_up_crawler(crawler, 1, on_refill=None, delay=0)
+        crawled.set()
+        fill_up1.result(5)
+        # assert
+        self.assertIs(fill_up1, fill_up2)
+        self.assertEqual([1], crawl_count)
+
+    def test_fill_up_to_no_wait(self) -> None:
+        # arrange
+        core = NPCore(workers=1)
+        core.add_imagecrawler(MockableImageCrawler())
+        crawled = Event()
+
+        def fake_crawl() -> ImageCollection:
+            crawled.wait(5)
+            return ImageCollection()
+
+        core.crawlers[0].imagecrawler._crawl = fake_crawl  # type: ignore[assignment]
+        # act
+        core.fill_up_to(10, on_refill=None, delay=0, wait=False)
+        # assert
+        self.assertEqual(1, len(core._fill_ups))
+        crawled.set()
+
+    def test_close(self) -> None:
+        # arrange
+        core = NPCore(workers=1)
+        core.add_imagecrawler(MockableImageCrawler())
+        crawler = core.crawlers[0]
+        crawler.imagecrawler._crawl = lambda: ImageCollection(  # type: ignore[assignment]
+            {Image(uri=f'{uuid4()}', source='test')})
+        core.fill_up_to(1, on_refill=None, delay=0)
+        workers = core._workers
+        # act
+        core.close()
+        # assert
+        assert workers
+        self.assertTrue(workers._shutdown)  # type: ignore[attr-defined]
+        core.fill_up_to(2, on_refill=None, delay=0)
+        self.assertEqual(2, len(crawler.images), 'workers are started again on demand')
+        core.close()
@@ -0,0 +1,209 @@
+from importlib.util import find_spec
+from time import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from nichtparasoup.core import NPCore
+from nichtparasoup.core.image import Image, ImageCollection, ImagePool
+from nichtparasoup.core.redisstore import RedisStore
+from nichtparasoup.core.server import Server
+
+from .._mocks.mockable_imagecrawler import MockableImageCrawler
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture()
+def store() -> RedisStore:
+    return RedisStore(fakeredis.FakeRedis())
+
+
+class TestRedisImagePool:
+
+    def test_shared(self, store: RedisStore) -> None:
+        # arrange
+        pool1 = store.image_pool(MockableImageCrawler(n=1))
+        pool2 = store.image_pool(MockableImageCrawler(n=1))
+        other = store.image_pool(MockableImageCrawler(n=2))
+        image = Image(uri='test1', source='test', tags={'foo'})
+        # act
+        added = [pool1.add(image), pool2.add(image)]
+        # assert
+        assert [True, False] == added
+        assert image in pool2
+        assert 0 == len(other)
+        popped = pool2.pop_random()
+        assert popped is not None
+        assert {'tags': ['foo']} == popped.more
+        assert 0 == len(pool1)
+        assert pool1.pop_random() is None
+
+    def test_generic_images_are_distinct(self, store: RedisStore) -> None:
+        # arrange
+        pool = store.image_pool(MockableImageCrawler())
+        # act
+        pool.add(Image(uri='test', source='test', is_generic=True))
+        pool.add(Image(uri='test', source='test', is_generic=True))
+        # assert
+        assert 2 == len(pool)
+        assert all(image.is_generic for image in pool)
+
+    def test_discard_clear_copy(self, store: RedisStore) -> None:
+        # arrange
+        pool = store.image_pool(MockableImageCrawler())
+        images = ImageCollection(Image(uri=f'test{i}', source='test') for i in range(3))
+        image = next(iter(images))
+        pool |= images
+        # act
+        pool.discard(image)
+        copy = pool.copy()
+        pool.clear()
+        # assert
+        assert isinstance(copy, ImagePool)
+        assert images - {image} == copy
+        assert 0 == len(pool)
+
+    def test_refilled_by_other_node(self) -> None:
+        # arrange
+        redis_server = fakeredis.FakeServer()
+        nodes = [Server(NPCore()) for _ in range(2)]
+        for node in nodes:
+            imagecrawler = MockableImageCrawler()
+            store = RedisStore(fakeredis.FakeRedis(server=redis_server))
+            node.core.add_imagecrawler(imagecrawler, images=store.image_pool(imagecrawler))
+        crawling_node, other_node = nodes
+        assert other_node.get_image() is None, 'empty, yet'
+        # act
+        crawling_node.core.crawlers[0]._add_images(ImageCollection({Image(uri='test1', source='test')}))
+        # assert
+        assert other_node.has_image()
+        response = other_node.get_image()
+        assert response is not None
+        assert 'test1' == response.image.uri
+        assert crawling_node.get_image() is None
+
+
+class TestRedisBlacklist:
+
+    def test_core(self, store: RedisStore) -> None:
+        # arrange
+        core = NPCore(blacklist=store.blacklist())
+        imagecrawler = MockableImageCrawler()
+        core.add_imagecrawler(imagecrawler, images=store.image_pool(imagecrawler))
+        crawler = core.crawlers[0]
+        # act
+        added = crawler._add_images(ImageCollection({Image(uri='test1', source='test')}))
+        added_again = crawler._add_images(ImageCollection({Image(uri='test1', source='test')}))
+        # assert
+        assert (1, 0) == (added, added_again)
+        assert 'test1' in store.blacklist()
+        assert 1 == len(crawler.images)
+
+    def test_clear(self, store: RedisStore) -> None:
+        # arrange
+        blacklist = store.blacklist()
+        blacklist.add('test1')
+        # act
+        forgotten = blacklist.forget_oldest()
+        # assert
+        assert 1 == forgotten
+        assert 0 == len(blacklist)
+        assert blacklist.dump() is None
+
+    def test_rolling(self, store: RedisStore) -> None:
+        # arrange
+        blacklist = store.blacklist(window=60, generations=2)
+        now = (int(time()) // 30 + 1) * 30 + 1  # start of a generation, expiry is real time
+
+        def at(timestamp: float) -> Any:
+            return patch('nichtparasoup.core.redisstore.time', return_value=timestamp)
+
+        # act
+        with at(now):
+            blacklist.add('test1')
+        with at(now + 30):
+            blacklist.add('test2')
+            remembered = 'test1' in blacklist, 'test2' in blacklist
+        with at(now + 60):
+            aged = 'test1' in blacklist, 'test2' in blacklist
+            forgotten = blacklist.forget_oldest()
+            after_forget = len(blacklist)
+        # assert
+        assert blacklist.is_rolling()
+        assert (True, True) == remembered
+        assert (False, True) == aged
+        assert 1 == forgotten
+        assert 0 == after_forget
+        assert all(0 < ttl for ttl in map(store.redis.ttl, store.redis.keys()))
+
+    def test_rolling_add_pipelined(self, store: RedisStore) -> None:
+        # arrange
+        blacklist = store.blacklist(window=60)
+        # act
+        with patch.object(store.redis, 'execute_command', wraps=store.redis.execute_command) as execute_command:
+            blacklist.add('test')
+        # assert
+        execute_command.assert_not_called()
+        assert 'test' in blacklist
+        assert all(0 < ttl for ttl in map(store.redis.ttl, store.redis.keys()))
+
+
+@pytest.mark.skipif(find_spec('lupa') is None, reason='Lua scripts require the package "lupa"')
+class TestRedisLeases:
+
+    def test_exclusive(self, store: RedisStore) -> None:
+        # arrange
+        leases1 = store.leases('node1')
+        leases2 = store.leases('node2')
+        # act
+        acquired = leases1.acquire('test', 10), leases2.acquire('test', 10), leases1.acquire('test', 10)
+        # assert
+        assert (True, False, True) == acquired
+        assert 'node1' == leases2.holder('test')
+        assert 0 < store.redis.pttl('nichtparasoup:leases:lease:test') <= 10000
+
+    def test_expires(self, store: RedisStore) -> None:
+        # arrange
+        leases1 = store.leases('node1')
+        leases2 = store.leases('node2')
+        leases1.acquire('test', 10)
+        # act
+        store.redis.delete('nichtparasoup:leases:lease:test')  # expired
+        # assert
+        assert leases2.acquire('test', 10)
+        assert not leases1.acquire('test', 10)
+
+    def test_taken_over(self, store: RedisStore) -> None:
+        # arrange
+        leases1 = store.leases('node1')
+        leases1.acquire('test', 10)
+        # act
+        with patch.object(store.redis, 'get', return_value=b'node1'):  # checked, right before node2 took over
+            store.redis.set('nichtparasoup:leases:lease:test', 'node2', px=5000)
+            renewed = leases1.acquire('test', 10)
+            leases1.release('test')
+        # assert
+        assert not renewed
+        assert 'node2' == leases1.holder('test')
+        assert store.redis.pttl('nichtparasoup:leases:lease:test') <= 5000
+
+    def test_release_and_close(self, store: RedisStore) -> None:
+        # arrange
+        leases1 = store.leases('node1')
+        leases2 = store.leases('node2')
+        leases1.heartbeat(10)
+        leases2.heartbeat(10)
+        leases1.acquire('test1', 10)
+        leases1.acquire('test2', 10)
+        # act
+        nodes_before = leases2.nodes()
+        leases1.release('test1')
+        released = leases2.holder('test1')
+        leases1.close()
+        # assert
+        assert {'node1', 'node2'} == nodes_before
+        assert released is None
+        assert leases2.holder('test2') is None
+        assert {'node2'} == leases2.nodes()
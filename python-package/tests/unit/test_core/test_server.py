@@ -1,13 +1,16 @@
 import unittest
+from pathlib import Path
 from time import time
 from typing import Tuple
 from unittest.mock import MagicMock
 
 import pytest
 
-from nichtparasoup.core import Crawler, NPCore
+from nichtparasoup.core import Blacklist, Crawler, NPCore
 from nichtparasoup.core.image import Image, ImageCollection
+from nichtparasoup.core.lease import FileLeases
 from nichtparasoup.core.server import Server
+from nichtparasoup.core.snapshot import load_snapshot
 
 from .._mocks.mockable_imagecrawler import MockableImageCrawler
 
@@ -67,6 +70,62 @@ class TestServerGetImageTest:
             assert result.crawler == crawler
 
 
+class TestServerGetImageStocked:
+
+    def test_get_image_skips_empty_crawlers(self) -> None:
+        # arrange
+        server = Server(NPCore())
+        for _ in range(10):
+            server.core.add_imagecrawler(MockableImageCrawler(), weight=1000)
+        server.core.add_imagecrawler(MockableImageCrawler(), weight=1)
+        stocked = server.core.crawlers[-1]
+        stocked._add_images(ImageCollection({Image(uri='test1', source='test'), Image(uri='test2', source='test')}))
+        # act
+        results = [server.get_image() for _ in range(3)]
+        # assert
+        assert all(result and result.crawler is stocked for result in results[:2])
+        assert results[2] is None
+        assert not server.has_image()
+
+
+class TestServerGetImages:
+
+    def test_get_images(self) -> None:
+        # arrange
+        server = Server(NPCore())
+        for n in range(3):
+            server.core.add_imagecrawler(MockableImageCrawler(n=n))
+        for crawler in server.core.crawlers:
+            crawler.images = ImageCollection(Image(uri=f'{id(crawler)}-{i}', source='test') for i in range(2))
+        # act
+        results = server.get_images(4)
+        rest = server.get_images(4)
+        # assert
+        assert 4 == len(results)
+        assert 2 == len(rest), 'made up for crawlers that ran out'
+        assert 6 == len({result.image for result in results + rest})
+        assert 6 == server.stats.count_images_served
+        assert 6 == sum(server.stats.count_images_served_by_crawler.values())
+        assert [] == server.get_images(4)
+
+
+class TestServerGetImageLowWatermark:
+
+    def test_get_image_requests_refill(self) -> None:
+        # arrange
+        server = Server(NPCore(), crawler_upkeep=10, crawler_low_watermark=2)
+        server.core.add_imagecrawler(MockableImageCrawler())
+        crawler = server.core.crawlers[0]
+        server._apply_watermarks(crawler)
+        crawler.images = ImageCollection(Image(uri=f'test{i}', source='test') for i in range(3))
+        server._refiller = MagicMock()
+        # act & assert
+        server.get_image()
+        server._refiller.request_refill.assert_not_called()
+        server.get_image()
+        server._refiller.request_refill.assert_called_once_with(crawler)
+
+
 class TestServerHasImageTest:
 
     def test_get_image_no_crawler(self, empty_server: Server) -> None:
@@ -138,6 +197,37 @@ class ServerResetTest(unittest.TestCase):
         self.assertEqual(self.server.reset_timeout, res.timeout)
 
 
+class ServerResetBlacklistTest(unittest.TestCase):
+
+    def test_reset_clears_blacklist(self) -> None:
+        # arrange
+        server = Server(NPCore(blacklist=Blacklist(window=3600)))
+        server.core.blacklist.add('test')
+        # act
+        server._reset()
+        # assert
+        self.assertNotIn('test', server.core.blacklist)
+        self.assertEqual(1, server.stats.cum_blacklist_on_flush)
+
+    def test_rolling_forgets_oldest_only(self) -> None:
+        # arrange
+        server = Server(NPCore(blacklist=Blacklist(window=3600)))
+        server.core.reset = MagicMock(return_value=0)  # type: ignore[assignment]
+        # act
+        server._reset()
+        # assert
+        server.core.reset.assert_called_once_with(forget_oldest_only=True)
+
+    def test_not_rolling_forgets_all(self) -> None:
+        # arrange
+        server = Server(NPCore(blacklist=Blacklist()))
+        server.core.reset = MagicMock(return_value=0)  # type: ignore[assignment]
+        # act
+        server._reset()
+        # assert
+        server.core.reset.assert_called_once_with(forget_oldest_only=False)
+
+
 class ServerStartStopTest(unittest.TestCase):
 
     def setUp(self) -> None:
@@ -174,6 +264,15 @@ class ServerStartStopTest(unittest.TestCase):
         # assert
         self.assertFalse(self.server._locks.run.locked())
 
+    def test_stop_closes_core(self) -> None:
+        # arrange
+        self.server.start()
+        self.server.core.close = MagicMock()  # type: ignore[assignment]
+        # act
+        self.server.stop()
+        # assert
+        self.server.core.close.assert_called_once_with()
+
     def test_stop_while_not_running_unlocked(self) -> None:
         # act
         with self.assertRaises(RuntimeError):
@@ -191,3 +290,99 @@ class ServerStartStopTest(unittest.TestCase):
         self.assertTrue(self.server.is_alive())
         self.server.stop()
         self.assertFalse(self.server.is_alive())
+
+
+class TestServerSnapshot:
+
+    @staticmethod
+    def _server(snapshot_file: str) -> Server:
+        server = Server(NPCore(), snapshot_file=snapshot_file)
+        server.core.add_imagecrawler(MockableImageCrawler())
+        return server
+
+    def test_start_restores_and_stop_saves(self, tmp_path: Path) -> None:
+        # arrange
+        snapshot_file = str(tmp_path / 'snapshot')
+        server = self._server(snapshot_file)
+        server.core.crawlers[0]._add_images(ImageCollection({Image(uri='test', source='test')}))
+        server.save_snapshot()
+        restored_server = self._server(snapshot_file)
+        restored_server.refill = MagicMock()  # type: ignore[assignment]
+        # act
+        restored_server.start()
+        image = restored_server.get_image()
+        restored_server.stop()
+        # assert
+        restored_server.refill.assert_not_called()
+        assert image and 'test' == image.image.uri
+        assert 0 == load_snapshot(NPCore(), snapshot_file)
+
+    def test_start_without_snapshot_refills(self, tmp_path: Path) -> None:
+        # arrange
+        server = self._server(str(tmp_path / 'not_existing'))
+        server.refill = MagicMock()  # type: ignore[assignment]
+        # act
+        server.start()
+        server.stop()
+        # assert
+        server.refill.assert_called_once_with()
+        assert (tmp_path / 'not_existing').is_file()
+
+    def test_no_snapshot_file(self) -> None:
+        # arrange
+        server = Server(NPCore())
+        # act & assert
+        assert not server.save_snapshot()
+        assert 0 == server._restore_snapshot()
+
+
+class TestServerLeases:
+
+    @staticmethod
+    def _server(leases: FileLeases) -> Server:
+        server = Server(NPCore(), leases=leases)
+        for n in range(20):
+            server.core.add_imagecrawler(MockableImageCrawler(n=n))
+        return server
+
+    def test_sharded(self, tmp_path: Path) -> None:
+        # arrange
+        servers = [self._server(FileLeases(str(tmp_path), node)) for node in ('node1', 'node2')]
+        for server in servers:
+            server.heartbeat()
+        # act
+        leased = [[server.lease_crawler(crawler) for crawler in server.core.crawlers] for server in servers]
+        # assert
+        assert all(leased1 != leased2 for leased1, leased2 in zip(*leased)), 'each crawler leased once'
+        assert any(leased[0]) and any(leased[1])
+        assert 'node1' == servers[1].crawler_lease_holder(servers[1].core.crawlers[leased[0].index(True)])
+
+    def test_takeover(self, tmp_path: Path) -> None:
+        # arrange
+        server1, server2 = (self._server(FileLeases(str(tmp_path), node)) for node in ('node1', 'node2'))
+        for server in server1, server2:
+            server.heartbeat()
+            for crawler in server.core.crawlers:
+                server.lease_crawler(crawler)
+        # act
+        assert server2.leases
+        server2.leases.close()  # node died
+        leased = [server1.lease_crawler(crawler) for crawler in server1.core.crawlers]
+        # assert
+        assert all(leased)
+
+    def test_refill_leased_only(self, tmp_path: Path) -> None:
+        # arrange
+        other_leases = FileLeases(str(tmp_path), 'node2')
+        other_leases.acquire(Server._lease_name(Crawler(MockableImageCrawler(n=0))), 1)
+        server = self._server(FileLeases(str(tmp_path), 'node1'))
+        for crawler in server.core.crawlers:
+            crawler.imagecrawler._crawl = lambda: ImageCollection(  # type: ignore[assignment]
+                Image(uri=f'test{n}', source='test', is_generic=True) for n in range(server.keep))
+        # act
+        server.refill()
+        # assert
+        assert 0 == len(server.core.crawlers[0].images)
+        assert all(crawler.images for crawler in server.core.crawlers[1:])
+        assert all(crawler.count_crawls for crawler in server.core.crawlers[1:])
+        other_leases.close()
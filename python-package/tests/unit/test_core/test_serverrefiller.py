@@ -1,2 +1,173 @@
+from time import monotonic, sleep
+from typing import Tuple
 
-# TODO: write tests
+import pytest
+
+from nichtparasoup.core import Crawler, NPCore
+from nichtparasoup.core.image import Image, ImageCollection
+from nichtparasoup.core.server import Server, ServerRefiller, _CrawlerSchedule
+
+from .._mocks.mockable_imagecrawler import MockableImageCrawler
+
+
+def _images(count: int) -> ImageCollection:
+    return ImageCollection(Image(uri=f'test{i}', source='test') for i in range(count))
+
+
+@pytest.fixture()
+def server_crawler() -> Tuple[Server, Crawler]:
+    server = Server(NPCore(), crawler_upkeep=10)
+    server.core.add_imagecrawler(MockableImageCrawler())
+    crawler = server.core.crawlers[0]
+    server._apply_watermarks(crawler)
+    return server, crawler
+
+
+class TestServerRefillerNextInterval:
+
+    def test_exhausted(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.is_exhausted = lambda: True  # type: ignore[assignment]
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        # act
+        interval = refiller._next_interval(_CrawlerSchedule(crawler, 0), 1)
+        # assert
+        assert 10.0 == interval
+
+    def test_below_keep(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.last_crawl_duration = 3.0
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        # act
+        interval = refiller._next_interval(_CrawlerSchedule(crawler, 0), 1)
+        # assert
+        assert 3.0 == interval
+
+    def test_below_keep_backoff(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        schedule = _CrawlerSchedule(crawler, 0)
+        # act
+        intervals = [refiller._next_interval(schedule, 0) for _ in range(6)]
+        interval_recovered = refiller._next_interval(schedule, 1)
+        # assert
+        assert [1.0, 2.0, 4.0, 8.0, 10.0, 10.0] == intervals
+        assert 1.0 == interval_recovered
+
+    def test_full_idle(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.images = _images(server.keep)
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        # act
+        interval = refiller._next_interval(_CrawlerSchedule(crawler, 0), None)
+        # assert
+        assert 10.0 == interval
+
+    def test_full_draining(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.images = _images(server.keep + 9)
+        crawler.last_crawl_duration = 2.0
+        refiller = ServerRefiller(server, 1.0, 60.0)
+        schedule = _CrawlerSchedule(crawler, 0)
+        schedule.drain_rate = 2.0
+        # act
+        interval = refiller._next_interval(schedule, None)
+        # assert
+        assert 3.0 == interval  # 10 images to serve at 2/s, minus the latency
+
+
+class TestServerRefillerRefillDue:
+
+    def test_refills_below_keep(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.imagecrawler._crawl = lambda: _images(2)  # type: ignore[assignment]
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        # act
+        refiller._refill_due(server)
+        sleep(0.1)
+        # assert
+        assert 2 == len(crawler.images)
+        assert 1 == len(refiller._queue)
+        assert refiller._queue[0].due > monotonic()
+
+    def test_skips_full(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.images = _images(server.keep)
+        crawler.imagecrawler._crawl = lambda: pytest.fail('must not crawl')  # type: ignore[assignment]
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        # act
+        timeout = refiller._refill_due(server)
+        # assert
+        assert 10.0 == pytest.approx(timeout, abs=0.1)
+
+    def test_drops_removed_crawlers(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.images = _images(server.keep)
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        refiller._refill_due(server)
+        # act
+        server.core.crawlers.clear()
+        refiller._refill_due(server)
+        # assert
+        assert not refiller._queue
+        assert not refiller._schedules
+
+    def test_drain_rate(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.images = _images(server.keep + 10)
+        refiller = ServerRefiller(server, 0.0, 10.0)
+        schedule = _CrawlerSchedule(crawler, 0)
+        refiller._update_drain_rate(server, schedule, 0.0)
+        for _ in range(4):
+            server.get_image()
+        # act
+        refiller._update_drain_rate(server, schedule, 2.0)
+        # assert
+        assert 4 == server.stats.count_images_served_by_crawler[id(crawler)]
+        assert 1.0 == schedule.drain_rate  # average of 0 and 2/s
+
+    def test_reschedule_all(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.images = _images(server.keep)
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        refiller._refill_due(server)
+        # act
+        refiller.reschedule_all()
+        # assert
+        assert refiller._queue[0].due <= monotonic()
+        assert refiller._wakeup.is_set()
+
+    def test_request_refill(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        crawler.images = _images(server.keep)
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        refiller._refill_due(server)
+        refiller._wakeup.clear()
+        # act
+        refiller.request_refill(crawler)
+        # assert
+        assert refiller._queue[0].due <= monotonic()
+        assert refiller._wakeup.is_set()
+
+    def test_request_refill_crawling(self, server_crawler: Tuple[Server, Crawler]) -> None:
+        # arrange
+        server, crawler = server_crawler
+        refiller = ServerRefiller(server, 1.0, 10.0)
+        schedule = _CrawlerSchedule(crawler, monotonic() + 10)
+        schedule.crawling = True
+        refiller._schedules[crawler] = schedule
+        # act
+        refiller.request_refill(crawler)
+        # assert
+        assert schedule.due > monotonic()
@@ -0,0 +1,181 @@
+import sys
+from multiprocessing import get_all_start_methods, get_context
+from typing import Iterator
+
+import pytest
+
+from nichtparasoup.core import Crawler
+from nichtparasoup.core.image import Image, ImageCollection, ImagePool
+
+from .._mocks.mockable_imagecrawler import MockableImageCrawler
+
+if sys.version_info >= (3, 8):
+    from nichtparasoup.core.sharedimagepool import SharedImagePool, SharedImagePools
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason='shared memory requires Python >= 3.8')
+
+
+@pytest.fixture()
+def pools() -> Iterator['SharedImagePools']:
+    pools = SharedImagePools(2, 5, slot_size=128)
+    yield pools
+    pools.close()
+    pools.unlink()
+
+
+def _images(count: int) -> ImageCollection:
+    return ImageCollection(Image(uri=f'test{i}', source='test', tags={'foo'}) for i in range(count))
+
+
+def _pop_all(pool: 'SharedImagePool') -> None:
+    while pool.pop_random():
+        pass
+
+
+class TestSharedImagePool:
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            SharedImagePools(0, 5)
+        with pytest.raises(ValueError):
+            SharedImagePools(1, 5, slot_size=4)
+
+    def test_set_semantics(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        pool = pools[0]
+        image = Image(uri='test1', source='test', width=10, tags={'foo'})
+        # act
+        added = [pool.add(image),
+                 pool.add(Image(uri='test1', source='other')),
+                 pool.add(Image(uri='test', source='test', is_generic=True)),
+                 pool.add(Image(uri='test', source='test', is_generic=True))]
+        # assert
+        assert [True, False, True, True] == added
+        assert 3 == len(pool)
+        assert image in pool
+        assert Image(uri='test', source='test') not in pool
+        assert 0 == len(pools[1])
+        assert {'width': 10, 'tags': ['foo']} == next(i for i in pool if i.uri == 'test1').more
+
+    def test_pop_random_drains(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        images = _images(5)
+        pool = pools[0]
+        pool |= images
+        # act
+        popped = ImageCollection(pool.pop_random() for _ in range(5))  # type: ignore[misc]
+        # assert
+        assert images == popped
+        assert 0 == len(pool)
+        assert pool.pop_random() is None
+        assert pool.get_random() is None
+
+    def test_discard(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        images = _images(5)
+        pool = pools[0]
+        pool |= images
+        image = next(iter(images))
+        # act
+        pool.discard(image)
+        pool.discard(image)
+        # assert
+        assert ImageCollection(images - {image}) == ImageCollection(pool)
+
+    def test_drops_overflow(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        pool = pools[0]
+        pool |= _images(4)
+        # act
+        too_big = pool.add(Image(uri='x' * 128, source='test'))
+        fits = pool.add(Image(uri='fits', source='test'))
+        full = pool.add(Image(uri='full', source='test'))
+        # assert
+        assert (False, True, False) == (too_big, fits, full)
+        assert 5 == len(pool)
+
+    def test_lookup_after_removals(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        pool = pools[0]
+        images = _images(5)
+        pool |= images
+        remaining = set(images)
+        # act & assert
+        while remaining:
+            popped = pool.pop_random()
+            assert popped in remaining
+            remaining.discard(popped)
+            assert all(image in pool for image in remaining), 'index follows the moved slots'
+            assert popped not in pool
+        pool |= images
+        assert 5 == len(pool)
+
+    def test_clear(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        pool = pools[0]
+        pool |= _images(5)
+        # act
+        pool.clear()
+        # assert
+        assert 0 == len(pool)
+        assert all(image not in pool for image in _images(5))
+        pool |= _images(5)
+        assert 5 == len(pool)
+
+    def test_pools_lock_independently(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        pool0, pool1 = pools
+        # act
+        with pool0._lock:
+            pool1.add(Image(uri='test', source='test'))
+        # assert
+        assert 1 == len(pool1)
+
+    def test_copy(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        pool = pools[0]
+        pool |= _images(3)
+        # act
+        copy = pool.copy()
+        # assert
+        assert isinstance(copy, ImagePool)
+        assert ImageCollection(pool) == copy
+
+    def test_crawler(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        crawler = Crawler(MockableImageCrawler(), images=pools[1])
+        # act
+        crawler.images = _images(3)
+        # assert
+        assert crawler.images is pools[1]
+        assert 3 == len(pools[1])
+        assert crawler.pop_random_image() is not None
+
+    def test_crawler_counts_stored_only(self) -> None:
+        # arrange
+        pools = SharedImagePools(1, 2, slot_size=128)
+        added = ImageCollection()
+        crawler = Crawler(MockableImageCrawler(), images=pools[0])
+        crawler.get_image_added = lambda: added.add  # type: ignore[assignment]
+        images = ImageCollection({*_images(4), Image(uri='x' * 128, source='test')})
+        # act
+        crawled = crawler._add_images(images)
+        pools.close()
+        pools.unlink()
+        # assert
+        assert 2 == crawled
+        assert 2 == len(added)
+        assert all(image in images for image in added)
+
+    @pytest.mark.skipif('fork' not in get_all_start_methods(), reason='requires fork')
+    def test_shared_with_forked_process(self, pools: 'SharedImagePools') -> None:
+        # arrange
+        pool = pools[0]
+        pool |= _images(5)
+        process = get_context('fork').Process(target=_pop_all, args=(pool,))
+        # act
+        process.start()
+        process.join(10)
+        # assert
+        assert 0 == process.exitcode
+        assert 0 == len(pool)
@@ -0,0 +1,81 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from nichtparasoup.core import NPCore
+from nichtparasoup.core.image import Image, ImageCollection
+from nichtparasoup.core.imagecrawler import ImageCrawlerState
+from nichtparasoup.core.snapshot import load_snapshot, save_snapshot
+from nichtparasoup.imagecrawlers.reddit import Reddit
+
+from .._mocks.mockable_imagecrawler import MockableImageCrawler, YetAnotherImageCrawler
+
+
+def _core() -> NPCore:
+    core = NPCore()
+    core.add_imagecrawler(MockableImageCrawler(n=1))
+    core.add_imagecrawler(MockableImageCrawler(n=2))
+    return core
+
+
+class TestSnapshot:
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        # arrange
+        file = str(tmp_path / 'snapshot')
+        core = _core()
+        images = ImageCollection({
+            Image(uri='test1', source='test', width=10, tags={'foo'}),
+            Image(uri='test2', source='test', is_generic=True),
+        })
+        core.crawlers[1]._add_images(images)
+        core.blacklist.add('test0')
+        restored_core = _core()
+        restored_core.add_imagecrawler(YetAnotherImageCrawler(n=1))
+        # act
+        save_snapshot(core, file)
+        restored = load_snapshot(restored_core, file)
+        # assert
+        assert 2 == restored
+        assert 0 == len(restored_core.crawlers[0].images)
+        restored_images = {image.uri: image for image in restored_core.crawlers[1].images}
+        assert {'test1', 'test2'} == set(restored_images)
+        assert {'width': 10, 'tags': ['foo']} == restored_images['test1'].more
+        assert restored_images['test2'].is_generic
+        assert 'test0' in restored_core.blacklist
+        assert 'test1' in restored_core.blacklist
+        assert restored_core.crawlers.has_stocked()
+        assert 0 == len(restored_core.crawlers[2].images)
+
+    def test_crawler_state(self, tmp_path: Path) -> None:
+        # arrange
+        file = str(tmp_path / 'snapshot')
+        core = NPCore()
+        core.add_imagecrawler(Reddit(subreddit='test'))
+        imagecrawler = core.crawlers[0].imagecrawler
+        imagecrawler.set_state(ImageCrawlerState(after='foo', at_end=False))
+        restored_core = NPCore()
+        restored_core.add_imagecrawler(Reddit(subreddit='test'))
+        # act
+        save_snapshot(core, file)
+        load_snapshot(restored_core, file)
+        # assert
+        assert ImageCrawlerState(after='foo', at_end=False) == restored_core.crawlers[0].imagecrawler.get_state()
+
+    def test_invalid(self, tmp_path: Path) -> None:
+        # arrange
+        file = tmp_path / 'snapshot'
+        with gzip.open(str(file), 'wt') as fp:
+            fp.write('{"version": 1}')
+        # act & assert
+        with pytest.raises(ValueError):
+            load_snapshot(_core(), str(file))
+
+    def test_not_gzipped(self, tmp_path: Path) -> None:
+        # arrange
+        file = tmp_path / 'snapshot'
+        file.write_text('foo')
+        # act & assert
+        with pytest.raises(OSError):
+            load_snapshot(_core(), str(file))
@@ -0,0 +1,369 @@
+from email.message import Message
+from http.client import HTTPMessage
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from threading import Thread
+from typing import Any, Iterator, List, Tuple, Type
+from urllib.error import HTTPError
+from urllib.parse import quote, unquote, urlparse
+from urllib.request import Request
+from urllib.response import addinfourl
+
+import pytest
+
+from nichtparasoup.core.transport import BaseTransport, CachingTransport, PooledTransport, UrllibTransport
+
+_Served = List[Tuple[str, int]]
+"""path, client port"""
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+_ROUTES = {
+    '/redirect': (302, b'moved', [('Location', '/target')]),
+    '/loop': (302, b'', [('Location', '/loop')]),
+    '/missing': (404, b'not found', []),
+}
+
+
+def _route(path: str, request_headers: Message) -> Tuple[int, bytes, List[Tuple[str, str]]]:
+    if path.startswith('/to/'):
+        return 302, b'', [('Location', unquote(path[4:]))]
+    if path == '/headers':
+        return 200, '|'.join(str(request_headers.get(h)) for h in ('Authorization', 'Cookie', 'X-Foo')).encode(), []
+    return _ROUTES.get(path, (200, path.encode(), []))
+
+
+def _get_handler(served: _Served) -> Type[BaseHTTPRequestHandler]:
+    class KeepAliveHTTPRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self) -> None:  # noqa: N802
+            served.append((self.path, self.client_address[1]))
+            code, body, headers = _route(self.path, self.headers)
+            self.send_response(code)
+            for k, v in headers:
+                self.send_header(k, v)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    return KeepAliveHTTPRequestHandler
+
+
+@pytest.fixture()
+def served_url() -> Iterator[Tuple[_Served, str]]:
+    served: _Served = []
+    httpd = _ThreadingHTTPServer(('localhost', 0), _get_handler(served))
+    serve = Thread(target=httpd.serve_forever, daemon=True)
+    serve.start()
+    yield served, f'http://{httpd.server_name}:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.server  # starts a local server
+class TestPooledTransport:
+
+    def test_reuses_connection(self, served_url: Tuple[_Served, str]) -> None:
+        # arrange
+        served, url = served_url
+        transport = PooledTransport()
+        # act
+        bodies = []
+        for path in ['/a', '/b']:
+            response = transport.open(Request(url + path), 1.0)
+            bodies.append(response.read())
+            response.close()
+        transport.close()
+        # assert
+        assert [b'/a', b'/b'] == bodies
+        assert served[0][1] == served[1][1], 'same client port'
+
+    def test_unread_response_is_not_reused(self, served_url: Tuple[_Served, str]) -> None:
+        # arrange
+        served, url = served_url
+        transport = PooledTransport()
+        # act
+        transport.open(Request(url + '/a'), 1.0).close()
+        transport.open(Request(url + '/b'), 1.0).close()
+        transport.close()
+        # assert
+        assert served[0][1] != served[1][1], 'different client port'
+
+    def test_idle_timeout(self, served_url: Tuple[_Served, str]) -> None:
+        # arrange
+        served, url = served_url
+        transport = PooledTransport(idle_timeout=0)
+        # act
+        for path in ['/a', '/b']:
+            response = transport.open(Request(url + path), 1.0)
+            response.read()
+            response.close()
+        transport.close()
+        # assert
+        assert served[0][1] != served[1][1], 'different client port'
+
+    def test_pool_size(self, served_url: Tuple[_Served, str]) -> None:
+        # arrange
+        _, url = served_url
+        transport = PooledTransport(pool_size=1)
+        responses = [transport.open(Request(url + path), 1.0) for path in ['/a', '/b']]
+        # act
+        for response in responses:
+            response.read()
+            response.close()
+        # assert
+        assert 1 == sum(len(pool) for pool in transport._pools.values())
+        transport.close()
+
+    def test_redirect(self, served_url: Tuple[_Served, str]) -> None:
+        # arrange
+        served, url = served_url
+        transport = PooledTransport()
+        # act
+        response = transport.open(Request(url + '/redirect'), 1.0)
+        body = response.read()
+        response.close()
+        transport.close()
+        # assert
+        assert b'/target' == body
+        assert response.geturl() == url + '/target'
+        assert served[0][1] == served[1][1], 'same client port'
+
+    @pytest.mark.parametrize(('host', 'expected'), [
+        ('localhost', b'secret|c=1|bar'),
+        ('127.0.0.1', b'None|None|bar'),
+    ], ids=['same host', 'cross host'])
+    def test_redirect_credentials(self, served_url: Tuple[_Served, str], host: str, expected: bytes) -> None:
+        # arrange
+        _, url = served_url
+        target = f'http://{host}:{urlparse(url).port}/headers'
+        transport = PooledTransport()
+        request = Request(f'http://localhost:{urlparse(url).port}/to/{quote(target, safe="")}',
+                          headers={'Authorization': 'secret', 'Cookie': 'c=1', 'X-Foo': 'bar'})
+        # act
+        response = transport.open(request, 1.0)
+        body = response.read()
+        response.close()
+        transport.close()
+        # assert
+        assert expected == body
+
+    def test_redirect_loop(self, served_url: Tuple[_Served, str]) -> None:
+        # arrange
+        _, url = served_url
+        transport = PooledTransport(max_redirects=3)
+        # act & assert
+        with pytest.raises(HTTPError):
+            transport.open(Request(url + '/loop'), 1.0)
+        transport.close()
+
+    def test_error_status(self, served_url: Tuple[_Served, str]) -> None:
+        # arrange
+        _, url = served_url
+        transport = PooledTransport()
+        # act & assert
+        with pytest.raises(HTTPError) as ex:
+            transport.open(Request(url + '/missing'), 1.0)
+        assert 404 == ex.value.code
+        transport.close()
+
+
+class TestPooledTransportFallback:
+
+    class _Fallback(BaseTransport):
+        def open(self, request: Request, timeout: float) -> None:  # type: ignore[override]
+            raise RuntimeError(request.full_url)
+
+    @pytest.mark.parametrize('url', ['file:///foo', 'ftp://foo.bar/baz'])
+    def test_not_http(self, url: str) -> None:
+        # arrange
+        transport = PooledTransport(fallback=self._Fallback())
+        # act & assert
+        with pytest.raises(RuntimeError, match=url):
+            transport.open(Request(url), 1.0)
+
+    def test_proxy(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # arrange
+        monkeypatch.setenv('http_proxy', 'http://proxy.test:3128')
+        monkeypatch.delenv('no_proxy', raising=False)
+        transport = PooledTransport(fallback=self._Fallback())
+        # act & assert
+        with pytest.raises(RuntimeError, match='foo.bar'):
+            transport.open(Request('http://foo.bar/baz'), 1.0)
+
+    def test_default(self) -> None:
+        # act
+        transport = PooledTransport()
+        # assert
+        assert isinstance(transport._fallback, UrllibTransport)
+
+
+class _ScriptedTransport(BaseTransport):
+    """Answer with scripted responses, and record the requests."""
+
+    def __init__(self, *responses: Tuple[int, List[Tuple[str, str]], bytes]) -> None:
+        self.responses = list(responses)
+        self.requests: List[Request] = []
+        self.opened: List[addinfourl] = []
+
+    def open(self, request: Request, timeout: float) -> addinfourl:
+        self.requests.append(request)
+        code, headers, body = self.responses.pop(0)
+        message = HTTPMessage()
+        for header, value in headers:
+            message[header] = value
+        if code != 200:
+            raise HTTPError(request.full_url, code, 'scripted', message, None)  # type: ignore[arg-type]
+        response = addinfourl(BytesIO(body), message, request.full_url, code)
+        self.opened.append(response)
+        return response
+
+
+class TestCachingTransport:
+
+    def test_fresh(self) -> None:
+        # arrange
+        inner = _ScriptedTransport((200, [('Cache-Control', 'max-age=60')], b'foo'))
+        transport = CachingTransport(inner)
+        # act
+        bodies = [transport.open(Request('http://foo.bar/baz'), 1.0).read() for _ in range(3)]
+        # assert
+        assert [b'foo'] * 3 == bodies
+        assert 1 == len(inner.requests)
+        assert (1, 2, 0) == (transport.stats.misses, transport.stats.hits, transport.stats.revalidations)
+
+    def test_revalidate(self) -> None:
+        # arrange
+        inner = _ScriptedTransport(
+            (200, [('ETag', '"v1"'), ('Last-Modified', 'Mon, 01 Jun 2020 00:00:00 GMT')], b'foo'),
+            (304, [('ETag', '"v1"')], b''),
+        )
+        transport = CachingTransport(inner)
+        # act
+        transport.open(Request('http://foo.bar/baz'), 1.0)
+        response = transport.open(Request('http://foo.bar/baz'), 1.0)
+        # assert
+        assert b'foo' == response.read()
+        assert '"v1"' == inner.requests[1].get_header('If-none-match')
+        assert 'Mon, 01 Jun 2020 00:00:00 GMT' == inner.requests[1].get_header('If-modified-since')
+        assert (1, 0, 1) == (transport.stats.misses, transport.stats.hits, transport.stats.revalidations)
+
+    @pytest.mark.parametrize('headers', [
+        [('Cache-Control', 'no-store'), ('ETag', '"v1"')],
+        [('Cache-Control', 'max-age=60'), ('Vary', '*')],
+        [],
+    ], ids=['no-store', 'vary', 'no validator'])
+    def test_not_cacheable(self, headers: List[Tuple[str, str]]) -> None:
+        # arrange
+        inner = _ScriptedTransport((200, headers, b'foo'), (200, headers, b'bar'))
+        transport = CachingTransport(inner)
+        # act
+        bodies = [transport.open(Request('http://foo.bar/baz'), 1.0).read() for _ in range(2)]
+        # assert
+        assert [b'foo', b'bar'] == bodies
+        assert 2 == transport.stats.misses
+        assert all(request.get_header('If-none-match') is None for request in inner.requests)
+
+    def test_not_cacheable_is_not_buffered(self) -> None:
+        # arrange
+        inner = _ScriptedTransport((200, [('Cache-Control', 'no-store')], b'foo'))
+        transport = CachingTransport(inner)
+        # act
+        response = transport.open(Request('http://foo.bar/baz'), 1.0)
+        # assert
+        assert inner.opened == [response]
+        assert b'foo' == response.read()
+
+    def test_not_get(self) -> None:
+        # arrange
+        inner = _ScriptedTransport(*[(200, [('Cache-Control', 'max-age=60')], b'foo')] * 2)
+        transport = CachingTransport(inner)
+        # act
+        for _ in range(2):
+            transport.open(Request('http://foo.bar/baz', data=b'data'), 1.0)
+        # assert
+        assert 2 == len(inner.requests)
+
+    def test_memory_lru(self) -> None:
+        # arrange
+        fresh = [('Cache-Control', 'max-age=60')]
+        inner = _ScriptedTransport(*[(200, fresh, b'12345')] * 4)
+        transport = CachingTransport(inner, max_memory_size=10)
+        # act
+        for url in ['http://foo.bar/1', 'http://foo.bar/2', 'http://foo.bar/1', 'http://foo.bar/3',
+                    'http://foo.bar/1', 'http://foo.bar/2']:
+            transport.open(Request(url), 1.0)
+        # assert
+        assert ['http://foo.bar/1', 'http://foo.bar/2', 'http://foo.bar/3', 'http://foo.bar/2'] == [
+            request.full_url for request in inner.requests]
+
+    def test_disk(self, tmp_path: Path) -> None:
+        # arrange
+        inner = _ScriptedTransport((200, [('Cache-Control', 'max-age=60'), ('Content-Type', 'text/plain')], b'foo'))
+        CachingTransport(inner, directory=str(tmp_path)).open(Request('http://foo.bar/baz'), 1.0)
+        transport = CachingTransport(_ScriptedTransport(), directory=str(tmp_path))
+        # act
+        response = transport.open(Request('http://foo.bar/baz'), 1.0)
+        # assert
+        assert b'foo' == response.read()
+        assert 'text/plain' == response.info().get_content_type()
+        assert 1 == transport.stats.hits
+
+    def test_disk_lru(self, tmp_path: Path) -> None:
+        # arrange
+        fresh = [('Cache-Control', 'max-age=60')]
+        inner = _ScriptedTransport(*[(200, fresh, b'x' * 1000)] * 3)
+        transport = CachingTransport(inner, directory=str(tmp_path), max_disk_size=2500)
+        # act
+        for url in ['http://foo.bar/1', 'http://foo.bar/2', 'http://foo.bar/3']:
+            transport.open(Request(url), 1.0)
+        # assert
+        assert 2 == len(list(tmp_path.iterdir()))
+
+    def test_disk_creates_directory(self, tmp_path: Path) -> None:
+        # arrange
+        directory = tmp_path / 'foo' / 'bar'
+        inner = _ScriptedTransport((200, [('Cache-Control', 'max-age=60')], b'foo'))
+        transport = CachingTransport(inner, directory=str(directory))
+        # act
+        transport.open(Request('http://foo.bar/baz'), 1.0)
+        # assert
+        assert 1 == len(list(directory.iterdir()))
+
+    def test_disk_write_error(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # arrange
+        def write_bytes(*_: Any) -> None:
+            raise OSError('disk full')
+
+        monkeypatch.setattr(Path, 'write_bytes', write_bytes)
+        inner = _ScriptedTransport((200, [('Cache-Control', 'max-age=60')], b'foo'))
+        transport = CachingTransport(inner, directory=str(tmp_path))
+        # act
+        bodies = [transport.open(Request('http://foo.bar/baz'), 1.0).read() for _ in range(2)]
+        # assert
+        assert [b'foo'] * 2 == bodies, 'still cached in memory'
+        assert [] == list(tmp_path.iterdir())
+
+    def test_disk_read_error(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # arrange
+        def read_bytes(*_: Any) -> bytes:
+            raise OSError('gone')
+
+        inner = _ScriptedTransport((200, [('Cache-Control', 'max-age=60')], b'foo'))
+        CachingTransport(inner, directory=str(tmp_path)).open(Request('http://foo.bar/baz'), 1.0)
+        transport = CachingTransport(_ScriptedTransport((200, [], b'bar')), directory=str(tmp_path))
+        monkeypatch.setattr(Path, 'read_bytes', read_bytes)
+        # act
+        response = transport.open(Request('http://foo.bar/baz'), 1.0)
+        # assert
+        assert b'bar' == response.read()
+        assert 1 == transport.stats.misses
@@ -4,7 +4,7 @@ from urllib.parse import parse_qs, urlsplit
 
 import pytest
 
-from nichtparasoup.imagecrawler import Image, ImageCollection
+from nichtparasoup.imagecrawler import Image, ImageCollection, ImageCrawlerState
 from nichtparasoup.imagecrawlers.pr0gramm import Pr0gramm
 from nichtparasoup.testing.imagecrawler import FileFetcher, ImageCrawlerLoaderTest
 
@@ -143,6 +143,31 @@ class TestPr0grammReset:
         assert crawler._older is None
 
 
+class TestPr0grammState:
+
+    def test_roundtrip(self) -> None:
+        # arrange
+        crawler = Pr0gramm()
+        crawler._reset_before_next_crawl = False
+        crawler._older = 1337
+        crawler._at_end = True
+        restored = Pr0gramm()
+        # act
+        restored.set_state(crawler.get_state())
+        # assert
+        assert 1337 == restored._older
+        assert restored.is_exhausted()
+
+    @pytest.mark.parametrize('state', [{'older': '1337', 'at_end': False}, {'older': 1337}],
+                             ids=['wrong type', 'missing'])
+    def test_invalid(self, state: Dict[str, Any]) -> None:
+        # arrange
+        crawler = Pr0gramm()
+        # act & assert
+        with pytest.raises(ValueError):
+            crawler.set_state(ImageCrawlerState(state))
+
+
 class TestPr0grammExhausted:
 
     @pytest.mark.parametrize(
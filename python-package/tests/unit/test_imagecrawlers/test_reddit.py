@@ -1,10 +1,10 @@
 import unittest
 from os.path import dirname, join as path_join
-from typing import Any, List
+from typing import Any, Dict, List
 
 import pytest
 
-from nichtparasoup.imagecrawler import Image, ImageCollection
+from nichtparasoup.imagecrawler import Image, ImageCollection, ImageCrawlerState
 from nichtparasoup.imagecrawlers.reddit import Reddit
 from nichtparasoup.testing.imagecrawler import FileFetcher, ImageCrawlerLoaderTest
 
@@ -108,6 +108,30 @@ class RedditResetTest(unittest.TestCase):
         self.assertIsNone(crawler._after)
 
 
+class TestRedditState:
+
+    def test_roundtrip(self) -> None:
+        # arrange
+        crawler = Reddit(subreddit='test')
+        crawler._reset_before_next_crawl = False
+        crawler._after = 'foo'
+        crawler._at_end = True
+        restored = Reddit(subreddit='test')
+        # act
+        restored.set_state(crawler.get_state())
+        # assert
+        assert 'foo' == restored._after
+        assert restored.is_exhausted()
+
+    @pytest.mark.parametrize('state', [{'after': 1, 'at_end': False}, {'after': 'foo'}], ids=['wrong type', 'missing'])
+    def test_invalid(self, state: Dict[str, Any]) -> None:
+        # arrange
+        crawler = Reddit(subreddit='test')
+        # act & assert
+        with pytest.raises(ValueError):
+            crawler.set_state(ImageCrawlerState(state))
+
+
 class TestRedditExhausted:
 
     @pytest.mark.parametrize(
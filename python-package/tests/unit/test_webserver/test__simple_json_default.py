@@ -0,0 +1,106 @@
+from json import JSONEncoder, loads as json_loads
+from typing import Any, Callable
+
+import pytest
+
+from nichtparasoup import _internals
+from nichtparasoup.webserver import _simple_json_default
+
+_Encode = Callable[[Any], Any]
+
+
+@pytest.fixture(params=['json', 'orjson', 'ujson'])
+def encode(request: Any, monkeypatch: pytest.MonkeyPatch) -> _Encode:
+    """Encode and decode again - via each JSON backend."""
+    backend = request.param
+    if backend != 'json':
+        pytest.importorskip(backend)
+    for other in {'orjson', 'ujson'} - {backend}:
+        monkeypatch.setattr(_internals, other, None)
+    return lambda data: json_loads(_internals._json_dumps(data, _simple_json_default))
+
+
+class TestSimpleJsonDefault:
+
+    @pytest.mark.parametrize(
+        'data',
+        [
+            None,
+            False, True,
+            1, -0.2, 'foo',
+            [1, 2], (1, 2),
+            {'a': 1, 2: 3},
+        ],
+        ids=type
+    )
+    def test_base_type(self, data: Any, encode: _Encode) -> None:
+        # act
+        json_o = json_loads(JSONEncoder().encode(data))
+        json_c = encode(data)
+        # assert
+        assert json_o == json_c
+
+    @pytest.mark.parametrize(
+        'data_o',
+        [
+            1, -0.2, 'foo',
+            [1, 2], (1, 2),
+            {'a': 1, 2: 3},
+        ],
+        ids=type
+    )
+    def test_inherited_base_type(self, data_o: Any, encode: _Encode) -> None:
+        # arrange
+        type_o = type(data_o)
+
+        class Inherited(type_o):  # type: ignore[valid-type,misc]
+            pass
+
+        data_i = Inherited(data_o)
+        # act
+        json_o = json_loads(JSONEncoder().encode(data_o))
+        json_i = encode(data_i)
+        # assert
+        assert json_o == json_i
+
+    def test_custom_object(self, encode: _Encode) -> None:
+        # arrange
+        class Foo:
+            def __init__(self, a: Any, b: Any, *args: Any, **kwargs: Any) -> None:
+                self.a = a
+                self.b = b
+                self.args = args
+                self.kwargs = kwargs
+
+        data_o = {
+            'a': 1,
+            'b': False,
+            'args': ['bar'],
+            'kwargs': {
+                'again': {
+                    'a': 0.2,
+                    'b': None,
+                    'args': [[True], {'a': -1}],
+                    'kwargs': {
+                        'tuple': (3, 2, 1)
+                    },
+                },
+            },
+        }
+        data_i = Foo(1, False, 'bar', again=Foo(0.2, None, [True], {'a': -1}, tuple=(3, 2, 1)))
+        # act
+        json_o = json_loads(JSONEncoder().encode(data_o))
+        json_i = encode(data_i)
+        # assert
+        assert json_o == json_i
+
+    def test_set(self, encode: _Encode) -> None:
+        # act
+        json_i = encode({'tags': {'foo'}})
+        # assert
+        assert {'tags': ['foo']} == json_i
+
+    def test_unknown(self, encode: _Encode) -> None:
+        # act & assert
+        with pytest.raises(TypeError):
+            encode(object.__new__(type('Foo', (), {'__slots__': ()})))
@@ -0,0 +1,102 @@
+import gzip
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from nichtparasoup._staticfiles import _StaticFiles
+
+_CSS = 'body { color: black; }\n' * 100
+
+
+def _app(environ: Dict[str, Any], start_response: Any) -> List[bytes]:
+    start_response('418 I\'m a teapot', [('Content-Type', 'text/plain')])
+    return [b'app']
+
+
+class TestStaticFiles:
+
+    if TYPE_CHECKING:
+        _ClientType = Client[Response]
+    else:
+        _ClientType = Client
+
+    @pytest.fixture()
+    def client(self, tmp_path: Path) -> _ClientType:
+        (tmp_path / 'css').mkdir()
+        (tmp_path / 'css' / 'look.css').write_text(_CSS)
+        (tmp_path / 'index.html').write_text(
+            '<link rel="stylesheet" href="css/look.css" /><link rel="stylesheet" href="css/dynamic.css" />')
+        return Client(_StaticFiles(_app, str(tmp_path)), Response)
+
+    @staticmethod
+    def _hashed_css_url(client: _ClientType) -> str:
+        html = client.get('/index.html').get_data(as_text=True)
+        match = re.search(r'href="(css/look\.[0-9a-f]{12}\.css)"', html)
+        assert match
+        return '/' + match.group(1)
+
+    def test_rewrite(self, client: _ClientType) -> None:
+        # act
+        html = client.get('/index.html').get_data(as_text=True)
+        # assert
+        assert 'href="css/dynamic.css"' in html, 'unknown files are not rewritten'
+        assert 'href="css/look.css"' not in html
+
+    def test_hashed(self, client: _ClientType) -> None:
+        # act
+        response = client.get(self._hashed_css_url(client))
+        # assert
+        assert 200 == response.status_code
+        assert _CSS == response.get_data(as_text=True)
+        assert response.mimetype == 'text/css'
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age >= 365 * 24 * 60 * 60
+
+    def test_unhashed(self, client: _ClientType) -> None:
+        # act
+        response = client.get('/css/look.css')
+        # assert
+        assert 200 == response.status_code
+        assert _CSS == response.get_data(as_text=True)
+        assert response.cache_control.no_cache
+        assert response.headers['etag'] and not response.headers['etag'].startswith('W/'), 'strong etag'
+
+    def test_not_modified(self, client: _ClientType) -> None:
+        # arrange
+        etag = client.get('/css/look.css').headers['etag']
+        # act
+        response = client.get('/css/look.css', headers={'If-None-Match': etag})
+        # assert
+        assert 304 == response.status_code
+        assert not response.data
+
+    def test_gzip(self, client: _ClientType) -> None:
+        # arrange
+        etag = client.get('/css/look.css').headers['etag']
+        # act
+        response = client.get('/css/look.css', headers={'Accept-Encoding': 'gzip'})
+        # assert
+        assert 'gzip' == response.content_encoding
+        assert 'Accept-Encoding' in response.vary
+        assert etag != response.headers['etag'], 'etag per content-coding'
+        assert _CSS == gzip.decompress(response.data).decode()
+        assert len(response.data) == response.content_length
+
+    def test_head(self, client: _ClientType) -> None:
+        # act
+        response = client.head('/css/look.css')
+        # assert
+        assert 200 == response.status_code
+        assert not response.data
+        assert len(_CSS) == response.content_length
+
+    @pytest.mark.parametrize(('method', 'path'), [('GET', '/css/dynamic.css'), ('POST', '/css/look.css')])
+    def test_passed_to_app(self, method: str, path: str, client: _ClientType) -> None:
+        # act
+        response = client.open(path, method=method)
+        # assert
+        assert 418 == response.status_code
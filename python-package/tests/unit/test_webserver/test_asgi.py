@@ -0,0 +1,161 @@
+from asyncio import Event as AsyncEvent, new_event_loop
+from json import loads as json_loads
+from typing import Any, Awaitable, Dict, List, Optional
+
+from nichtparasoup.asgi import AsgiWebServer
+from nichtparasoup.core import Crawler, NPCore
+from nichtparasoup.core.image import Image
+from nichtparasoup.core.server import ImageResponse, Server
+
+from .._mocks.mockable_imagecrawler import MockableImageCrawler
+
+_Message = Dict[str, Any]
+
+
+def _run(awaitable: Awaitable[None]) -> None:
+    loop = new_event_loop()
+    try:
+        loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
+
+
+def _scope(path: str, query_string: bytes = b'', method: str = 'GET') -> Dict[str, Any]:
+    return dict(type='http', http_version='1.1', method=method, scheme='http', root_path='',
+                path=path, query_string=query_string, headers=[(b'host', b'localhost')],
+                server=('localhost', 80), client=('127.0.0.1', 12345))
+
+
+def _request(sut: AsgiWebServer, path: str, query_string: bytes = b'', method: str = 'GET') -> List[_Message]:
+    sent: List[_Message] = []
+
+    async def receive() -> _Message:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: _Message) -> None:
+        sent.append(message)
+
+    _run(sut(_scope(path, query_string, method), receive, send))
+    return sent
+
+
+def _header(message: _Message, name: bytes) -> Optional[bytes]:
+    return dict(message['headers']).get(name)
+
+
+class TestAsgiWebServer:
+
+    @staticmethod
+    def _sut() -> AsgiWebServer:
+        sut = AsgiWebServer(Server(NPCore()), '', 0)
+        crawler = Crawler(MockableImageCrawler())
+        sut.webserver.imageserver.get_images = lambda n: [  # type: ignore[assignment]
+            ImageResponse(Image(uri=f'test://dummy{i}', source='test'), crawler) for i in range(n)]
+        sut.webserver.imageserver.get_image = lambda: ImageResponse(  # type: ignore[assignment]
+            Image(uri='test://dummy', source='test'), crawler)
+        return sut
+
+    def test_get(self) -> None:
+        # act
+        start, body = _request(self._sut(), '/get', b'count=2')
+        # assert
+        assert 200 == start['status']
+        assert b'no-cache, no-store' == _header(start, b'cache-control')
+        assert ['test://dummy0', 'test://dummy1'] == [image['uri'] for image in json_loads(body['body'])]
+
+    def test_static(self) -> None:
+        # act
+        start, body = _request(self._sut(), '/index.html')
+        # assert
+        assert 200 == start['status']
+        assert body['body']
+
+    def test_unknown(self) -> None:
+        # act
+        start, _ = _request(self._sut(), '/unknown')
+        # assert
+        assert 404 == start['status']
+
+    def test_method_not_allowed(self) -> None:
+        # act
+        start, _ = _request(self._sut(), '/get', method='POST')
+        # assert
+        assert 405 == start['status']
+
+    def test_stream(self) -> None:
+        # arrange
+        sut = self._sut()
+        sent: List[_Message] = []
+        got_event = AsyncEvent()
+
+        async def receive() -> _Message:
+            await got_event.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message: _Message) -> None:
+            sent.append(message)
+            if message.get('more_body'):
+                got_event.set()
+
+        # act
+        _run(sut(_scope('/stream', b'interval=60'), receive, send))
+        # assert
+        start, event = sent
+        assert 200 == start['status']
+        assert b'text/event-stream; charset=utf-8' == _header(start, b'content-type')
+        assert event['body'].startswith(b'data: ') and event['body'].endswith(b'\n\n')
+        assert 'test://dummy0' == json_loads(event['body'][6:])['uri']
+        assert sut.webserver._streamer and not sut.webserver._streamer._subscriptions, 'unsubscribed'
+
+    def test_stream_invalid_interval(self) -> None:
+        # act
+        start, _ = _request(self._sut(), '/stream', b'interval=foo')
+        # assert
+        assert 400 == start['status']
+
+    def test_lifespan(self) -> None:
+        # arrange
+        sut = AsgiWebServer(Server(NPCore()), '', 0)
+        messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+        sent: List[_Message] = []
+        alive: List[bool] = []
+
+        async def receive() -> _Message:
+            alive.append(sut.webserver.imageserver.is_alive())
+            return next(messages)
+
+        async def send(message: _Message) -> None:
+            sent.append(message)
+
+        # act
+        _run(sut({'type': 'lifespan'}, receive, send))
+        # assert
+        assert [False, True] == alive
+        assert not sut.webserver.imageserver.is_alive()
+        assert ['lifespan.startup.complete', 'lifespan.shutdown.complete'] == [message['type'] for message in sent]
+
+    def test_lifespan_failed(self) -> None:
+        # arrange
+        sut = AsgiWebServer(Server(NPCore()), '', 0)
+        messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+        sent: List[_Message] = []
+
+        def fail() -> None:
+            raise OSError('test')
+
+        sut.webserver.start = fail  # type: ignore[assignment]
+        sut.webserver.stop = fail  # type: ignore[assignment]
+
+        async def receive() -> _Message:
+            return next(messages)
+
+        async def send(message: _Message) -> None:
+            sent.append(message)
+
+        # act
+        _run(sut({'type': 'lifespan'}, receive, send))
+        # assert
+        assert [
+            {'type': 'lifespan.startup.failed', 'message': 'OSError: test'},
+            {'type': 'lifespan.shutdown.failed', 'message': 'OSError: test'},
+        ] == sent
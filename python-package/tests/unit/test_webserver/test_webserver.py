@@ -1,18 +1,27 @@
+import os
 import random
+import sys
 from json import loads as json_loads
-from typing import TYPE_CHECKING, Any, Dict, Set, Tuple
+from pathlib import Path
+from signal import SIGTERM, getsignal
+from time import sleep
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Set, Tuple
 from uuid import uuid4
 
 import pytest
-from werkzeug.exceptions import HTTPException, InternalServerError, NotFound
+from werkzeug.exceptions import BadRequest, HTTPException, InternalServerError, NotFound
 from werkzeug.test import Client
 from werkzeug.wrappers import Request, Response
 
-from nichtparasoup import __version__ as np__version
+from nichtparasoup import __version__ as np__version, webserver as np_webserver
 from nichtparasoup.core import Crawler, NPCore
-from nichtparasoup.core.image import Image
+from nichtparasoup.core.image import Image, ImageCollection
+from nichtparasoup.core.imagecrawler import ImageCrawlerInfo
 from nichtparasoup.core.server import ImageResponse, ResetResponse, Server, StatusLike
-from nichtparasoup.webserver import WebServer
+from nichtparasoup.imagecrawlers.echo import Echo
+from nichtparasoup.webserver import (
+    WebServer, _ImageStreamer, _interrupt_on_sigterm, _PoolClient, _PoolOwner, create_app,
+)
 
 from .._mocks.mockable_imagecrawler import MockableImageCrawler
 
@@ -72,7 +81,7 @@ class TestWebserverFunctional:
             # act
             client.get(path)
 
-    @pytest.mark.parametrize('path', list(_KNOWN_WEB_PATHS))
+    @pytest.mark.parametrize('path', list(_KNOWN_WEB_PATHS - {'/css/sourceIcons.css'}))
     def test_no_caching(self, path: str, client: _ClientType) -> None:
         # act
         response = client.get(path)
@@ -220,6 +229,38 @@ class TestWebserverActions:
         assert isinstance(data['crawler']['id'], int)
         assert isinstance(data['crawler']['type'], str)
 
+    @pytest.mark.parametrize(('count', 'expected'), [('2', 2), ('0', 1), ('1000', WebServer._GET_COUNT_MAX)])
+    def test_get_count(self, sut: WebServer, count: str, expected: int) -> None:
+        # arrange
+        crawler = Crawler(MockableImageCrawler())
+        sut.imageserver.get_images = lambda n: [  # type: ignore[assignment]
+            ImageResponse(Image(uri=f'test://dummy{i}', source='test'), crawler) for i in range(n)]
+        request = Request({'QUERY_STRING': f'count={count}'})
+        # act
+        response = sut.on_get(request)
+        # assert
+        assert response.status_code == 200
+        data = json_loads(response.data)
+        assert isinstance(data, list)
+        assert expected == len(data)
+        assert all(item['crawler']['id'] == id(crawler) for item in data)
+
+    def test_get_count_exhausted(self, sut: WebServer) -> None:
+        # arrange
+        sut.imageserver.get_images = lambda _: []  # type: ignore[assignment]
+        request = Request({'QUERY_STRING': 'count=2'})
+        # act
+        response = sut.on_get(request)
+        # assert
+        assert response.status_code == 404
+
+    def test_get_count_invalid(self, sut: WebServer) -> None:
+        # arrange
+        request = Request({'QUERY_STRING': 'count=foo'})
+        # act & assert
+        with pytest.raises(BadRequest):
+            sut.on_get(request)
+
     def test_status(self, sut: WebServer) -> None:
         # arrange
         class Dummy(StatusLike):
@@ -273,3 +314,263 @@ class TestWebserverActions:
         assert isinstance(data, dict)
         assert data['foo'] == 'foo'
         assert data['bar'] == 23
+
+
+class TestWebserverWorkers:
+
+    def test_processes_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            WebServer(Server(NPCore()), '', 0, processes=0)
+
+    def test_payload_unknown(self) -> None:
+        # arrange
+        sut = WebServer(Server(NPCore()), '', 0)
+        # act & assert
+        with pytest.raises(ValueError):
+            sut._payload('imageserver')
+
+    def test_query_pool_owner(self) -> None:
+        # arrange
+        owner = WebServer(Server(NPCore()), '', 0)
+        img = Image(uri='test://dummy', source='test')
+        owner.imageserver.get_image = lambda: ImageResponse(img, Crawler(MockableImageCrawler()))  # type: ignore
+        pool_owner = _PoolOwner(owner)
+        pool_owner.start()
+        worker = WebServer(Server(NPCore()), '', 0)
+        worker._pool_client = _PoolClient(pool_owner.address, pool_owner.authkey)
+        worker.imageserver.get_image = lambda: None  # type: ignore[assignment]
+        request = Request({})
+        # act
+        responses = [worker.on_get(request) for _ in range(3)]
+        with pytest.raises(NotFound):
+            worker.on_status_what(request, str(uuid4()))
+        # assert
+        assert all(response.status_code == 200 for response in responses)
+        assert all(json_loads(response.data)['uri'] == img.uri for response in responses)
+        assert 1 == len(worker._pool_client._idle), 'connection is reused'
+        pool_owner.close()
+
+    def test_query_pool_owner_failed(self) -> None:
+        # arrange
+        owner = WebServer(Server(NPCore()), '', 0)
+
+        def request_reset() -> ResetResponse:
+            raise Exception('test')
+
+        owner.imageserver.request_reset = request_reset  # type: ignore[assignment]
+        pool_owner = _PoolOwner(owner)
+        pool_owner.start()
+        client = _PoolClient(pool_owner.address, pool_owner.authkey)
+        # act & assert
+        with pytest.raises(RuntimeError, match='test'):
+            client.query('reset')
+        pool_owner.close()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason='shared memory requires Python >= 3.8')
+class TestInterruptOnSigterm:
+
+    def test_interrupts(self) -> None:
+        # arrange
+        previous = getsignal(SIGTERM)
+        # act & assert
+        with pytest.raises(KeyboardInterrupt):
+            with _interrupt_on_sigterm():
+                os.kill(os.getpid(), SIGTERM)
+                sleep(1.0)  # the signal is handled in between
+        assert previous is getsignal(SIGTERM), 'handler restored'
+
+
+class TestWebserverSharedPools:
+
+    @staticmethod
+    def _sut() -> WebServer:
+        sut = WebServer(Server(NPCore()), '', 0, processes=2)
+        for n in range(2):
+            sut.imageserver.core.add_imagecrawler(MockableImageCrawler(n=n))
+        return sut
+
+    def test_share_pools(self) -> None:
+        # arrange
+        sut = self._sut()
+        crawler = sut.imageserver.core.crawlers[0]
+        crawler.images = ImageCollection({Image(uri='test', source='test')})
+        # act
+        pools = sut._share_pools()
+        # assert
+        assert pools is not None
+        assert [crawler.images for crawler in sut.imageserver.core.crawlers] == list(pools)
+        assert Image(uri='test', source='test') in crawler.images
+        assert sut._is_pool_shared()
+        assert sut._share_pools() is None, 'shared already'
+        pools.close()
+        pools.unlink()
+
+    def test_worker_pops_shared_pools(self) -> None:
+        # arrange
+        owner = self._sut()
+        pools = owner._share_pools()
+        assert pools is not None
+        owner.imageserver.core.crawlers[1].images.add(Image(uri='test', source='test'))
+        pool_owner = _PoolOwner(owner)
+        pool_owner.start()
+        worker = self._sut()  # as if forked
+        for crawler, pool in zip(worker.imageserver.core.crawlers, pools):
+            crawler.images = pool
+        worker._pool_client = _PoolClient(pool_owner.address, pool_owner.authkey)
+        worker._served_reporter = np_webserver._ServedReporter(worker._pool_client, worker.imageserver.core.crawlers)
+        worker._served_reporter.start()
+        # act
+        response = worker.on_get(Request({}))
+        for _ in range(100):
+            if owner.imageserver.stats.count_images_served:
+                break
+            sleep(0.01)
+        # assert
+        assert 'test' == json_loads(response.data)['uri']
+        assert 0 == len(owner.imageserver.core.crawlers[1].images)
+        assert 1 == worker.imageserver.stats.count_images_served, 'popped by the worker'
+        assert 1 == owner.imageserver.stats.count_images_served
+        assert {id(owner.imageserver.core.crawlers[1]): 1} == owner.imageserver.stats.count_images_served_by_crawler
+        pool_owner.close()
+        pools.close()
+        pools.unlink()
+
+
+class TestWebserverStream:
+
+    def test_push_fair_share(self) -> None:
+        # arrange
+        fetched: List[int] = []
+
+        def fetch(count: int) -> List[bytes]:
+            fetched.append(count)
+            return [b'1', b'2'][:count]
+
+        streamer = _ImageStreamer(fetch)
+        delivered: Dict[str, List[bytes]] = {'old': [], 'new': [], 'newest': [], 'later': []}
+        subscriptions = {name: streamer.subscribe(1, delivered[name].append) for name in delivered}
+        subscriptions['old'].due -= 2
+        subscriptions['new'].due -= 1
+        subscriptions['later'].due += 60
+        # act
+        streamer._push(list(subscriptions.values()))
+        # assert
+        assert [3] == fetched, 'one batch for all due subscriptions'
+        assert {'old': [b'1'], 'new': [b'2'], 'newest': [], 'later': []} == delivered
+        assert subscriptions['newest'].due < subscriptions['new'].due, 'stays due'
+
+    def test_stream(self) -> None:
+        # arrange
+        sut = WebServer(Server(NPCore()), '', 0)
+        crawler = Crawler(MockableImageCrawler())
+        sut.imageserver.get_images = lambda n: [  # type: ignore[assignment]
+            ImageResponse(Image(uri=f'test://dummy{i}', source='test'), crawler) for i in range(n)]
+        client = Client(sut, Response)
+        # act
+        response = client.get('/stream?interval=60', buffered=False)
+        event = next(iter(response.response))
+        response.close()
+        # assert
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert event.startswith(b'data: ') and event.endswith(b'\n\n')
+        assert 'test://dummy0' == json_loads(event[6:])['uri']
+        assert sut._streamer and not sut._streamer._subscriptions, 'unsubscribed'
+
+    def test_stream_invalid_interval(self) -> None:
+        # arrange
+        client = Client(WebServer(Server(NPCore()), '', 0), Response)
+        # act & assert
+        with pytest.raises(BadRequest):
+            client.get('/stream?interval=foo')
+
+
+class _IconImageCrawler(MockableImageCrawler):
+
+    @classmethod
+    def info(cls) -> ImageCrawlerInfo:
+        return ImageCrawlerInfo(description='a mock with an icon', icon_url='test://icon')
+
+
+class TestWebserverSourceIcons:
+
+    @pytest.fixture()
+    def sut(self) -> WebServer:
+        sut = WebServer(Server(NPCore()), '', 0)
+        sut.imageserver.core.add_imagecrawler(Echo(image_uri='test://echo'))
+        return sut
+
+    def test_caching(self, sut: WebServer) -> None:
+        # arrange
+        client = Client(sut, Response)
+        # act
+        response = client.get('/css/sourceIcons.css')
+        # assert
+        assert 200 == response.status_code
+        assert response.headers['etag'] and not response.headers['etag'].startswith('W/'), 'strong etag'
+        assert 'public' in response.cache_control and response.cache_control.max_age >= 24 * 60 * 60
+        assert 'no-store' not in response.cache_control
+
+    def test_not_modified(self, sut: WebServer) -> None:
+        # arrange
+        client = Client(sut, Response)
+        etag = client.get('/css/sourceIcons.css').headers['etag']
+        # act
+        response = client.get('/css/sourceIcons.css', headers={'If-None-Match': etag})
+        # assert
+        assert 304 == response.status_code
+        assert not response.data
+
+    def test_rendered_once(self, sut: WebServer) -> None:
+        # arrange
+        client = Client(sut, Response)
+        first = client.get('/css/sourceIcons.css')
+        rendered = sut._sourceicons_css
+        # act
+        second = client.get('/css/sourceIcons.css')
+        # assert
+        assert first.data == second.data
+        assert rendered is sut._sourceicons_css
+
+    def test_invalidated_on_crawler_change(self, sut: WebServer) -> None:
+        # arrange
+        client = Client(sut, Response)
+        etag = client.get('/css/sourceIcons.css').headers['etag']
+        # act
+        sut.imageserver.core.add_imagecrawler(_IconImageCrawler())
+        response = client.get('/css/sourceIcons.css', headers={'If-None-Match': etag})
+        # assert
+        assert 200 == response.status_code
+        assert etag != response.headers['etag']
+        assert b'test://icon' in response.data
+
+
+class TestCreateApp:
+    _CONFIG = (
+        'webserver: {hostname: "localhost", port: 5000}\n'
+        'crawlers: [{name: "Echo", config: {image_uri: "test://echo"}}]\n'
+    )
+
+    def test_create_app(self, tmp_path: Path, monkeypatch: Any) -> None:
+        # arrange
+        config_file = tmp_path / 'config.yaml'
+        config_file.write_text(self._CONFIG)
+        monkeypatch.setenv('NICHTPARASOUP_CONFIG', str(config_file))
+        at_exit: List[Callable[[], None]] = []
+        monkeypatch.setattr(np_webserver, 'atexit_register', at_exit.append)
+        monkeypatch.setattr(Echo, '_crawl', lambda _: ImageCollection(  # fill up in one go
+            Image(uri='test://echo', source='test', is_generic=True) for _ in range(100)))
+        # act
+        app = create_app()
+        client = Client(app, Response)
+        got = client.get('/get')
+        static = client.get('/index.html')
+        for stop in at_exit:
+            stop()
+        # assert
+        assert 200 == got.status_code
+        assert 'test://echo' == json_loads(got.data)['uri']
+        assert 200 == static.status_code
+        assert at_exit, 'stop registered'
+        assert not app._app.imageserver.is_alive()  # type: ignore[attr-defined]
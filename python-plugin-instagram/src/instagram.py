@@ -13,12 +13,14 @@ from json import dumps as json_encode, loads as json_loads
 from re import compile as re_compile
 from threading import Lock
 from time import sleep, time
-from typing import Any, Dict, Optional, Pattern, Set, Tuple, Union
+from typing import Any, Dict, Optional, Pattern, Sequence, Set, Tuple, Union
 from urllib.parse import quote_plus as url_quote, urlencode, urljoin
 from urllib.response import addinfourl
 
 from .._internals import _log
-from ..imagecrawler import BaseImageCrawler, Image, ImageCollection, ImageCrawlerConfig, ImageCrawlerInfo, RemoteFetcher
+from ..imagecrawler import (
+    BaseImageCrawler, Image, ImageCollection, ImageCrawlerConfig, ImageCrawlerInfo, ImageCrawlerState, RemoteFetcher,
+)
 
 if sys.version_info >= (3, 8):
     from typing import Literal
@@ -153,16 +155,24 @@ class BaseInstagramCrawler(BaseImageCrawler, ABC):
         self._cursor = None
         self._has_next_page = True
 
+    def _get_state(self) -> ImageCrawlerState:
+        with self._QUERY_HASH_LOCK:
+            query_hash = self._query_hash
+        return ImageCrawlerState(cursor=self._cursor, has_next_page=self._has_next_page, query_hash=query_hash)
+
+    def _set_state(self, state: ImageCrawlerState) -> None:
+        cursor = _optional_str(state, 'cursor')
+        query_hash = _optional_str(state, 'query_hash')
+        self._cursor = cursor
+        self._has_next_page = bool(state['has_next_page'])
+        if query_hash is not None:
+            # a known query hash does not need to be found again
+            with self._QUERY_HASH_LOCK:
+                self._query_hash = query_hash
+
     def _crawl(self) -> ImageCollection:
-        images = ImageCollection()
         query_uri = self._get_query_uri(self._get_query_hash(), self._amount, self._cursor, self._get_query_variables())
-        response = self._query(query_uri)
-        for edge in response['edges']:
-            images.update(
-                self._get_images_from_media_edge_node(edge['node'])
-            )
-            del edge
-        page_info: Dict[str, Any] = response['page_info']
+        images, page_info = self._query(query_uri)
         self._has_next_page = page_info['has_next_page']
         if self._has_next_page:
             self._cursor = str(page_info['end_cursor'])
@@ -200,25 +210,40 @@ class BaseInstagramCrawler(BaseImageCrawler, ABC):
     def _get_post_url(cls, shortcode: str) -> _Uri:
         return INSTAGRAM_URL_ROOT + 'p/' + url_quote(shortcode) + '/'
 
-    def _query(self, uri: str) -> Dict[str, Any]:
-        response_string, uri = self._remote_fetcher.get_string(uri)
-        # responses may be small in size but are memory hungry when parsing!
-        response = json_loads(response_string)
-        del response_string
-        if response['status'] != 'ok':
+    def _query(self, uri: str) -> Tuple[ImageCollection, Dict[str, Any]]:
+        """Query the media, and get their images and page info.
+
+        The edges are streamed - responses may be small in size but are memory hungry when parsing!
+        """
+        images = ImageCollection()
+        media_path = self._get_media_path()
+        edges = self._remote_fetcher.get_json_items(uri, (*media_path, 'edges'))
+        for edge in edges:
+            images.update(
+                self._get_images_from_media_edge_node(edge['node'])
+            )
+        if edges.document.get('status') != 'ok':
             raise InstagramError('response not ok')
+        return images, self._get_page_info(edges.document, media_path)
+
+    @staticmethod
+    def _get_page_info(response: Dict[str, Any], media_path: Sequence[str]) -> Dict[str, Any]:
         try:
-            return self._get_media_from_query_response(response)
-        except KeyError as ex:
+            media = response
+            for key in media_path:
+                media = media[key]
+            page_info: Dict[str, Any] = media['page_info']
+            return page_info
+        except (KeyError, TypeError) as ex:
             raise InstagramError('no media') from ex
 
     @classmethod
     @abstractmethod
-    def _get_media_from_query_response(cls, response: Dict[str, Any]) -> Dict[str, Any]:  # pragma: no cover
-        """Get the path for media edges in query response
+    def _get_media_path(cls) -> Sequence[str]:  # pragma: no cover
+        """Get the path for media in query response
 
         example implementation:
-            return response['data']['<aTYPE>']['edge_<bTYPE>_media']
+            return 'data', '<aTYPE>', 'edge_<bTYPE>_media'
         """
         raise NotImplementedError()
 
@@ -312,9 +337,8 @@ class InstagramHashtag(BaseInstagramCrawler):
         return {'tag_name': self._config['tag_name']}
 
     @classmethod
-    def _get_media_from_query_response(cls, response: Dict[str, Any]) -> Dict[str, Any]:
-        media: Dict[str, Any] = response['data']['hashtag']['edge_hashtag_to_media']
-        return media
+    def _get_media_path(cls) -> Sequence[str]:
+        return 'data', 'hashtag', 'edge_hashtag_to_media'
 
 
 _ProfileId = str
@@ -353,13 +377,25 @@ class InstagramProfile(BaseInstagramCrawler):
         return _InstagramProfileQueryHashFinder(self._config['user_name'], self._remote_fetcher)
 
     @classmethod
-    def _get_media_from_query_response(cls, response: Dict[str, Any]) -> Dict[str, Any]:
-        media: Dict[str, Any] = response['data']['user']['edge_owner_to_timeline_media']
-        return media
+    def _get_media_path(cls) -> Sequence[str]:
+        return 'data', 'user', 'edge_owner_to_timeline_media'
 
     def _get_query_variables(self) -> Dict[str, Any]:
         return {'id': self._get_profile_id()}
 
+    def _get_state(self) -> ImageCrawlerState:
+        state = super()._get_state()
+        with self.__PROFILE_ID_LOCK:
+            state['profile_id'] = self.__profile_id
+        return state
+
+    def _set_state(self, state: ImageCrawlerState) -> None:
+        profile_id = _optional_str(state, 'profile_id')
+        super()._set_state(state)
+        if profile_id is not None:
+            with self.__PROFILE_ID_LOCK:
+                self.__profile_id = profile_id
+
     def __fetch_profile_id__a(self) -> _ProfileId:
         # this is much easier than `__fetch_profile__page` - let's hope it is stable again
         profile_string, _ = self._remote_fetcher.get_string(self._get_profile_url() + '?__a=1')
@@ -399,5 +435,12 @@ class InstagramProfile(BaseInstagramCrawler):
         return f'{INSTAGRAM_URL_ROOT}{url_quote(self._config["user_name"])}/'
 
 
+def _optional_str(state: ImageCrawlerState, key: str) -> Optional[str]:
+    value: Optional[str] = state[key]
+    if value is not None and type(value) is not str:
+        raise TypeError(f'{key} {value!r} is not str')
+    return value
+
+
 class InstagramError(Exception):
     ...
@@ -8,7 +8,7 @@ from urllib.parse import ParseResult as UrlParseResult, parse_qs, urlencode, url
 
 import pytest
 
-from nichtparasoup.imagecrawler import Image, ImageCollection
+from nichtparasoup.imagecrawler import Image, ImageCollection, ImageCrawlerState
 from nichtparasoup.imagecrawlers.instagram import (
     BaseInstagramCrawler, BaseInstagramQueryHashFinder, InstagramHashtag, InstagramProfile,
     _InstagramProfileQueryHashFinder, _InstagramTagQueryHashFinder,
@@ -573,3 +573,46 @@ class InstagramProfileDescriptionTest(unittest.TestCase):
 @pytest.mark.no_cover
 def test_profile_loader() -> None:
     ImageCrawlerLoaderTest().check('InstagramProfile', InstagramProfile)
+
+
+class TestInstagramState:
+
+    def test_roundtrip_hashtag(self) -> None:
+        # arrange
+        crawler = InstagramHashtag(tag_name='foo')
+        crawler._reset_before_next_crawl = False
+        crawler._cursor = 'bar'
+        crawler._has_next_page = False
+        crawler._query_hash = 'baz'
+        restored = InstagramHashtag(tag_name='foo')
+        # act
+        restored.set_state(crawler.get_state())
+        # assert
+        assert 'bar' == restored._cursor
+        assert restored.is_exhausted()
+        assert 'baz' == restored._get_query_hash()
+
+    def test_roundtrip_profile(self) -> None:
+        # arrange
+        crawler = InstagramProfile(user_name='natgeo')
+        crawler._reset_before_next_crawl = False
+        crawler._query_hash = 'baz'
+        crawler._InstagramProfile__profile_id = '787132'  # type: ignore[attr-defined]
+        restored = InstagramProfile(user_name='natgeo')
+        # act
+        restored.set_state(crawler.get_state())
+        # assert
+        assert 'baz' == restored._get_query_hash()
+        assert '787132' == restored._get_profile_id()
+
+    @pytest.mark.parametrize('state', [
+        {'cursor': 1, 'has_next_page': True, 'query_hash': None},
+        {'cursor': None, 'has_next_page': True, 'query_hash': 1},
+        {'cursor': None},
+    ], ids=['wrong cursor', 'wrong query_hash', 'missing'])
+    def test_invalid(self, state: Dict[str, Any]) -> None:
+        # arrange
+        crawler = InstagramHashtag(tag_name='foo')
+        # act & assert
+        with pytest.raises(ValueError):
+            crawler.set_state(ImageCrawlerState(state))
@@ -62,6 +62,10 @@
     np._images = [];
     np._imagesMax = 50;
 
+    np._imagesBuffer = []; // prefetched image data, to be displayed
+    np._imagesBufferSize = 5;
+    np.__imagesBufferAwaited = false;
+
     np._state = bitset.set(0, np.constants.stateBS.init);
 
     np._fetchRequest = new XMLHttpRequest();
@@ -89,16 +93,20 @@
 
     addEvent(np._fetchRequest, "readystatechange", function () {
         var req = this,
-            imageData;
+            imagesData;
         if (req.readyState == 4 && req.status == 200) {
             try {
-                imageData = JSON.parse(req.responseText);
+                imagesData = JSON.parse(req.responseText);
             }
             catch (e) {
 
             }
-            if (imageData) {
-                np._pushImage(imageData);
+            if (imagesData) {
+                np._imagesBuffer = np._imagesBuffer.concat(imagesData);
+                if (np.__imagesBufferAwaited) {
+                    np.__imagesBufferAwaited = false;
+                    np._fetch();
+                }
             }
         }
     });
@@ -123,10 +131,23 @@
     addEvent(np._serverResetRequest, "readystatechange", np.__controllableRequestReadystatechange);
 
     np._fetch = function () {
+        var imageData = this._imagesBuffer.shift();
+        if (imageData) {
+            this._pushImage(imageData);
+        }
+        else {
+            this.__imagesBufferAwaited = true;
+        }
+        if (this._imagesBuffer.length == 0) {
+            this._prefetch();
+        }
+    };
+
+    np._prefetch = function () {
         var req = this._fetchRequest;
         var r_rs = req.readyState;
         if (r_rs == 4 || r_rs == 0) {
-            req.open("GET", "./get", true);
+            req.open("GET", "./get?count=" + this._imagesBufferSize, true);
             req.send();
         }
     };